@@ -0,0 +1,60 @@
+"""add block blobs for version snapshots
+
+Revision ID: 9bfb4725436e
+Revises: daed445bc4cd
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import json
+import zlib
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '9bfb4725436e'
+down_revision = 'daed445bc4cd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Content-addressed, zlib-compressed block storage shared by page versions
+    op.create_table('block_blobs',
+        sa.Column('page_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('hash', sa.String(length=64), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('size_bytes', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['page_id'], ['pages.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('page_id', 'hash')
+    )
+
+    # Versions now reference blobs; existing inline snapshots stay readable
+    op.add_column('page_versions', sa.Column('block_refs', sa.JSON(), nullable=True))
+    op.alter_column('page_versions', 'content_snapshot', existing_type=sa.JSON(), nullable=True)
+
+
+def downgrade() -> None:
+    # Inline blob-referenced snapshots again before dropping the blob table
+    bind = op.get_bind()
+    versions = bind.execute(sa.text(
+        "SELECT id, page_id, block_refs FROM page_versions WHERE block_refs IS NOT NULL"
+    )).fetchall()
+    for version_id, page_id, block_refs in versions:
+        refs = block_refs if isinstance(block_refs, list) else json.loads(block_refs)
+        rows = bind.execute(
+            sa.text("SELECT hash, data FROM block_blobs WHERE page_id = :page_id"),
+            {"page_id": page_id}
+        ).fetchall()
+        blobs = {digest: json.loads(zlib.decompress(data)) for digest, data in rows}
+        snapshot = [blobs[digest] for digest in refs if digest in blobs]
+        bind.execute(
+            sa.text("UPDATE page_versions SET content_snapshot = :snapshot WHERE id = :id"),
+            {"snapshot": json.dumps(snapshot), "id": version_id}
+        )
+
+    op.alter_column('page_versions', 'content_snapshot', existing_type=sa.JSON(), nullable=False)
+    op.drop_column('page_versions', 'block_refs')
+
+    op.drop_table('block_blobs')
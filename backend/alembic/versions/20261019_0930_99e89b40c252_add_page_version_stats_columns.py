@@ -0,0 +1,58 @@
+"""add page version stats columns
+
+Revision ID: 99e89b40c252
+Revises: 9bfb4725436e
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '99e89b40c252'
+down_revision = '9bfb4725436e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Stored at creation time so version lists never read snapshot data
+    op.add_column('page_versions', sa.Column('blocks_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('page_versions', sa.Column('snapshot_size_bytes', sa.Integer(), server_default='0', nullable=False))
+
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        # Backfill inline snapshots
+        op.execute("""
+            UPDATE page_versions
+            SET blocks_count = json_array_length(content_snapshot),
+                snapshot_size_bytes = octet_length(content_snapshot::text)
+            WHERE content_snapshot IS NOT NULL
+        """)
+
+        # Backfill blob-referenced snapshots from stored blob sizes
+        op.execute("""
+            UPDATE page_versions v
+            SET blocks_count = json_array_length(v.block_refs),
+                snapshot_size_bytes = coalesce((
+                    SELECT sum(b.size_bytes)
+                    FROM json_array_elements_text(v.block_refs) AS ref(hash)
+                    JOIN block_blobs b ON b.page_id = v.page_id AND b.hash = ref.hash
+                ), 0)
+            WHERE v.block_refs IS NOT NULL
+        """)
+
+    # Keyset pagination: WHERE page_id = X AND version_number < Y ORDER BY version_number DESC
+    op.create_index(
+        'ix_page_versions_page_version',
+        'page_versions',
+        ['page_id', 'version_number'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_page_versions_page_version', table_name='page_versions')
+    op.drop_column('page_versions', 'snapshot_size_bytes')
+    op.drop_column('page_versions', 'blocks_count')
@@ -0,0 +1,40 @@
+"""cascade block parent fk
+
+Revision ID: 4f2a9c7e1b3d
+Revises: 99e89b40c252
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '4f2a9c7e1b3d'
+down_revision = '99e89b40c252'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Nested blocks go with their parent at the DB level, so page/block deletes
+    # no longer need the ORM to load child blocks
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.drop_constraint('blocks_parent_block_id_fkey', 'blocks', type_='foreignkey')
+        op.create_foreign_key(
+            'blocks_parent_block_id_fkey',
+            'blocks', 'blocks',
+            ['parent_block_id'], ['id'],
+            ondelete='CASCADE'
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.drop_constraint('blocks_parent_block_id_fkey', 'blocks', type_='foreignkey')
+        op.create_foreign_key(
+            'blocks_parent_block_id_fkey',
+            'blocks', 'blocks',
+            ['parent_block_id'], ['id']
+        )
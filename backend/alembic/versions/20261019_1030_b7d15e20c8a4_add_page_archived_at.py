@@ -0,0 +1,31 @@
+"""add page archived_at
+
+Revision ID: b7d15e20c8a4
+Revises: 4f2a9c7e1b3d
+Create Date: 2026-10-19 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d15e20c8a4'
+down_revision = '4f2a9c7e1b3d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # When a page was moved to trash; drives trash retention
+    op.add_column('pages', sa.Column('archived_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Pages already in trash: best estimate is their last update
+    op.execute("UPDATE pages SET archived_at = updated_at WHERE is_archived = true")
+
+    op.create_index('ix_pages_archived_at', 'pages', ['is_archived', 'archived_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pages_archived_at', table_name='pages')
+    op.drop_column('pages', 'archived_at')
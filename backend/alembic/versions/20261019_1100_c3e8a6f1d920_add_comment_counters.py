@@ -0,0 +1,56 @@
+"""add comment counters
+
+Revision ID: c3e8a6f1d920
+Revises: b7d15e20c8a4
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e8a6f1d920'
+down_revision = 'b7d15e20c8a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Denormalized counters so comment reads never aggregate replies/reactions
+    op.add_column('comments', sa.Column('reply_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('comments', sa.Column('reaction_counts', sa.JSON(), server_default='{}', nullable=False))
+
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute("""
+            UPDATE comments c
+            SET reply_count = r.replies
+            FROM (
+                SELECT parent_comment_id, count(*) AS replies
+                FROM comments
+                WHERE parent_comment_id IS NOT NULL AND is_deleted = false
+                GROUP BY parent_comment_id
+            ) r
+            WHERE c.id = r.parent_comment_id
+        """)
+        op.execute("""
+            UPDATE comments c
+            SET reaction_counts = r.counts
+            FROM (
+                SELECT comment_id, json_object_agg(reaction_type, reactions ORDER BY first_at) AS counts
+                FROM (
+                    SELECT comment_id, reaction_type, count(*) AS reactions, min(created_at) AS first_at
+                    FROM comment_reactions
+                    GROUP BY comment_id, reaction_type
+                ) t
+                GROUP BY comment_id
+            ) r
+            WHERE c.id = r.comment_id
+        """)
+    # Other databases: run scripts/backfill_comment_counters.py
+
+
+def downgrade() -> None:
+    op.drop_column('comments', 'reaction_counts')
+    op.drop_column('comments', 'reply_count')
@@ -0,0 +1,33 @@
+"""add mention read state and inbox index
+
+Revision ID: d81f4b6a2e57
+Revises: c3e8a6f1d920
+Create Date: 2026-10-19 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd81f4b6a2e57'
+down_revision = 'c3e8a6f1d920'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('comment_mentions', sa.Column('read_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Mentions inbox: WHERE mentioned_user_id = X ORDER BY created_at DESC
+    op.create_index(
+        'ix_comment_mentions_user_created',
+        'comment_mentions',
+        ['mentioned_user_id', 'created_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_comment_mentions_user_created', table_name='comment_mentions')
+    op.drop_column('comment_mentions', 'read_at')
@@ -0,0 +1,36 @@
+"""add file content hash
+
+Revision ID: e5a93c2d7f14
+Revises: d81f4b6a2e57
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a93c2d7f14'
+down_revision = 'd81f4b6a2e57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # SHA-256 of the file contents; uploads with a known hash reuse the stored object
+    op.add_column('files', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+    # Local storage is content-addressed, so its storage_id already is the hash
+    op.execute("UPDATE files SET content_hash = storage_id WHERE storage_provider = 'local'")
+
+    op.create_index(
+        'ix_files_workspace_content_hash',
+        'files',
+        ['workspace_id', 'content_hash'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_files_workspace_content_hash', table_name='files')
+    op.drop_column('files', 'content_hash')
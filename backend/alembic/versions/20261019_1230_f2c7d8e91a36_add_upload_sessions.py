@@ -0,0 +1,48 @@
+"""add upload sessions
+
+Revision ID: f2c7d8e91a36
+Revises: e5a93c2d7f14
+Create Date: 2026-10-19 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.types import GUID
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c7d8e91a36'
+down_revision = 'e5a93c2d7f14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'upload_sessions',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('workspace_id', GUID(), nullable=False),
+        sa.Column('user_id', GUID(), nullable=False),
+        sa.Column('page_id', GUID(), nullable=True),
+        sa.Column('block_id', GUID(), nullable=True),
+        sa.Column('folder', sa.String(length=100), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=False),
+        sa.Column('mime_type', sa.String(length=100), nullable=True),
+        sa.Column('size_bytes', sa.BigInteger(), nullable=False),
+        sa.Column('chunk_size', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['workspace_id'], ['workspaces.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['page_id'], ['pages.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['block_id'], ['blocks.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_upload_sessions_workspace_id', 'upload_sessions', ['workspace_id'], unique=False)
+    op.create_index('ix_upload_sessions_expires_at', 'upload_sessions', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_upload_sessions_expires_at', table_name='upload_sessions')
+    op.drop_index('ix_upload_sessions_workspace_id', table_name='upload_sessions')
+    op.drop_table('upload_sessions')
@@ -0,0 +1,25 @@
+"""add file thumbnail storage id
+
+Revision ID: a4b6e1f03c52
+Revises: f2c7d8e91a36
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4b6e1f03c52'
+down_revision = 'f2c7d8e91a36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Stored object of a generated thumbnail (NULL for provider-side thumbnails such as Cloudinary's)
+    op.add_column('files', sa.Column('thumbnail_storage_id', sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('files', 'thumbnail_storage_id')
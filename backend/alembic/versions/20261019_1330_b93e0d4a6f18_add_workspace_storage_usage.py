@@ -0,0 +1,102 @@
+"""add workspace storage usage rollup
+
+Revision ID: b93e0d4a6f18
+Revises: a4b6e1f03c52
+Create Date: 2026-10-19 13:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from app.core.types import GUID
+
+
+# revision identifiers, used by Alembic.
+revision = 'b93e0d4a6f18'
+down_revision = 'a4b6e1f03c52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'workspace_storage_usage',
+        sa.Column('workspace_id', GUID(), nullable=False),
+        sa.Column(
+            'file_type',
+            postgresql.ENUM('IMAGE', 'VIDEO', 'DOCUMENT', 'AUDIO', 'OTHER', name='filetype', create_type=False),
+            nullable=False
+        ),
+        sa.Column('file_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('total_bytes', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['workspace_id'], ['workspaces.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('workspace_id', 'file_type')
+    )
+
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    # One upsert per statement from the transition tables, so bulk inserts and
+    # cascaded deletes cost one rollup update per (workspace, type) they touch.
+    # Deletes only UPDATE: the workspace (and its rollup) may be going away in the same cascade.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION files_storage_usage_rollup() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                UPDATE workspace_storage_usage u
+                SET file_count = u.file_count - d.file_count,
+                    total_bytes = u.total_bytes - d.total_bytes,
+                    updated_at = now()
+                FROM (
+                    SELECT workspace_id, file_type, count(*) AS file_count, sum(size_bytes) AS total_bytes
+                    FROM old_files GROUP BY workspace_id, file_type
+                ) d
+                WHERE u.workspace_id = d.workspace_id AND u.file_type = d.file_type;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO workspace_storage_usage (workspace_id, file_type, file_count, total_bytes, updated_at)
+                SELECT workspace_id, file_type, count(*), sum(size_bytes), now()
+                FROM new_files GROUP BY workspace_id, file_type
+                ON CONFLICT (workspace_id, file_type) DO UPDATE
+                SET file_count = workspace_storage_usage.file_count + EXCLUDED.file_count,
+                    total_bytes = workspace_storage_usage.total_bytes + EXCLUDED.total_bytes,
+                    updated_at = now();
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER files_storage_usage_insert
+        AFTER INSERT ON files REFERENCING NEW TABLE AS new_files
+        FOR EACH STATEMENT EXECUTE FUNCTION files_storage_usage_rollup()
+    """)
+    op.execute("""
+        CREATE TRIGGER files_storage_usage_delete
+        AFTER DELETE ON files REFERENCING OLD TABLE AS old_files
+        FOR EACH STATEMENT EXECUTE FUNCTION files_storage_usage_rollup()
+    """)
+    op.execute("""
+        CREATE TRIGGER files_storage_usage_update
+        AFTER UPDATE ON files REFERENCING OLD TABLE AS old_files NEW TABLE AS new_files
+        FOR EACH STATEMENT EXECUTE FUNCTION files_storage_usage_rollup()
+    """)
+
+    # Existing files
+    op.execute("""
+        INSERT INTO workspace_storage_usage (workspace_id, file_type, file_count, total_bytes)
+        SELECT workspace_id, file_type, count(*), sum(size_bytes)
+        FROM files GROUP BY workspace_id, file_type
+    """)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS files_storage_usage_update ON files")
+        op.execute("DROP TRIGGER IF EXISTS files_storage_usage_delete ON files")
+        op.execute("DROP TRIGGER IF EXISTS files_storage_usage_insert ON files")
+        op.execute("DROP FUNCTION IF EXISTS files_storage_usage_rollup()")
+    op.drop_table('workspace_storage_usage')
@@ -0,0 +1,122 @@
+"""add workspace storage quotas
+
+Revision ID: c5e2f7a1d904
+Revises: b93e0d4a6f18
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.types import GUID
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e2f7a1d904'
+down_revision = 'b93e0d4a6f18'
+branch_labels = None
+depends_on = None
+
+
+# files_storage_usage_rollup() from b93e0d4a6f18, which downgrade restores
+ROLLUP_FUNCTION = """
+    CREATE OR REPLACE FUNCTION files_storage_usage_rollup() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('DELETE', 'UPDATE') THEN
+            UPDATE workspace_storage_usage u
+            SET file_count = u.file_count - d.file_count,
+                total_bytes = u.total_bytes - d.total_bytes,
+                updated_at = now()
+            FROM (
+                SELECT workspace_id, file_type, count(*) AS file_count, sum(size_bytes) AS total_bytes
+                FROM old_files GROUP BY workspace_id, file_type
+            ) d
+            WHERE u.workspace_id = d.workspace_id AND u.file_type = d.file_type;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO workspace_storage_usage (workspace_id, file_type, file_count, total_bytes, updated_at)
+            SELECT workspace_id, file_type, count(*), sum(size_bytes), now()
+            FROM new_files GROUP BY workspace_id, file_type
+            ON CONFLICT (workspace_id, file_type) DO UPDATE
+            SET file_count = workspace_storage_usage.file_count + EXCLUDED.file_count,
+                total_bytes = workspace_storage_usage.total_bytes + EXCLUDED.total_bytes,
+                updated_at = now();
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        'workspace_storage_quotas',
+        sa.Column('workspace_id', GUID(), nullable=False),
+        sa.Column('quota_bytes', sa.BigInteger(), nullable=True),
+        sa.Column('used_bytes', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('reserved_bytes', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('reserved_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['workspace_id'], ['workspaces.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('workspace_id')
+    )
+
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    # The rollup triggers also keep workspace_storage_quotas.used_bytes current, so
+    # quota reservations compare against used bytes in the row they lock
+    op.execute("""
+        CREATE OR REPLACE FUNCTION files_storage_usage_rollup() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                UPDATE workspace_storage_usage u
+                SET file_count = u.file_count - d.file_count,
+                    total_bytes = u.total_bytes - d.total_bytes,
+                    updated_at = now()
+                FROM (
+                    SELECT workspace_id, file_type, count(*) AS file_count, sum(size_bytes) AS total_bytes
+                    FROM old_files GROUP BY workspace_id, file_type
+                ) d
+                WHERE u.workspace_id = d.workspace_id AND u.file_type = d.file_type;
+
+                UPDATE workspace_storage_quotas q
+                SET used_bytes = q.used_bytes - d.total_bytes
+                FROM (
+                    SELECT workspace_id, sum(size_bytes) AS total_bytes
+                    FROM old_files GROUP BY workspace_id
+                ) d
+                WHERE q.workspace_id = d.workspace_id;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO workspace_storage_usage (workspace_id, file_type, file_count, total_bytes, updated_at)
+                SELECT workspace_id, file_type, count(*), sum(size_bytes), now()
+                FROM new_files GROUP BY workspace_id, file_type
+                ON CONFLICT (workspace_id, file_type) DO UPDATE
+                SET file_count = workspace_storage_usage.file_count + EXCLUDED.file_count,
+                    total_bytes = workspace_storage_usage.total_bytes + EXCLUDED.total_bytes,
+                    updated_at = now();
+
+                INSERT INTO workspace_storage_quotas (workspace_id, used_bytes)
+                SELECT workspace_id, sum(size_bytes)
+                FROM new_files GROUP BY workspace_id
+                ON CONFLICT (workspace_id) DO UPDATE
+                SET used_bytes = workspace_storage_quotas.used_bytes + EXCLUDED.used_bytes;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+    # Existing files
+    op.execute("""
+        INSERT INTO workspace_storage_quotas (workspace_id, used_bytes)
+        SELECT workspace_id, sum(size_bytes)
+        FROM files GROUP BY workspace_id
+    """)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute(ROLLUP_FUNCTION)
+    op.drop_table('workspace_storage_quotas')
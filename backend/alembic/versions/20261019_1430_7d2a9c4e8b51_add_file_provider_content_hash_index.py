@@ -0,0 +1,30 @@
+"""add file provider content hash index
+
+Revision ID: 7d2a9c4e8b51
+Revises: c5e2f7a1d904
+Create Date: 2026-10-19 14:30:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2a9c4e8b51'
+down_revision = 'c5e2f7a1d904'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Uploads and deletes lock every record sharing a stored object by its content hash,
+    # across workspaces
+    op.create_index(
+        'ix_files_provider_content_hash',
+        'files',
+        ['storage_provider', 'content_hash'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_files_provider_content_hash', table_name='files')
@@ -0,0 +1,56 @@
+"""add workspace storage reservations
+
+Revision ID: e41b8d6c2f07
+Revises: 7d2a9c4e8b51
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.types import GUID
+
+
+# revision identifiers, used by Alembic.
+revision = 'e41b8d6c2f07'
+down_revision = '7d2a9c4e8b51'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # One row per upload in flight, each with its own expiry, replaces the per-workspace
+    # reserved_bytes counter (whose single timestamp let one new upload revive
+    # abandoned reservations)
+    op.create_table(
+        'workspace_storage_reservations',
+        sa.Column('id', GUID(), nullable=False),
+        sa.Column('workspace_id', GUID(), nullable=False),
+        sa.Column('size_bytes', sa.BigInteger(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['workspace_id'], ['workspaces.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_workspace_storage_reservations_workspace_expires',
+        'workspace_storage_reservations',
+        ['workspace_id', 'expires_at'],
+        unique=False
+    )
+    op.drop_column('workspace_storage_quotas', 'reserved_at')
+    op.drop_column('workspace_storage_quotas', 'reserved_bytes')
+
+
+def downgrade() -> None:
+    op.add_column(
+        'workspace_storage_quotas',
+        sa.Column('reserved_bytes', sa.BigInteger(), nullable=False, server_default='0')
+    )
+    op.add_column(
+        'workspace_storage_quotas',
+        sa.Column('reserved_at', sa.DateTime(timezone=True), nullable=True)
+    )
+    op.drop_index(
+        'ix_workspace_storage_reservations_workspace_expires',
+        table_name='workspace_storage_reservations'
+    )
+    op.drop_table('workspace_storage_reservations')
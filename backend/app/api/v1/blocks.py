@@ -8,6 +8,7 @@ from app.crud import page as crud_page
 from app.crud import workspace as crud_workspace
 from app.schemas.block import BlockCreate, BlockUpdate, BlockMove, BlockResponse
 from app.models.user import User
+from app.services.versioning import track_edit
 
 router = APIRouter()
 
@@ -48,6 +49,7 @@ def create_block(
                 detail="Parent block must be on the same page"
             )
     
+    track_edit(db, page=page, user_id=current_user.id)
     block = crud_block.create(db, block_in=block_in)
     return block
 
@@ -140,6 +142,7 @@ def update_block(
             detail="Not a member of this workspace"
         )
 
+    track_edit(db, page=page, user_id=current_user.id)
     updated_block = crud_block.update(db, block=block, block_in=block_in)
     return updated_block
 
@@ -173,6 +176,7 @@ def delete_block(
             detail="Not a member of this workspace"
         )
     
+    track_edit(db, page=page, user_id=current_user.id)
     crud_block.delete(db, block=block)
     return None
 
@@ -227,5 +231,6 @@ def move_block(
                 detail="Cannot move block to itself"
             )
     
+    track_edit(db, page=page, user_id=current_user.id)
     moved_block = crud_block.move(db, block=block, move_data=move_data)
     return moved_block
@@ -16,6 +16,12 @@ from app.schemas.comment import (
     CommentResponse,
     CommentWithReplies,
     CommentListResponse,
+    CommentThreadListResponse,
+    PageCommentSummary,
+    MentionInboxItem,
+    MentionInboxResponse,
+    MentionMarkRead,
+    MentionUnreadCount,
     ReactionCreate,
     ReactionResponse,
     AttachmentCreate,
@@ -25,6 +31,7 @@ from app.schemas.comment import (
 )
 from app.models.user import User
 from app.models.workspace_member import WorkspaceRole
+from app.utils.pagination import encode_cursor
 
 router = APIRouter()
 
@@ -82,6 +89,47 @@ def _check_workspace_access(
     return workspace_id
 
 
+def _build_comment_responses(
+    comments,
+    db: Session,
+    current_user_id: UUID
+) -> List[CommentResponse]:
+    """
+    Build CommentResponses with all embedded data.
+    Reaction and reply counts are read from the comments' stored counters; the current
+    user's own reactions come from one query. Author, mentions and attachments must
+    already be eager loaded.
+    """
+    user_reactions = crud_comment.get_user_reaction_types(
+        db, [comment.id for comment in comments], user_id=current_user_id
+    )
+
+    return [
+        CommentResponse(
+            id=comment.id,
+            page_id=comment.page_id,
+            block_id=comment.block_id,
+            parent_comment_id=comment.parent_comment_id,
+            thread_depth=comment.thread_depth,
+            content=comment.content,
+            author_id=comment.author_id,
+            is_deleted=comment.is_deleted,
+            deleted_at=comment.deleted_at,
+            deleted_by=comment.deleted_by,
+            created_at=comment.created_at,
+            updated_at=comment.updated_at,
+            edited_at=comment.edited_at,
+            author=UserBasic.model_validate(comment.author) if comment.author else None,
+            deleted_by_user=UserBasic.model_validate(comment.deleted_by_user) if comment.deleted_by_user else None,
+            reactions=crud_comment.build_reaction_summary(comment, user_reactions.get(comment.id, set())),
+            mentioned_users=[UserBasic.model_validate(m.mentioned_user) for m in comment.mentions if m.mentioned_user],
+            attachments=[AttachmentResponse.model_validate(a) for a in comment.attachments] if comment.attachments else [],
+            replies_count=comment.reply_count,
+        )
+        for comment in comments
+    ]
+
+
 def _build_comment_response(
     comment,
     db: Session,
@@ -90,40 +138,64 @@ def _build_comment_response(
     """
     Build CommentResponse with all embedded data.
     """
-    # Get reaction summary
-    reactions = crud_comment.get_reaction_summary(
-        db,
-        comment_id=comment.id,
-        current_user_id=current_user_id
-    )
+    return _build_comment_responses([comment], db, current_user_id)[0]
+
 
-    # Get replies count
-    replies_count = crud_comment.get_replies_count(db, comment_id=comment.id)
-
-    # Build basic response
-    response_data = {
-        "id": comment.id,
-        "page_id": comment.page_id,
-        "block_id": comment.block_id,
-        "parent_comment_id": comment.parent_comment_id,
-        "thread_depth": comment.thread_depth,
-        "content": comment.content,
-        "author_id": comment.author_id,
-        "is_deleted": comment.is_deleted,
-        "deleted_at": comment.deleted_at,
-        "deleted_by": comment.deleted_by,
-        "created_at": comment.created_at,
-        "updated_at": comment.updated_at,
-        "edited_at": comment.edited_at,
-        "author": UserBasic.model_validate(comment.author) if comment.author else None,
-        "deleted_by_user": UserBasic.model_validate(comment.deleted_by_user) if comment.deleted_by_user else None,
-        "reactions": reactions,
-        "mentioned_users": [UserBasic.model_validate(m.mentioned_user) for m in comment.mentions if m.mentioned_user],
-        "attachments": [AttachmentResponse.model_validate(a) for a in comment.attachments] if comment.attachments else [],
-        "replies_count": replies_count,
+def _fetch_top_level_page(
+    fetch,
+    page: int,
+    page_size: int,
+    cursor: Optional[str],
+    include_total: bool
+):
+    """
+    Run a crud top-level listing (get_by_page/get_by_block partial) for one page of results.
+    Returns (comments, total, has_more, next_cursor); one extra row is fetched to detect more.
+    """
+    offset = 0 if cursor else (page - 1) * page_size
+    try:
+        comments, total = fetch(
+            limit=page_size + 1,
+            offset=offset,
+            cursor=cursor,
+            include_total=include_total
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    has_more = len(comments) > page_size
+    comments = comments[:page_size]
+    next_cursor = encode_cursor(comments[-1].created_at, comments[-1].id) if has_more else None
+    return comments, total, has_more, next_cursor
+
+
+def _build_comment_threads(
+    comments,
+    root_ids: List[UUID],
+    db: Session,
+    current_user_id: UUID
+) -> List[CommentWithReplies]:
+    """
+    Assemble a flat list of thread comments (see crud get_thread_comments) into trees.
+    Roots are returned in root_ids order; replies whose parent was cut off are dropped.
+    """
+    nodes = {
+        response.id: CommentWithReplies(**response.model_dump())
+        for response in _build_comment_responses(comments, db, current_user_id)
     }
 
-    return CommentResponse(**response_data)
+    # comments are ordered oldest first, so replies are appended in order
+    for comment in comments:
+        if comment.id in root_ids:
+            continue
+        parent = nodes.get(comment.parent_comment_id)
+        if parent is not None:
+            parent.replies.append(nodes[comment.id])
+
+    return [nodes[root_id] for root_id in root_ids if root_id in nodes]
 
 
 # ============================================================================
@@ -186,8 +258,10 @@ def create_comment(
 @router.get("/page/{page_id}", response_model=CommentListResponse)
 def list_comments_by_page(
     page_id: UUID,
-    page: int = Query(1, ge=1),
+    page: int = Query(1, ge=1, deprecated=True, description="Offset page; use cursor instead"),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(False, description="Also count all top-level comments (extra query)"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -197,35 +271,32 @@ def list_comments_by_page(
     # Check workspace access
     _check_workspace_access(db, user_id=current_user.id, page_id=page_id)
 
-    # Get comments
-    offset = (page - 1) * page_size
-    comments, total = crud_comment.get_by_page(
-        db,
-        page_id=page_id,
-        limit=page_size,
-        offset=offset
+    # Get comments (keyset on created_at/id when a cursor is given)
+    comments, total, has_more, next_cursor = _fetch_top_level_page(
+        lambda **kwargs: crud_comment.get_by_page(db, page_id=page_id, **kwargs),
+        page, page_size, cursor, include_total
     )
 
     # Build responses
-    comment_responses = [
-        _build_comment_response(c, db, current_user.id)
-        for c in comments
-    ]
+    comment_responses = _build_comment_responses(comments, db, current_user.id)
 
     return CommentListResponse(
         comments=comment_responses,
         total=total,
         page=page,
         page_size=page_size,
-        has_more=(offset + page_size) < total
+        has_more=has_more,
+        next_cursor=next_cursor
     )
 
 
 @router.get("/block/{block_id}", response_model=CommentListResponse)
 def list_comments_by_block(
     block_id: UUID,
-    page: int = Query(1, ge=1),
+    page: int = Query(1, ge=1, deprecated=True, description="Offset page; use cursor instead"),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(False, description="Also count all top-level comments (extra query)"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -235,30 +306,229 @@ def list_comments_by_block(
     # Check workspace access
     _check_workspace_access(db, user_id=current_user.id, block_id=block_id)
 
-    # Get comments
-    offset = (page - 1) * page_size
-    comments, total = crud_comment.get_by_block(
-        db,
-        block_id=block_id,
-        limit=page_size,
-        offset=offset
+    # Get comments (keyset on created_at/id when a cursor is given)
+    comments, total, has_more, next_cursor = _fetch_top_level_page(
+        lambda **kwargs: crud_comment.get_by_block(db, block_id=block_id, **kwargs),
+        page, page_size, cursor, include_total
     )
 
     # Build responses
-    comment_responses = [
-        _build_comment_response(c, db, current_user.id)
-        for c in comments
-    ]
+    comment_responses = _build_comment_responses(comments, db, current_user.id)
 
     return CommentListResponse(
         comments=comment_responses,
         total=total,
         page=page,
         page_size=page_size,
-        has_more=(offset + page_size) < total
+        has_more=has_more,
+        next_cursor=next_cursor
+    )
+
+
+@router.get("/page/{page_id}/threads", response_model=CommentThreadListResponse)
+def list_comment_threads_by_page(
+    page_id: UUID,
+    page: int = Query(1, ge=1, deprecated=True, description="Offset page; use cursor instead"),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(False, description="Also count all top-level comments (extra query)"),
+    replies_per_level: int = Query(20, ge=0, le=100, description="Maximum replies returned under each comment"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    List comment threads for a page, with nested replies, paginated by root comment.
+    """
+    # Check workspace access
+    _check_workspace_access(db, user_id=current_user.id, page_id=page_id)
+
+    roots, total, has_more, next_cursor = _fetch_top_level_page(
+        lambda **kwargs: crud_comment.get_by_page(db, page_id=page_id, **kwargs),
+        page, page_size, cursor, include_total
+    )
+    root_ids = [root.id for root in roots]
+
+    comments = crud_comment.get_thread_comments(db, root_ids, replies_per_level=replies_per_level)
+
+    return CommentThreadListResponse(
+        threads=_build_comment_threads(comments, root_ids, db, current_user.id),
+        total=total,
+        page=page,
+        page_size=page_size,
+        has_more=has_more,
+        next_cursor=next_cursor
     )
 
 
+@router.get("/block/{block_id}/threads", response_model=CommentThreadListResponse)
+def list_comment_threads_by_block(
+    block_id: UUID,
+    page: int = Query(1, ge=1, deprecated=True, description="Offset page; use cursor instead"),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(False, description="Also count all top-level comments (extra query)"),
+    replies_per_level: int = Query(20, ge=0, le=100, description="Maximum replies returned under each comment"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    List comment threads for a block, with nested replies, paginated by root comment.
+    """
+    # Check workspace access
+    _check_workspace_access(db, user_id=current_user.id, block_id=block_id)
+
+    roots, total, has_more, next_cursor = _fetch_top_level_page(
+        lambda **kwargs: crud_comment.get_by_block(db, block_id=block_id, **kwargs),
+        page, page_size, cursor, include_total
+    )
+    root_ids = [root.id for root in roots]
+
+    comments = crud_comment.get_thread_comments(db, root_ids, replies_per_level=replies_per_level)
+
+    return CommentThreadListResponse(
+        threads=_build_comment_threads(comments, root_ids, db, current_user.id),
+        total=total,
+        page=page,
+        page_size=page_size,
+        has_more=has_more,
+        next_cursor=next_cursor
+    )
+
+
+@router.get("/summary", response_model=List[PageCommentSummary])
+def get_comment_summaries(
+    page_ids: List[UUID] = Query(..., max_length=200, description="Pages to summarize"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Comment counts for a list of pages (e.g. the sidebar) in one request.
+    Unknown pages are skipped.
+    """
+    page_ids = list(dict.fromkeys(page_ids))
+    workspace_ids = crud_page.get_workspace_ids(db, page_ids)
+
+    # Check workspace membership once per workspace
+    for workspace_id in set(workspace_ids.values()):
+        if not crud_workspace.is_member(db, workspace_id=workspace_id, user_id=current_user.id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not a member of this workspace"
+            )
+
+    summaries = crud_comment.get_page_summaries(db, list(workspace_ids), user_id=current_user.id)
+    return [
+        PageCommentSummary(page_id=page_id, **summaries.get(page_id, {}))
+        for page_id in page_ids
+        if page_id in workspace_ids
+    ]
+
+
+# ============================================================================
+# Mentions Inbox
+# ============================================================================
+
+@router.get("/mentions", response_model=MentionInboxResponse)
+def list_my_mentions(
+    unread_only: bool = Query(False, description="Only return unread mentions"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Mentions of the current user across all their workspaces, newest first.
+    """
+    try:
+        mentions = crud_comment.get_mentions_for_user(
+            db,
+            user_id=current_user.id,
+            unread_only=unread_only,
+            cursor=cursor,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    comments = crud_comment.get_by_ids(db, [mention.comment_id for mention in mentions])
+    responses = {response.id: response for response in _build_comment_responses(comments, db, current_user.id)}
+
+    next_cursor = None
+    if len(mentions) == limit:
+        next_cursor = encode_cursor(mentions[-1].created_at, mentions[-1].id)
+
+    return MentionInboxResponse(
+        items=[
+            MentionInboxItem(
+                id=mention.id,
+                comment_id=mention.comment_id,
+                created_at=mention.created_at,
+                read_at=mention.read_at,
+                comment=responses[mention.comment_id]
+            )
+            for mention in mentions
+        ],
+        next_cursor=next_cursor
+    )
+
+
+@router.get("/mentions/unread-count", response_model=MentionUnreadCount)
+def get_unread_mentions_count(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Number of unread mentions of the current user (notification badge).
+    """
+    return MentionUnreadCount(unread_count=crud_comment.count_unread_mentions(db, user_id=current_user.id))
+
+
+@router.post("/mentions/read", response_model=MentionUnreadCount)
+def mark_mentions_read(
+    mark_in: MentionMarkRead,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Mark mentions as read (all unread ones when mention_ids is omitted).
+    Returns the remaining unread count.
+    """
+    crud_comment.mark_mentions_read(db, user_id=current_user.id, mention_ids=mark_in.mention_ids)
+    return MentionUnreadCount(unread_count=crud_comment.count_unread_mentions(db, user_id=current_user.id))
+
+
+@router.get("/{comment_id}/thread", response_model=CommentWithReplies)
+def get_comment_thread(
+    comment_id: UUID,
+    replies_per_level: int = Query(50, ge=0, le=100, description="Maximum replies returned under each comment"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a comment with all its nested replies, loaded with one recursive query.
+    """
+    comment = crud_comment.get_by_id(db, comment_id=comment_id)
+    if not comment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Comment not found"
+        )
+
+    # Check workspace access
+    _check_workspace_access(
+        db,
+        user_id=current_user.id,
+        page_id=comment.page_id,
+        block_id=comment.block_id
+    )
+
+    comments = crud_comment.get_thread_comments(db, [comment.id], replies_per_level=replies_per_level)
+    return _build_comment_threads(comments, [comment.id], db, current_user.id)[0]
+
+
 @router.get("/{comment_id}", response_model=CommentResponse)
 def get_comment(
     comment_id: UUID,
@@ -305,7 +575,7 @@ def update_comment(
         )
 
     # Check workspace access
-    _check_workspace_access(
+    workspace_id = _check_workspace_access(
         db,
         user_id=current_user.id,
         page_id=comment.page_id,
@@ -320,7 +590,7 @@ def update_comment(
         )
 
     # Update comment
-    updated_comment = crud_comment.update(db, comment=comment, comment_in=comment_in)
+    updated_comment = crud_comment.update(db, comment=comment, comment_in=comment_in, workspace_id=workspace_id)
 
     # Reload with relationships
     updated_comment = crud_comment.get_by_id(db, comment_id=updated_comment.id)
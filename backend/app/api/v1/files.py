@@ -2,26 +2,46 @@
 API endpoints for file upload and management
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+import itertools
+import logging
+import os
+from urllib.parse import quote
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, status, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse as FileDownloadResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Dict, Optional, List
 from uuid import UUID
 
-from app.api.deps import get_db, get_current_active_user
+from app.api.deps import get_db, get_current_active_user, get_current_user_optional
 from app.models.user import User
 from app.models.file import FileType
 from app.schemas.file import (
     FileResponse,
     FileListResponse,
-    FileCreate,
+    UploadSessionCreate,
+    UploadSessionResponse,
     WorkspaceStorageStats
 )
+from app.core.config import settings
 from app.crud import file as crud_file
+from app.crud import storage_quota as crud_storage_quota
+from app.crud import upload_session as crud_upload_session
 from app.crud import workspace as crud_workspace
-from app.services.upload import upload_service
+from app.models.upload_session import UploadSession
+from app.services import resumable_upload, thumbnails
+from app.services.storage import LocalStorageBackend, get_storage_backend
+from app.services.upload import UploadTarget, upload_service
+from app.utils.http_range import etag_matches, parse_range
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Served inline; any other type (SVG, HTML, XML, ...) could run script in the API's
+# origin, so it is only ever served as a download
+INLINE_MIME_TYPES = {"image/png", "image/jpeg", "image/gif", "image/webp", "image/bmp", "application/pdf"}
+
 
 def verify_workspace_access(
     workspace_id: UUID,
@@ -41,8 +61,27 @@ def verify_workspace_access(
         )
 
 
+def content_headers(media_type: str, filename: str) -> Dict[str, str]:
+    """Headers for serving uploaded bytes: never sniffed, sandboxed, downloaded unless safe to show"""
+    disposition = "inline" if media_type in INLINE_MIME_TYPES else "attachment"
+    return {
+        "Content-Disposition": f"{disposition}; filename*=utf-8''{quote(filename)}",
+        "X-Content-Type-Options": "nosniff",
+        "Content-Security-Policy": "sandbox",
+    }
+
+
+def file_response(db_file) -> FileResponse:
+    """FileResponse with download URLs the client can use directly"""
+    response = FileResponse.from_orm_with_sizes(db_file)
+    response.download_url = upload_service.download_url(db_file)
+    response.thumbnail_download_url = upload_service.thumbnail_download_url(db_file)
+    return response
+
+
 @router.post("/upload", response_model=FileResponse, status_code=status.HTTP_201_CREATED)
 async def upload_file(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     workspace_id: UUID = Form(...),
     page_id: Optional[UUID] = Form(None),
@@ -52,23 +91,26 @@ async def upload_file(
     current_user: User = Depends(get_current_active_user)
 ):
     """
-    Upload a file to Cloudinary and create database record
+    Upload a file to the configured storage backend and create database record
 
     - **file**: File to upload (multipart/form-data)
     - **workspace_id**: ID of the workspace
     - **page_id**: Optional ID of the page to attach to
     - **block_id**: Optional ID of the block to attach to
     - **folder**: Optional Cloudinary folder path
+
+    The transfer and the database work run in worker threads, so a slow upload
+    does not block other requests on this worker.
     """
     # Verify workspace access
-    verify_workspace_access(workspace_id, current_user, db)
+    await run_in_threadpool(verify_workspace_access, workspace_id, current_user, db)
 
-    # Upload file to Cloudinary
+    # Upload file to storage
     try:
-        upload_result = await upload_service.upload_file(
+        file_id = await upload_service.upload_file(
             file=file,
-            folder=folder,
-            workspace_id=str(workspace_id)
+            target=UploadTarget(workspace_id, current_user.id, page_id, block_id),
+            folder=folder
         )
     except HTTPException:
         raise
@@ -78,23 +120,309 @@ async def upload_file(
             detail=f"Failed to upload file: {str(e)}"
         )
 
-    # Create database record
-    file_create = FileCreate(
-        filename=upload_result["filename"],
-        file_type=upload_result["file_type"],
-        mime_type=upload_result["mime_type"],
-        size_bytes=upload_result["size_bytes"],
-        storage_provider="cloudinary",
-        storage_url=upload_result["storage_url"],
-        storage_id=upload_result["storage_id"],
-        thumbnail_url=upload_result.get("thumbnail_url"),
-        workspace_id=workspace_id,
-        page_id=page_id,
-        block_id=block_id
+    return await run_in_threadpool(created_file_response, db, file_id, background_tasks)
+
+
+@router.post("/upload/stream", response_model=FileResponse, status_code=status.HTTP_201_CREATED)
+async def upload_file_stream(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    workspace_id: UUID,
+    filename: str = Query(..., min_length=1, max_length=255),
+    page_id: Optional[UUID] = None,
+    block_id: Optional[UUID] = None,
+    folder: Optional[str] = "notion-clone",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Upload a file sent as the raw request body
+
+    - **workspace_id**: ID of the workspace
+    - **filename**: Original filename
+    - **page_id**: Optional ID of the page to attach to
+    - **block_id**: Optional ID of the block to attach to
+    - **folder**: Optional Cloudinary folder path
+
+    The body is streamed to storage in chunks rather than buffered: a Content-Length
+    over the size limit is rejected before reading, and a body that grows past it is cut
+    off as soon as it does. The Content-Type header is checked against the file's magic bytes.
+    """
+    # Verify workspace access before reading the body
+    await run_in_threadpool(verify_workspace_access, workspace_id, current_user, db)
+
+    content_length = request.headers.get("content-length")
+    try:
+        declared_size = int(content_length) if content_length is not None else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid Content-Length"
+        )
+    if declared_size is not None:
+        await run_in_threadpool(upload_service.check_quota, db, workspace_id, declared_size)
+
+    file_id = await upload_service.upload_stream(
+        request.stream(),
+        filename=filename,
+        target=UploadTarget(workspace_id, current_user.id, page_id, block_id),
+        declared_mime_type=request.headers.get("content-type"),
+        declared_size=declared_size,
+        folder=folder
+    )
+
+    return await run_in_threadpool(created_file_response, db, file_id, background_tasks)
+
+
+def get_own_upload_session(
+    db: Session,
+    session_id: UUID,
+    user: User
+) -> UploadSession:
+    """
+    Get an unexpired upload session started by the user
+
+    Raises:
+        HTTPException: If it does not exist, has expired or belongs to someone else
+    """
+    upload_session = crud_upload_session.get_by_id(db, session_id)
+    if (
+        upload_session is None
+        or upload_session.user_id != user.id
+        or crud_upload_session.is_expired(upload_session)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload session not found"
+        )
+    return upload_session
+
+
+def upload_session_response(upload_session: UploadSession) -> UploadSessionResponse:
+    """Progress of an upload session, from the chunks on disk"""
+    chunks = resumable_upload.received_chunks(upload_session)
+    ranges = resumable_upload.received_ranges(upload_session, chunks)
+    return UploadSessionResponse(
+        id=upload_session.id,
+        workspace_id=upload_session.workspace_id,
+        filename=upload_session.filename,
+        size_bytes=upload_session.size_bytes,
+        chunk_size=upload_session.chunk_size,
+        total_chunks=upload_session.total_chunks,
+        received_chunks=chunks,
+        received_ranges=ranges,
+        received_bytes=sum(end - start for start, end in ranges),
+        expires_at=upload_session.expires_at
+    )
+
+
+@router.post("/uploads", response_model=UploadSessionResponse, status_code=status.HTTP_201_CREATED)
+def create_upload_session(
+    session_in: UploadSessionCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Start a resumable upload
+
+    - **workspace_id**: ID of the workspace
+    - **filename**: Original filename
+    - **size_bytes**: Total file size (up to RESUMABLE_UPLOAD_MAX_SIZE)
+    - **mime_type**: Optional declared MIME type
+    - **page_id** / **block_id**: Optional attachment target
+    - **folder**: Optional Cloudinary folder path
+
+    Send the file as `total_chunks` chunks of `chunk_size` bytes with
+    PUT /uploads/{id}/chunks/{index}, then POST /uploads/{id}/complete.
+    """
+    verify_workspace_access(session_in.workspace_id, current_user, db)
+
+    if session_in.size_bytes > settings.RESUMABLE_UPLOAD_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File size exceeds maximum allowed size of {settings.RESUMABLE_UPLOAD_MAX_SIZE / (1024 * 1024)}MB"
+        )
+    if not upload_service.is_allowed_type(session_in.mime_type):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"File type '{session_in.mime_type}' is not supported"
+        )
+    # Checked again (and reserved) when the upload completes
+    upload_service.check_quota(db, session_in.workspace_id, session_in.size_bytes)
+
+    upload_session = crud_upload_session.create(
+        db, session_in, current_user.id, chunk_size=settings.UPLOAD_CHUNK_SIZE
+    )
+    return upload_session_response(upload_session)
+
+
+@router.get("/uploads/{session_id}", response_model=UploadSessionResponse)
+def get_upload_session(
+    session_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get a resumable upload's progress: which chunks and byte ranges are already stored
+
+    - **session_id**: Upload session ID
+    """
+    upload_session = get_own_upload_session(db, session_id, current_user)
+    return upload_session_response(upload_session)
+
+
+@router.put("/uploads/{session_id}/chunks/{index}", response_model=UploadSessionResponse)
+async def upload_chunk(
+    session_id: UUID,
+    index: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Upload one chunk of a resumable upload as the raw request body
+
+    - **session_id**: Upload session ID
+    - **index**: Zero-based chunk number
+
+    Chunks can arrive in any order and be re-sent; each must be exactly `chunk_size`
+    bytes (the last one the remainder). Every chunk extends the session's expiry.
+    """
+    upload_session = await run_in_threadpool(get_own_upload_session, db, session_id, current_user)
+
+    await resumable_upload.write_chunk(upload_session, index, request.stream())
+
+    upload_session = await run_in_threadpool(crud_upload_session.touch, db, upload_session)
+    return await run_in_threadpool(upload_session_response, upload_session)
+
+
+@router.post("/uploads/{session_id}/complete", response_model=FileResponse, status_code=status.HTTP_201_CREATED)
+async def complete_upload_session(
+    session_id: UUID,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Assemble a resumable upload once every chunk is stored and create the file record
+
+    - **session_id**: Upload session ID
+    """
+    upload_session = await run_in_threadpool(get_own_upload_session, db, session_id, current_user)
+
+    received = await run_in_threadpool(resumable_upload.received_chunks, upload_session)
+    missing = upload_session.total_chunks - len(received)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"{missing} of {upload_session.total_chunks} chunks have not been uploaded"
+        )
+
+    # The session record goes away in the same commit that creates the file
+    target = UploadTarget(
+        upload_session.workspace_id,
+        current_user.id,
+        upload_session.page_id,
+        upload_session.block_id,
+        upload_session_id=upload_session.id
     )
+    file_id = await upload_service.upload_parts(
+        resumable_upload.chunk_paths(upload_session),
+        filename=upload_session.filename,
+        target=target,
+        declared_mime_type=upload_session.mime_type,
+        max_size=upload_session.size_bytes,
+        folder=upload_session.folder
+    )
+
+    await run_in_threadpool(resumable_upload.remove_session_files, session_id)
+    return await run_in_threadpool(created_file_response, db, file_id, background_tasks)
+
+
+@router.delete("/uploads/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+def cancel_upload_session(
+    session_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Abandon a resumable upload and discard its chunks
+
+    - **session_id**: Upload session ID
+    """
+    upload_session = get_own_upload_session(db, session_id, current_user)
+    crud_upload_session.delete(db, upload_session)
+    resumable_upload.remove_session_files(session_id)
+
+
+def created_file_response(db: Session, file_id: UUID, background_tasks: BackgroundTasks) -> FileResponse:
+    """Response for a file record an upload just created; queues its thumbnail"""
+    db_file = crud_file.get_file_by_id(db, file_id)
+    thumbnails.schedule_thumbnail(background_tasks, db_file)
+    return file_response(db_file)
+
+
+@router.get("/blob/{storage_id}")
+def download_blob(
+    storage_id: str,
+    expires: Optional[int] = None,
+    signature: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: Optional[User] = Depends(get_current_user_optional)
+):
+    """
+    Download a file from the local storage backend
+
+    - **storage_id**: SHA-256 of the file contents
+    - **expires**: Unix time a presigned URL stops working
+    - **signature**: Presigned URL signature
+
+    Without a signature this is the file's stored storage_url, which does not expire:
+    it needs an authenticated member of a workspace holding the file. Presigned URLs
+    (download_url in file responses) need no authentication but expire.
+    """
+    backend = get_storage_backend(LocalStorageBackend.name)
+    member_id = None
+    if expires is not None or signature is not None:
+        if expires is None or signature is None or not backend.verify(storage_id, expires, signature):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Invalid or expired download URL"
+            )
+    elif current_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    else:
+        member_id = current_user.id
+
+    db_file = crud_file.get_file_by_storage_id(db, LocalStorageBackend.name, storage_id, member_id=member_id)
+    if db_file is not None:
+        media_type, filename = db_file.mime_type or "application/octet-stream", db_file.filename
+    else:
+        db_file = crud_file.get_file_by_storage_id(
+            db, LocalStorageBackend.name, storage_id, thumbnail=True, member_id=member_id
+        )
+        if db_file is not None:
+            media_type, filename = "image/webp", f"thumbnail_{db_file.filename}.webp"
+    try:
+        path = backend.path(storage_id)
+    except FileNotFoundError:
+        path = None
+    if db_file is None or path is None or not os.path.exists(path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found"
+        )
 
-    db_file = crud_file.create_file(db, file_create, current_user.id)
-    return FileResponse.from_orm_with_sizes(db_file)
+    # Content-addressed, so the bytes behind this URL never change
+    return FileDownloadResponse(
+        path,
+        media_type=media_type,
+        headers={**content_headers(media_type, filename), "Cache-Control": "private, max-age=3600, immutable"}
+    )
 
 
 @router.get("/{file_id}", response_model=FileResponse)
@@ -118,7 +446,82 @@ def get_file(
     # Verify workspace access
     verify_workspace_access(db_file.workspace_id, current_user, db)
 
-    return FileResponse.from_orm_with_sizes(db_file)
+    return file_response(db_file)
+
+
+@router.get("/{file_id}/content")
+def get_file_content(
+    file_id: UUID,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Stream a file's contents from storage, with HTTP Range support for media seeking
+
+    - **file_id**: File ID
+
+    A single `Range: bytes=...` is answered with 206 and only those bytes, read from
+    storage in fixed-size chunks. The ETag is the content hash: `If-None-Match` gets a
+    304, and `If-Range` falls back to the whole file if it has changed. Only raster
+    images and PDFs are served inline; anything else is sent as an attachment.
+    """
+    db_file = crud_file.get_file_by_id(db, file_id)
+    if not db_file:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found"
+        )
+
+    # Verify workspace access
+    verify_workspace_access(db_file.workspace_id, current_user, db)
+
+    etag = f'"{db_file.content_hash}"' if db_file.content_hash else None
+    headers = {"Accept-Ranges": "bytes", "Cache-Control": "private, no-cache"}
+    if etag:
+        headers["ETag"] = etag
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    size = db_file.size_bytes
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if if_range is None or (etag is not None and if_range.strip() == etag):
+        try:
+            byte_range = parse_range(request.headers.get("range"), size)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                detail="Requested range not satisfiable",
+                headers={"Content-Range": f"bytes */{size}"}
+            )
+
+    media_type = db_file.mime_type or "application/octet-stream"
+    start, end = byte_range or (0, size - 1)
+    headers["Content-Length"] = str(end - start + 1)
+    headers.update(content_headers(media_type, db_file.filename))
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    backend = get_storage_backend(db_file.storage_provider)
+    backend.ensure_configured()
+    chunks = backend.stream(db_file.storage_id, start=start, end=end)
+    try:
+        # Opening the object before responding turns a missing one into a 404, not a cut-off body
+        first = next(chunks, b"")
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File contents not found"
+        )
+
+    return StreamingResponse(
+        itertools.chain([first], chunks),
+        status_code=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+        media_type=media_type,
+        headers=headers
+    )
 
 
 @router.get("/workspace/{workspace_id}", response_model=FileListResponse)
@@ -153,7 +556,7 @@ def get_workspace_files(
     total = crud_file.get_workspace_file_count(db, workspace_id, file_type)
 
     return FileListResponse(
-        files=[FileResponse.from_orm_with_sizes(f) for f in files],
+        files=[file_response(f) for f in files],
         total=total,
         skip=skip,
         limit=limit
@@ -183,10 +586,10 @@ def get_page_files(
         verify_workspace_access(files[0].workspace_id, current_user, db)
 
     # Get total count
-    total = len(files)  # Simple count for now
+    total = crud_file.count_files_by_page(db, page_id)
 
     return FileListResponse(
-        files=[FileResponse.from_orm_with_sizes(f) for f in files],
+        files=[file_response(f) for f in files],
         total=total,
         skip=skip,
         limit=limit
@@ -216,10 +619,10 @@ def get_block_files(
         verify_workspace_access(files[0].workspace_id, current_user, db)
 
     # Get total count
-    total = len(files)  # Simple count for now
+    total = crud_file.count_files_by_block(db, block_id)
 
     return FileListResponse(
-        files=[FileResponse.from_orm_with_sizes(f) for f in files],
+        files=[file_response(f) for f in files],
         total=total,
         skip=skip,
         limit=limit
@@ -233,12 +636,12 @@ async def delete_file(
     current_user: User = Depends(get_current_active_user)
 ):
     """
-    Delete a file (both from Cloudinary and database)
+    Delete a file (both from storage and database)
 
     - **file_id**: File ID
     """
     # Get file
-    db_file = crud_file.get_file_by_id(db, file_id)
+    db_file = await run_in_threadpool(crud_file.get_file_by_id, db, file_id)
     if not db_file:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -246,18 +649,29 @@ async def delete_file(
         )
 
     # Verify workspace access
-    verify_workspace_access(db_file.workspace_id, current_user, db)
+    await run_in_threadpool(verify_workspace_access, db_file.workspace_id, current_user, db)
 
-    # Delete from Cloudinary
-    if db_file.storage_id:
-        try:
-            await upload_service.delete_file(db_file.storage_id)
-        except Exception as e:
-            # Log error but continue with database deletion
-            print(f"Failed to delete file from Cloudinary: {e}")
+    await purge_file(db, db_file)
 
-    # Delete from database
-    crud_file.delete_file(db, file_id)
+
+async def purge_file(db: Session, db_file) -> None:
+    """
+    Delete a file record, then the stored objects nothing references any more (duplicated
+    pages and deduplicated uploads share them). The record's deletion commits after the
+    objects are gone, so the content hash lock keeps a concurrent upload from reusing them.
+    Objects are deleted through the upload service, within its transfer limit and timeout.
+    """
+    provider = db_file.storage_provider
+    unreferenced = await run_in_threadpool(crud_file.delete_file_locked, db, db_file)
+    try:
+        for storage_id in unreferenced:
+            try:
+                await upload_service.delete_file(storage_id, provider)
+            except HTTPException:
+                # The record is gone either way; the orphaned object is left to the collector
+                logger.exception("Failed to delete stored object %s from %s", storage_id, provider)
+    finally:
+        await run_in_threadpool(db.commit)
 
 
 @router.get("/workspace/{workspace_id}/stats", response_model=WorkspaceStorageStats)
@@ -267,31 +681,32 @@ def get_workspace_storage_stats(
     current_user: User = Depends(get_current_active_user)
 ):
     """
-    Get storage statistics for a workspace
+    Get storage statistics for a workspace, including its storage quota
 
     - **workspace_id**: Workspace ID
     """
     # Verify workspace access
     verify_workspace_access(workspace_id, current_user, db)
 
-    # Get total storage usage
-    total_size_bytes = crud_file.get_workspace_storage_usage(db, workspace_id)
+    # One rollup read (PostgreSQL) or one grouped query for every number below
+    summary = crud_file.get_workspace_storage_summary(db, workspace_id)
+    total_files = sum(count for count, _ in summary.values())
+    total_size_bytes = sum(total for _, total in summary.values())
     total_size_mb = round(total_size_bytes / (1024 * 1024), 2)
+    files_by_type = {file_type.value: count for file_type, (count, _) in summary.items() if count > 0}
 
-    # Get total file count
-    total_files = crud_file.get_workspace_file_count(db, workspace_id)
-
-    # Get file counts by type
-    files_by_type = {}
-    for file_type in FileType:
-        count = crud_file.get_workspace_file_count(db, workspace_id, file_type)
-        if count > 0:
-            files_by_type[file_type.value] = count
+    _, reserved_bytes, quota_bytes = crud_storage_quota.get_usage(db, workspace_id)
+    available_bytes = None
+    if quota_bytes is not None:
+        available_bytes = max(quota_bytes - total_size_bytes - reserved_bytes, 0)
 
     return WorkspaceStorageStats(
         workspace_id=workspace_id,
         total_files=total_files,
         total_size_bytes=total_size_bytes,
         total_size_mb=total_size_mb,
-        files_by_type=files_by_type
+        files_by_type=files_by_type,
+        quota_bytes=quota_bytes,
+        reserved_bytes=reserved_bytes,
+        available_bytes=available_bytes
     )
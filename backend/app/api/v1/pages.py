@@ -1,20 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from uuid import UUID
+import logging
 from app.api.deps import get_db, get_current_active_user
 from app.crud import page as crud_page
 from app.crud import workspace as crud_workspace
 from app.crud import page_version as crud_page_version
 from app.crud import page_favorite as crud_page_favorite
 from app.schemas.page import PageCreate, PageUpdate, PageMove, PageResponse, PageWithBlocks, PageTree
-from app.schemas.page_version import PageVersionResponse, PageVersionListItem
+from app.schemas.page_version import PageVersionCreate, PageVersionResponse, PageVersionListItem, PageVersionDiffResponse
 from app.schemas.page_favorite import PageFavoriteResponse, PageFavoriteStatus
 from app.models.user import User
+from app.services.version_diff import diff_versions
+from app.services.versioning import track_edit, versioning_policy
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+def hydrate_version(db: Session, version):
+    """Load a version's blocks; 500 if some of its block blobs are missing"""
+    try:
+        return crud_page_version.hydrate(db, version)
+    except LookupError as e:
+        logger.error("Incomplete version snapshot: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Version snapshot is incomplete"
+        )
+
+
 @router.get("/", response_model=List[PageResponse])
 def list_pages(
     workspace_id: UUID = Query(..., description="Workspace ID"),
@@ -95,10 +112,12 @@ def get_page_tree(
 @router.get("/trash", response_model=List[PageResponse])
 def list_trash(
     workspace_id: UUID = Query(..., description="Workspace ID"),
+    skip: int = Query(0, ge=0, description="Number of pages to skip"),
+    limit: int = Query(100, ge=1, le=500, description="Maximum number of pages to return"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """List all pages in trash (archived pages)"""
+    """List pages in trash (archived pages), most recently archived first"""
     # Check if user is a member of the workspace
     if not crud_workspace.is_member(db, workspace_id=workspace_id, user_id=current_user.id):
         raise HTTPException(
@@ -106,7 +125,7 @@ def list_trash(
             detail="Not a member of this workspace"
         )
 
-    archived_pages = crud_page.get_archived(db, workspace_id=workspace_id)
+    archived_pages = crud_page.get_archived(db, workspace_id=workspace_id, skip=skip, limit=limit)
     return archived_pages
 
 
@@ -172,14 +191,18 @@ def update_page(
             detail="Not a member of this workspace"
         )
 
-    updated_page = crud_page.update(
-        db,
-        page=page,
-        page_in=page_in,
-        created_by=current_user.id,
-        change_summary=change_summary
-    )
-    return updated_page
+    update_data = page_in.model_dump(exclude_unset=True)
+    if update_data:
+        # Before the update, so a significant change can save the state it replaces
+        track_edit(
+            db,
+            page=page,
+            user_id=current_user.id,
+            significant=any(field in update_data for field in ("title", "icon", "cover_image")),
+            change_summary=change_summary
+        )
+
+    return crud_page.update(db, page=page, page_in=page_in)
 
 
 @router.post("/{page_id}/restore", response_model=PageResponse)
@@ -367,10 +390,11 @@ def delete_page_permanently(
 def duplicate_page(
     page_id: UUID,
     include_blocks: bool = Query(True, description="Include blocks in duplication"),
+    include_subpages: bool = Query(False, description="Also duplicate the (non-archived) subpage tree"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Duplicate a page with all its blocks"""
+    """Duplicate a page with its blocks, tags and files, optionally with its subpages"""
     page = crud_page.get_by_id(db, page_id=page_id)
     if not page:
         raise HTTPException(
@@ -386,23 +410,63 @@ def duplicate_page(
         )
 
     # Duplicate the page
-    duplicated_page = crud_page.duplicate(
-        db,
+    try:
+        duplicated_page = crud_page.duplicate(
+            db,
+            page=page,
+            created_by=current_user.id,
+            include_blocks=include_blocks,
+            include_subpages=include_subpages
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_507_INSUFFICIENT_STORAGE,
+            detail=str(e)
+        )
+    return duplicated_page
+
+
+@router.post("/{page_id}/versions", response_model=PageVersionListItem, status_code=status.HTTP_201_CREATED)
+def create_page_version(
+    page_id: UUID,
+    version_in: PageVersionCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Save a version of the page now, regardless of the automatic versioning policy"""
+    page = crud_page.get_by_id(db, page_id=page_id)
+    if not page:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Page not found"
+        )
+
+    # Check if user is a member of the workspace
+    if not crud_workspace.is_member(db, workspace_id=page.workspace_id, user_id=current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not a member of this workspace"
+        )
+
+    version = crud_page_version.create_version(
+        db=db,
         page=page,
         created_by=current_user.id,
-        include_blocks=include_blocks
+        change_summary=version_in.change_summary
     )
-    return duplicated_page
+    versioning_policy.record_version(page_id)
+    return PageVersionListItem.model_validate(version)
 
 
 @router.get("/{page_id}/versions", response_model=List[PageVersionListItem])
 def list_page_versions(
     page_id: UUID,
     limit: int = Query(50, ge=1, le=100, description="Maximum number of versions to return"),
+    before: Optional[int] = Query(None, ge=1, description="Only return versions older than this version_number"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """List all versions of a page"""
+    """List versions of a page, newest first (keyset paginated via `before`)"""
     page = crud_page.get_by_id(db, page_id=page_id)
     if not page:
         raise HTTPException(
@@ -417,23 +481,9 @@ def list_page_versions(
             detail="Not a member of this workspace"
         )
 
-    versions = crud_page_version.get_versions(db, page_id=page_id, limit=limit)
-
-    # Convert to PageVersionListItem with blocks_count
-    result = []
-    for version in versions:
-        version_data = {
-            "id": version.id,
-            "version_number": version.version_number,
-            "title": version.title,
-            "created_at": version.created_at,
-            "created_by": version.created_by,
-            "change_summary": version.change_summary,
-            "blocks_count": len(version.content_snapshot)
-        }
-        result.append(PageVersionListItem(**version_data))
-
-    return result
+    # Only list columns are loaded; blocks_count is stored when the version is created
+    versions = crud_page_version.get_versions(db, page_id=page_id, limit=limit, before_version=before)
+    return [PageVersionListItem.model_validate(version) for version in versions]
 
 
 @router.get("/{page_id}/versions/{version_number}", response_model=PageVersionResponse)
@@ -458,20 +508,73 @@ def get_page_version(
             detail="Not a member of this workspace"
         )
 
-    version = crud_page_version.get_version(db, page_id=page_id, version_number=version_number)
+    version = crud_page_version.get_version(
+        db, page_id=page_id, version_number=version_number, load_blocks=False
+    )
     if not version:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Version not found"
         )
+    hydrate_version(db, version)
 
     return version
 
 
+@router.get("/{page_id}/versions/{version_a}/diff/{version_b}", response_model=PageVersionDiffResponse)
+def diff_page_versions(
+    page_id: UUID,
+    version_a: int,
+    version_b: int,
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Block-level diff from version_a to version_b (added, removed, moved and changed blocks).
+    Versions are immutable, so the diff is cacheable per version pair via ETag.
+    """
+    page = crud_page.get_by_id(db, page_id=page_id)
+    if not page:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Page not found"
+        )
+
+    # Check if user is a member of the workspace
+    if not crud_workspace.is_member(db, workspace_id=page.workspace_id, user_id=current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not a member of this workspace"
+        )
+
+    old_version = crud_page_version.get_version(db, page_id=page_id, version_number=version_a, load_blocks=False)
+    new_version = crud_page_version.get_version(db, page_id=page_id, version_number=version_b, load_blocks=False)
+    if not old_version or not new_version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Version not found"
+        )
+
+    # Version IDs identify the pair, so unchanged diffs are answered before loading any blocks
+    etag = f'"{old_version.id}.{new_version.id}"'
+    cache_headers = {"ETag": etag, "Cache-Control": "private, max-age=31536000, immutable"}
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+
+    hydrate_version(db, old_version)
+    hydrate_version(db, new_version)
+
+    response.headers.update(cache_headers)
+    return diff_versions(old_version, new_version)
+
+
 @router.post("/{page_id}/versions/{version_number}/restore", response_model=PageResponse)
 def restore_page_version(
     page_id: UUID,
     version_number: int,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -490,66 +593,28 @@ def restore_page_version(
             detail="Not a member of this workspace"
         )
 
-    version = crud_page_version.get_version(db, page_id=page_id, version_number=version_number)
+    version = crud_page_version.get_version(
+        db, page_id=page_id, version_number=version_number, load_blocks=False
+    )
     if not version:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Version not found"
         )
+    hydrate_version(db, version)
 
-    # Create a new version before restoring (to preserve current state)
-    crud_page_version.create_version(
-        db=db,
+    # Snapshot is hydrated above, outside the write transaction
+    timings = crud_page_version.restore_version(
+        db,
         page=page,
-        created_by=current_user.id,
-        change_summary=f"Before restoring to version {version_number}"
+        version=version,
+        restored_by=current_user.id
     )
+    versioning_policy.record_version(page_id)
 
-    # Restore page metadata
-    page.title = version.title
-    page.icon = version.icon
-    page.cover_image = version.cover_image
-
-    # Delete current blocks
-    from app.models.block import Block
-    db.query(Block).filter(Block.page_id == page_id).delete()
-
-    # Restore blocks from snapshot
-    block_id_map = {}  # Map old IDs to new IDs for parent_block_id references
-
-    for block_data in version.content_snapshot:
-        from uuid import uuid4
-        old_id = UUID(block_data["id"])
-        new_id = uuid4()
-        block_id_map[old_id] = new_id
-
-        new_block = Block(
-            id=new_id,
-            page_id=page_id,
-            type=block_data["type"],
-            content=block_data["content"],
-            order=block_data["order"],
-            parent_block_id=None  # Will be set in second pass
-        )
-        db.add(new_block)
-
-    db.flush()
-
-    # Second pass: restore parent_block_id references
-    for block_data in version.content_snapshot:
-        if block_data.get("parent_block_id"):
-            old_id = UUID(block_data["id"])
-            old_parent_id = UUID(block_data["parent_block_id"])
-            new_id = block_id_map.get(old_id)
-            new_parent_id = block_id_map.get(old_parent_id)
-
-            if new_id and new_parent_id:
-                block = db.query(Block).filter(Block.id == new_id).first()
-                if block:
-                    block.parent_block_id = new_parent_id
-
-    db.commit()
-    db.refresh(page)
+    response.headers["Server-Timing"] = ", ".join(
+        f"{phase};dur={duration:.1f}" for phase, duration in timings.items()
+    )
     return page
 
 
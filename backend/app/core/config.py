@@ -32,10 +32,30 @@ class Settings(BaseSettings):
     SMTP_USER: str = ""
     SMTP_PASSWORD: str = ""
 
+    # Page versioning policy
+    VERSION_COALESCE_MINUTES: int = 10  # At most one automatic version per page in this window
+    VERSION_EDIT_THRESHOLD: int = 5  # Edits needed before an automatic version (title/icon/cover count as all of them)
+    VERSION_RETENTION_KEEP_ALL_DAYS: int = 30  # Every version younger than this is kept
+    VERSION_RETENTION_DAILY_DAYS: int = 180  # Older versions keep one per day until this age, then one per week
+    TRASH_RETENTION_DAYS: int = 30  # Archived pages are purged this many days after being moved to trash
+
+    # File storage: "cloudinary", "local" or "auto" (Cloudinary when configured, local disk otherwise)
+    STORAGE_BACKEND: str = "auto"
+    LOCAL_STORAGE_PATH: str = "storage"  # Root directory of the local backend
+    STORAGE_URL_EXPIRE_SECONDS: int = 3600  # Lifetime of presigned local download URLs
+
     # Cloudinary (File Upload)
     CLOUDINARY_CLOUD_NAME: str = ""
     CLOUDINARY_API_KEY: str = ""
     CLOUDINARY_API_SECRET: str = ""
+    UPLOAD_MAX_CONCURRENCY: int = 4  # Storage transfers running at once per worker
+    UPLOAD_TIMEOUT_SECONDS: int = 120  # A storage transfer taking longer than this fails with 504
+    RESUMABLE_UPLOAD_MAX_SIZE: int = 500 * 1024 * 1024  # Size limit for chunked (resumable) uploads
+    UPLOAD_CHUNK_SIZE: int = 5 * 1024 * 1024  # Chunk size of resumable uploads (last chunk may be smaller)
+    UPLOAD_SESSION_TTL_HOURS: int = 24  # Resumable uploads idle this long are garbage-collected
+    THUMBNAIL_MAX_SIZE: int = 400  # Longest side of generated image thumbnails, in pixels
+    THUMBNAIL_WORKERS: int = 2  # Processes in the thumbnail worker pool
+    WORKSPACE_STORAGE_QUOTA_BYTES: int = 5 * 1024 * 1024 * 1024  # Default per-workspace quota (0: unlimited)
 
     @property
     def is_cloudinary_configured(self) -> bool:
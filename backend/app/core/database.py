@@ -1,6 +1,7 @@
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
 
 # PostgreSQL engine configuration
@@ -24,3 +25,13 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def dialect_insert(db: Session, table):
+    """
+    INSERT construct for the session's dialect, exposing ON CONFLICT clauses
+    (on_conflict_do_nothing / on_conflict_do_update) on PostgreSQL and SQLite.
+    """
+    if db.bind.dialect.name == 'postgresql':
+        return postgresql.insert(table)
+    return sqlite.insert(table)
@@ -1,6 +1,7 @@
+from sqlalchemy import insert, update as sql_update
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from uuid import UUID
+from typing import Iterator, List, Optional, Dict, Any
+from uuid import UUID, uuid4
 from app.models.block import Block
 from app.schemas.block import BlockCreate, BlockUpdate, BlockMove
 
@@ -32,6 +33,12 @@ def get_by_page(db: Session, page_id: UUID) -> List[Block]:
     ).order_by(Block.order).all()
 
 
+def iter_contents(db: Session, batch_size: int = 1000) -> Iterator[Any]:
+    """Yield the content of every block, fetching batch_size rows at a time"""
+    for (content,) in db.query(Block.content).yield_per(batch_size):
+        yield content
+
+
 def update(db: Session, block: Block, block_in: BlockUpdate) -> Block:
     """Update block"""
     update_data = block_in.model_dump(exclude_unset=True)
@@ -56,3 +63,111 @@ def delete(db: Session, block: Block) -> None:
     """Delete block"""
     db.delete(block)
     db.commit()
+
+
+def _parents_first(blocks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Order blocks so every parent precedes its children"""
+    ids = {block["id"] for block in blocks}
+    children: Dict[Any, List[Dict[str, Any]]] = {}
+    roots = []
+    for block in blocks:
+        parent_id = block.get("parent_block_id")
+        if parent_id is not None and parent_id in ids and parent_id != block["id"]:
+            children.setdefault(parent_id, []).append(block)
+        else:
+            roots.append(block)
+
+    ordered = []
+    queue = roots
+    while queue:
+        ordered.extend(queue)
+        queue = [child for block in queue for child in children.pop(block["id"], [])]
+
+    # Blocks caught in a parent cycle are never reached from a root; keep them top-level
+    placed = {id(block) for block in ordered}
+    for block in blocks:
+        if id(block) not in placed:
+            ordered.append(dict(block, parent_block_id=None))
+    return ordered
+
+
+def bulk_copy(
+    db: Session,
+    blocks: List[Dict[str, Any]],
+    page_id_map: Dict[UUID, UUID]
+) -> Dict[Any, UUID]:
+    """
+    Insert copies of blocks with fresh IDs in a single bulk INSERT (does not commit).
+    `blocks` are dicts with id, page_id, parent_block_id, type, content and order;
+    page_id_map maps each source page ID to the page receiving its copies.
+    Parent references are remapped in memory; a parent outside the copied set makes the copy top-level.
+    Returns the mapping of source block ID to new block ID.
+    """
+    if not blocks:
+        return {}
+
+    ordered = _parents_first(blocks)
+    block_id_map = {block["id"]: uuid4() for block in ordered}
+
+    rows = [
+        {
+            "id": block_id_map[block["id"]],
+            "page_id": page_id_map[block["page_id"]],
+            "parent_block_id": block_id_map.get(block.get("parent_block_id")),
+            "type": block["type"],
+            "content": block["content"] if block["content"] is not None else {},
+            "order": block["order"],
+        }
+        for block in ordered
+    ]
+    db.execute(insert(Block), rows)
+    return block_id_map
+
+
+def bulk_restore(db: Session, page_id: UUID, blocks: List[Dict[str, Any]]) -> None:
+    """
+    Make a page's blocks match snapshot blocks, keeping the snapshot's block IDs (does not commit).
+    `blocks` are dicts with id, parent_block_id, type, content and order.
+    Blocks missing from the page are inserted, changed ones updated in place and only the
+    page's blocks absent from the snapshot are deleted, so comments and files attached to
+    restored blocks stay. A parent outside the snapshot makes the block top-level.
+    """
+    ordered = _parents_first(blocks)
+    ids = {block["id"] for block in ordered}
+    rows = [
+        {
+            "id": UUID(str(block["id"])),
+            "parent_block_id": (
+                UUID(str(block["parent_block_id"])) if block.get("parent_block_id") in ids else None
+            ),
+            "type": block["type"],
+            "content": block["content"] if block["content"] is not None else {},
+            "order": block["order"],
+        }
+        for block in ordered
+    ]
+
+    current = {
+        row.id: row
+        for row in db.query(
+            Block.id, Block.parent_block_id, Block.type, Block.content, Block.order
+        ).filter(Block.page_id == page_id)
+    }
+    # Parents first, so each new block's parent exists (or comes earlier in the INSERT)
+    new_rows = [dict(row, page_id=page_id) for row in rows if row["id"] not in current]
+    changed_rows = [
+        row for row in rows
+        if row["id"] in current and tuple(current[row["id"]][1:]) != (
+            row["parent_block_id"], row["type"], row["content"], row["order"]
+        )
+    ]
+    if new_rows:
+        db.execute(insert(Block), new_rows)
+    if changed_rows:
+        db.execute(sql_update(Block), changed_rows)
+
+    # Last, so no restored block still hangs below a deleted one
+    db.query(Block).filter(
+        Block.page_id == page_id,
+        Block.id.notin_([row["id"] for row in rows])
+    ).delete(synchronize_session=False)
@@ -1,16 +1,19 @@
 from sqlalchemy.orm import Session, joinedload, selectinload
-from sqlalchemy import func, and_, or_
-from typing import List, Optional, Tuple
+from sqlalchemy import func, and_, or_, case, select, union_all
+from typing import Dict, List, Optional, Set, Tuple
 from uuid import UUID
 from datetime import datetime
 import re
 
+from app.models.block import Block
+from app.models.page import Page
 from app.models.comment import Comment
 from app.models.comment_mention import CommentMention
 from app.models.comment_reaction import CommentReaction
 from app.models.comment_attachment import CommentAttachment
 from app.models.workspace_member import WorkspaceMember
 from app.schemas.comment import CommentCreate, CommentUpdate, ReactionSummary
+from app.utils.pagination import after_cursor
 
 
 def _parse_mentions(content: str) -> List[UUID]:
@@ -39,6 +42,29 @@ def _parse_mentions(content: str) -> List[UUID]:
     return uuids
 
 
+def _adjust_reply_count(db: Session, comment_id: UUID, delta: int) -> None:
+    """Atomically add delta to a comment's reply_count (never below zero)"""
+    query = db.query(Comment).filter(Comment.id == comment_id)
+    if delta < 0:
+        query = query.filter(Comment.reply_count >= -delta)
+    query.update({Comment.reply_count: Comment.reply_count + delta}, synchronize_session=False)
+
+
+def _valid_mentions(db: Session, content: str, workspace_id: UUID) -> List[UUID]:
+    """Mentioned user IDs (in order) that are members of the workspace, checked with one query"""
+    mentioned_user_ids = _parse_mentions(content)
+    if not mentioned_user_ids:
+        return []
+
+    members = {
+        row.user_id for row in db.query(WorkspaceMember.user_id).filter(
+            WorkspaceMember.workspace_id == workspace_id,
+            WorkspaceMember.user_id.in_(mentioned_user_ids)
+        )
+    }
+    return [user_id for user_id in mentioned_user_ids if user_id in members]
+
+
 def _calculate_thread_depth(db: Session, parent_comment_id: Optional[UUID]) -> int:
     """Calculate thread depth for a new comment"""
     if not parent_comment_id:
@@ -77,20 +103,11 @@ def create(db: Session, comment_in: CommentCreate, author_id: UUID, workspace_id
     db.add(comment)
     db.flush()  # Get comment.id without committing
 
-    # Parse and create mentions
-    mentioned_user_ids = _parse_mentions(comment_in.content)
-
-    # Validate that mentioned users are workspace members
-    for user_id in mentioned_user_ids:
-        is_member = db.query(WorkspaceMember).filter(
-            WorkspaceMember.workspace_id == workspace_id,
-            WorkspaceMember.user_id == user_id
-        ).first() is not None
-
-        if not is_member:
-            # Skip invalid mentions (user not in workspace)
-            continue
+    if comment.parent_comment_id:
+        _adjust_reply_count(db, comment.parent_comment_id, 1)
 
+    # Parse mentions, keeping only workspace members
+    for user_id in _valid_mentions(db, comment_in.content, workspace_id):
         mention = CommentMention(
             comment_id=comment.id,
             mentioned_user_id=user_id
@@ -102,6 +119,16 @@ def create(db: Session, comment_in: CommentCreate, author_id: UUID, workspace_id
     return comment
 
 
+def _response_load_options():
+    """Eager loads for everything a comment response embeds besides aggregates"""
+    return (
+        joinedload(Comment.author),
+        joinedload(Comment.deleted_by_user),
+        selectinload(Comment.mentions).joinedload(CommentMention.mentioned_user),
+        selectinload(Comment.attachments).joinedload(CommentAttachment.uploader),
+    )
+
+
 def get_by_id(
     db: Session,
     comment_id: UUID,
@@ -111,11 +138,7 @@ def get_by_id(
     Get comment by ID with eager loading to prevent N+1 queries.
     """
     query = db.query(Comment).options(
-        joinedload(Comment.author),
-        joinedload(Comment.deleted_by_user),
-        selectinload(Comment.reactions),
-        selectinload(Comment.mentions),
-        selectinload(Comment.attachments)
+        *_response_load_options()
     ).filter(Comment.id == comment_id)
 
     if not include_deleted:
@@ -124,92 +147,194 @@ def get_by_id(
     return query.first()
 
 
-def get_by_page(
+def _get_top_level(
     db: Session,
-    page_id: UUID,
-    limit: int = 20,
-    offset: int = 0,
-    include_deleted: bool = False
-) -> Tuple[List[Comment], int]:
+    target_filter,
+    limit: int,
+    offset: int,
+    include_deleted: bool,
+    cursor: Optional[str],
+    include_total: bool
+) -> Tuple[List[Comment], Optional[int]]:
     """
-    Get top-level comments for a page with pagination.
-    Returns (comments, total_count).
+    Top-level comments matching target_filter, newest first on (created_at, id).
+    With a cursor the listing continues after it (keyset, offset ignored); raises
+    ValueError on a malformed cursor. The total is only counted when include_total.
     """
-    # Base query for top-level comments only
     base_query = db.query(Comment).filter(
-        Comment.page_id == page_id,
+        target_filter,
         Comment.parent_comment_id.is_(None)
     )
 
     if not include_deleted:
         base_query = base_query.filter(Comment.is_deleted == False)
 
-    # Count total
-    total = base_query.count()
+    total = base_query.count() if include_total else None
 
-    # Get paginated results with eager loading
-    comments = base_query.options(
-        joinedload(Comment.author),
-        joinedload(Comment.deleted_by_user),
-        selectinload(Comment.reactions),
-        selectinload(Comment.mentions),
-        selectinload(Comment.attachments),
-        selectinload(Comment.replies)  # Load first-level replies
-    ).order_by(Comment.created_at.desc()).offset(offset).limit(limit).all()
+    # Reactions and reply counts come from stored counters (see _build_comment_responses)
+    query = base_query.options(
+        *_response_load_options()
+    ).order_by(Comment.created_at.desc(), Comment.id.desc())
+
+    if cursor:
+        query = query.filter(after_cursor(Comment.created_at, Comment.id, cursor))
+    elif offset:
+        query = query.offset(offset)
+
+    comments = query.limit(limit).all()
 
     return comments, total
 
 
+def get_by_page(
+    db: Session,
+    page_id: UUID,
+    limit: int = 20,
+    offset: int = 0,
+    include_deleted: bool = False,
+    cursor: Optional[str] = None,
+    include_total: bool = True
+) -> Tuple[List[Comment], Optional[int]]:
+    """
+    Get top-level comments for a page, keyset (cursor) or offset paginated.
+    Returns (comments, total_count or None).
+    """
+    return _get_top_level(
+        db, Comment.page_id == page_id, limit, offset, include_deleted, cursor, include_total
+    )
+
+
 def get_by_block(
     db: Session,
     block_id: UUID,
     limit: int = 20,
     offset: int = 0,
-    include_deleted: bool = False
-) -> Tuple[List[Comment], int]:
+    include_deleted: bool = False,
+    cursor: Optional[str] = None,
+    include_total: bool = True
+) -> Tuple[List[Comment], Optional[int]]:
     """
-    Get top-level comments for a block with pagination.
-    Returns (comments, total_count).
+    Get top-level comments for a block, keyset (cursor) or offset paginated.
+    Returns (comments, total_count or None).
     """
-    # Base query for top-level comments only
-    base_query = db.query(Comment).filter(
-        Comment.block_id == block_id,
-        Comment.parent_comment_id.is_(None)
+    return _get_top_level(
+        db, Comment.block_id == block_id, limit, offset, include_deleted, cursor, include_total
     )
 
-    if not include_deleted:
-        base_query = base_query.filter(Comment.is_deleted == False)
 
-    # Count total
-    total = base_query.count()
+def get_thread_comments(
+    db: Session,
+    root_ids: List[UUID],
+    replies_per_level: int = 20
+) -> List[Comment]:
+    """
+    Load whole comment threads under the given roots with one recursive query.
+    At most replies_per_level replies (oldest first) are kept under each comment;
+    replies under a cut-off reply are dropped with it. Soft-deleted replies are kept
+    so their own replies stay attached. Returns a flat list; callers assemble the tree.
+    """
+    if not root_ids:
+        return []
+
+    tree = select(Comment.id).where(Comment.id.in_(root_ids)).cte(name="comment_tree", recursive=True)
+    tree = tree.union_all(select(Comment.id).where(Comment.parent_comment_id == tree.c.id))
+
+    ranked = select(
+        Comment.id,
+        func.row_number().over(
+            partition_by=Comment.parent_comment_id,
+            order_by=(Comment.created_at, Comment.id)
+        ).label("position")
+    ).join(tree, tree.c.id == Comment.id).subquery()
+
+    selected_ids = select(ranked.c.id).where(
+        or_(ranked.c.id.in_(root_ids), ranked.c.position <= replies_per_level)
+    )
 
-    # Get paginated results with eager loading
-    comments = base_query.options(
-        joinedload(Comment.author),
-        joinedload(Comment.deleted_by_user),
-        selectinload(Comment.reactions),
-        selectinload(Comment.mentions),
-        selectinload(Comment.attachments),
-        selectinload(Comment.replies)  # Load first-level replies
-    ).order_by(Comment.created_at.desc()).offset(offset).limit(limit).all()
+    return db.query(Comment).options(
+        *_response_load_options()
+    ).filter(Comment.id.in_(selected_ids)).order_by(Comment.created_at, Comment.id).all()
 
-    return comments, total
 
+def get_page_summaries(
+    db: Session,
+    page_ids: List[UUID],
+    user_id: UUID
+) -> Dict[UUID, Dict[str, int]]:
+    """
+    Comment counts for many pages with one grouped query.
+    Counts non-deleted comments on each page and on its blocks:
+    total, open_threads (top-level comments) and mentions_me (comments mentioning user_id).
+    Pages without comments are absent from the result.
+    """
+    if not page_ids:
+        return {}
 
-def update(db: Session, comment: Comment, comment_in: CommentUpdate) -> Comment:
+    page_comments = select(
+        Comment.page_id.label("page_id"), Comment.id, Comment.parent_comment_id
+    ).where(
+        Comment.page_id.in_(page_ids),
+        Comment.is_deleted == False
+    )
+    block_comments = select(
+        Block.page_id.label("page_id"), Comment.id, Comment.parent_comment_id
+    ).join(
+        Block, Block.id == Comment.block_id
+    ).where(
+        Block.page_id.in_(page_ids),
+        Comment.is_deleted == False
+    )
+    comments = union_all(page_comments, block_comments).subquery()
+
+    rows = db.query(
+        comments.c.page_id,
+        func.count(comments.c.id).label("total"),
+        func.sum(case((comments.c.parent_comment_id.is_(None), 1), else_=0)).label("open_threads"),
+        func.count(CommentMention.id).label("mentions_me")
+    ).outerjoin(
+        CommentMention,
+        and_(
+            CommentMention.comment_id == comments.c.id,
+            CommentMention.mentioned_user_id == user_id
+        )
+    ).group_by(comments.c.page_id).all()
+
+    return {
+        row.page_id: {
+            "total": row.total,
+            "open_threads": row.open_threads or 0,
+            "mentions_me": row.mentions_me,
+        }
+        for row in rows
+    }
+
+
+def update(db: Session, comment: Comment, comment_in: CommentUpdate, workspace_id: UUID) -> Comment:
     """
     Update comment content and re-parse mentions.
+    Mentions of non-members are dropped; mentions kept across the edit keep their read state.
     """
     # Update content
     comment.content = comment_in.content
     comment.edited_at = datetime.utcnow()
 
-    # Delete old mentions
-    db.query(CommentMention).filter(CommentMention.comment_id == comment.id).delete()
+    mentioned_user_ids = _valid_mentions(db, comment_in.content, workspace_id)
+
+    # Delete mentions no longer present
+    removed = db.query(CommentMention).filter(CommentMention.comment_id == comment.id)
+    if mentioned_user_ids:
+        removed = removed.filter(CommentMention.mentioned_user_id.notin_(mentioned_user_ids))
+    removed.delete(synchronize_session=False)
 
-    # Parse and create new mentions
-    mentioned_user_ids = _parse_mentions(comment_in.content)
+    # Create the new ones
+    existing = {
+        row.mentioned_user_id for row in db.query(CommentMention.mentioned_user_id).filter(
+            CommentMention.comment_id == comment.id
+        )
+    }
     for user_id in mentioned_user_ids:
+        if user_id in existing:
+            continue
         mention = CommentMention(
             comment_id=comment.id,
             mentioned_user_id=user_id
@@ -225,6 +350,9 @@ def soft_delete(db: Session, comment: Comment, deleted_by: UUID) -> Comment:
     """
     Soft delete comment: mark as deleted and redact content.
     """
+    if not comment.is_deleted and comment.parent_comment_id:
+        _adjust_reply_count(db, comment.parent_comment_id, -1)
+
     comment.is_deleted = True
     comment.deleted_at = datetime.utcnow()
     comment.deleted_by = deleted_by
@@ -240,51 +368,165 @@ def hard_delete(db: Session, comment: Comment) -> None:
     Permanently delete comment (workspace owner only).
     Cascades to reactions, mentions, attachments, and replies.
     """
+    if not comment.is_deleted and comment.parent_comment_id:
+        _adjust_reply_count(db, comment.parent_comment_id, -1)
+
     db.delete(comment)
     db.commit()
 
 
-def get_reaction_summary(
+def get_user_reaction_types(
     db: Session,
-    comment_id: UUID,
-    current_user_id: Optional[UUID] = None
-) -> List[ReactionSummary]:
+    comment_ids: List[UUID],
+    user_id: UUID
+) -> Dict[UUID, Set[str]]:
+    """Reaction types the user has on each of the given comments (one query)"""
+    if not comment_ids:
+        return {}
+
+    reacted: Dict[UUID, Set[str]] = {}
+    for comment_id, reaction_type in db.query(
+        CommentReaction.comment_id, CommentReaction.reaction_type
+    ).filter(
+        CommentReaction.comment_id.in_(comment_ids),
+        CommentReaction.user_id == user_id
+    ):
+        reacted.setdefault(comment_id, set()).add(reaction_type)
+    return reacted
+
+
+def build_reaction_summary(comment: Comment, user_reaction_types: Set[str]) -> List[ReactionSummary]:
+    """Reaction summary from the comment's stored reaction_counts"""
+    return [
+        ReactionSummary(
+            reaction_type=reaction_type,
+            count=count,
+            user_reacted=(reaction_type in user_reaction_types)
+        )
+        for reaction_type, count in (comment.reaction_counts or {}).items()
+        if count > 0
+    ]
+
+
+def recompute_counters(db: Session, comment_ids: List[UUID]) -> int:
     """
-    Get aggregated reaction summary for a comment.
-    Returns list of ReactionSummary with counts and user_reacted flag.
+    Recompute reply_count and reaction_counts from the source tables (repair/backfill).
+    Locks the comments while recomputing. Returns how many comments were corrected;
+    does not commit.
     """
-    # Aggregate reactions by type
-    reactions_query = db.query(
+    comments = db.query(Comment).filter(
+        Comment.id.in_(comment_ids)
+    ).with_for_update().populate_existing().all()
+    if not comments:
+        return 0
+
+    replies_counts = get_replies_counts(db, comment_ids)
+    reaction_counts: Dict[UUID, Dict[str, int]] = {}
+    for comment_id, reaction_type, count in db.query(
+        CommentReaction.comment_id,
         CommentReaction.reaction_type,
-        func.count(CommentReaction.id).label('count')
+        func.count(CommentReaction.id)
     ).filter(
-        CommentReaction.comment_id == comment_id
-    ).group_by(CommentReaction.reaction_type).all()
-
-    # Check which reactions current user has
-    user_reactions = set()
-    if current_user_id:
-        user_reactions_query = db.query(CommentReaction.reaction_type).filter(
-            CommentReaction.comment_id == comment_id,
-            CommentReaction.user_id == current_user_id
-        ).all()
-        user_reactions = {r.reaction_type for r in user_reactions_query}
-
-    # Build summary
-    summary = []
-    for reaction_type, count in reactions_query:
-        summary.append(ReactionSummary(
-            reaction_type=reaction_type,
-            count=count,
-            user_reacted=(reaction_type in user_reactions)
-        ))
+        CommentReaction.comment_id.in_(comment_ids)
+    ).group_by(
+        CommentReaction.comment_id, CommentReaction.reaction_type
+    ).order_by(func.min(CommentReaction.created_at)):
+        reaction_counts.setdefault(comment_id, {})[reaction_type] = count
+
+    corrected = 0
+    for comment in comments:
+        expected_replies = replies_counts.get(comment.id, 0)
+        expected_reactions = reaction_counts.get(comment.id, {})
+        if comment.reply_count != expected_replies or (comment.reaction_counts or {}) != expected_reactions:
+            comment.reply_count = expected_replies
+            comment.reaction_counts = expected_reactions
+            corrected += 1
+    return corrected
+
+
+def _mentions_query(db: Session, user_id: UUID):
+    """Mentions of a user on non-deleted comments in workspaces they still belong to"""
+    return db.query(CommentMention).join(
+        Comment, Comment.id == CommentMention.comment_id
+    ).outerjoin(
+        Block, Block.id == Comment.block_id
+    ).join(
+        Page, Page.id == func.coalesce(Comment.page_id, Block.page_id)
+    ).join(
+        WorkspaceMember,
+        and_(
+            WorkspaceMember.workspace_id == Page.workspace_id,
+            WorkspaceMember.user_id == user_id
+        )
+    ).filter(
+        CommentMention.mentioned_user_id == user_id,
+        Comment.is_deleted == False
+    )
+
+
+def get_mentions_for_user(
+    db: Session,
+    user_id: UUID,
+    unread_only: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = 20
+) -> List[CommentMention]:
+    """
+    Mentions inbox of a user, newest first, keyset paginated on (created_at, id).
+    Raises ValueError on a malformed cursor.
+    """
+    query = _mentions_query(db, user_id)
+    if unread_only:
+        query = query.filter(CommentMention.read_at.is_(None))
+    if cursor:
+        query = query.filter(after_cursor(CommentMention.created_at, CommentMention.id, cursor))
 
-    return summary
+    return query.order_by(
+        CommentMention.created_at.desc(), CommentMention.id.desc()
+    ).limit(limit).all()
 
 
-def get_replies_count(db: Session, comment_id: UUID) -> int:
-    """Get count of replies for a comment"""
-    return db.query(Comment).filter(
-        Comment.parent_comment_id == comment_id,
+def count_unread_mentions(db: Session, user_id: UUID) -> int:
+    """Number of unread mentions in the user's inbox"""
+    return _mentions_query(db, user_id).filter(
+        CommentMention.read_at.is_(None)
+    ).with_entities(func.count(CommentMention.id)).scalar()
+
+
+def mark_mentions_read(db: Session, user_id: UUID, mention_ids: Optional[List[UUID]] = None) -> int:
+    """Mark the user's mentions (all unread ones, or only mention_ids) as read; returns rows updated"""
+    query = db.query(CommentMention).filter(
+        CommentMention.mentioned_user_id == user_id,
+        CommentMention.read_at.is_(None)
+    )
+    if mention_ids is not None:
+        query = query.filter(CommentMention.id.in_(mention_ids))
+
+    updated = query.update({CommentMention.read_at: func.now()}, synchronize_session=False)
+    db.commit()
+    return updated
+
+
+def get_by_ids(db: Session, comment_ids: List[UUID]) -> List[Comment]:
+    """Get comments by ID (including deleted) with everything responses embed eager loaded"""
+    if not comment_ids:
+        return []
+    return db.query(Comment).options(
+        *_response_load_options()
+    ).filter(Comment.id.in_(comment_ids)).all()
+
+
+def get_replies_counts(db: Session, comment_ids: List[UUID]) -> Dict[UUID, int]:
+    """Get counts of non-deleted replies for many comments with one grouped query"""
+    if not comment_ids:
+        return {}
+
+    rows = db.query(
+        Comment.parent_comment_id,
+        func.count(Comment.id)
+    ).filter(
+        Comment.parent_comment_id.in_(comment_ids),
         Comment.is_deleted == False
-    ).count()
+    ).group_by(Comment.parent_comment_id).all()
+    return {parent_id: count for parent_id, count in rows}
+
@@ -3,10 +3,29 @@ from sqlalchemy.exc import IntegrityError
 from typing import Optional
 from uuid import UUID
 
+from app.models.comment import Comment
 from app.models.comment_reaction import CommentReaction
 from app.schemas.comment import ReactionCreate
 
 
+def _lock_comment(db: Session, comment_id: UUID) -> Optional[Comment]:
+    """Lock the comment row; serializes reaction writes and reaction_counts updates"""
+    return db.query(Comment).filter(
+        Comment.id == comment_id
+    ).with_for_update().populate_existing().first()
+
+
+def _adjust_reaction_count(comment: Comment, reaction_type: str, delta: int) -> None:
+    """Apply delta to one reaction type in the comment's stored counts"""
+    counts = dict(comment.reaction_counts or {})
+    count = counts.get(reaction_type, 0) + delta
+    if count > 0:
+        counts[reaction_type] = count
+    else:
+        counts.pop(reaction_type, None)
+    comment.reaction_counts = counts
+
+
 def add_reaction(
     db: Session,
     comment_id: UUID,
@@ -17,6 +36,11 @@ def add_reaction(
     Add a reaction to a comment.
     Returns None if reaction already exists (duplicate).
     """
+    comment = _lock_comment(db, comment_id)
+    if comment is not None and get_user_reaction(db, comment_id, user_id, reaction_in.reaction_type):
+        db.rollback()
+        return None
+
     reaction = CommentReaction(
         comment_id=comment_id,
         user_id=user_id,
@@ -25,6 +49,8 @@ def add_reaction(
 
     try:
         db.add(reaction)
+        if comment is not None:
+            _adjust_reaction_count(comment, reaction_in.reaction_type, 1)
         db.commit()
         db.refresh(reaction)
         return reaction
@@ -44,12 +70,15 @@ def remove_reaction(
     Remove a reaction from a comment.
     Returns True if reaction was removed, False if not found.
     """
+    comment = _lock_comment(db, comment_id)
     result = db.query(CommentReaction).filter(
         CommentReaction.comment_id == comment_id,
         CommentReaction.user_id == user_id,
         CommentReaction.reaction_type == reaction_type
     ).delete()
 
+    if result and comment is not None:
+        _adjust_reaction_count(comment, reaction_type, -result)
     db.commit()
     return result > 0
 
@@ -2,12 +2,16 @@
 CRUD operations for File model
 """
 
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
 from uuid import UUID
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, func, or_, select
 
+from app.models.block import Block
 from app.models.file import File, FileType
+from app.models.workspace_member import WorkspaceMember
+from app.models.workspace_storage_usage import WorkspaceStorageUsage
 from app.schemas.file import FileCreate
 
 
@@ -32,6 +36,8 @@ def create_file(db: Session, file_data: FileCreate, uploaded_by: UUID) -> File:
         storage_url=file_data.storage_url,
         storage_id=file_data.storage_id,
         thumbnail_url=file_data.thumbnail_url,
+        thumbnail_storage_id=file_data.thumbnail_storage_id,
+        content_hash=file_data.content_hash,
         uploaded_by=uploaded_by,
         workspace_id=file_data.workspace_id,
         page_id=file_data.page_id,
@@ -57,6 +63,90 @@ def get_file_by_id(db: Session, file_id: UUID) -> Optional[File]:
     return db.query(File).filter(File.id == file_id).first()
 
 
+def get_file_by_storage_id(
+    db: Session,
+    storage_provider: str,
+    storage_id: str,
+    thumbnail: bool = False,
+    member_id: Optional[UUID] = None
+) -> Optional[File]:
+    """
+    Get any file record pointing at a stored object
+
+    Args:
+        db: Database session
+        storage_provider: Storage backend name
+        storage_id: Provider-specific ID
+        thumbnail: Match the object as the file's generated thumbnail instead
+        member_id: Only match records in workspaces this user is a member of
+
+    Returns:
+        File instance or None
+    """
+    column = File.thumbnail_storage_id if thumbnail else File.storage_id
+    query = db.query(File).filter(
+        File.storage_provider == storage_provider,
+        column == storage_id
+    )
+    if member_id is not None:
+        query = query.join(
+            WorkspaceMember,
+            and_(WorkspaceMember.workspace_id == File.workspace_id, WorkspaceMember.user_id == member_id)
+        )
+    return query.first()
+
+
+def get_by_content_hash(
+    db: Session,
+    workspace_id: UUID,
+    storage_provider: str,
+    content_hash: str,
+    lock: bool = False
+) -> Optional[File]:
+    """
+    Get a file in the workspace with the same contents on the same backend
+
+    Args:
+        db: Database session
+        workspace_id: Workspace ID
+        storage_provider: Storage backend name
+        content_hash: SHA-256 of the contents
+        lock: Take the content hash lock (see lock_content_hash) until the transaction
+            ends, so a concurrent delete cannot remove the stored object while it is reused
+
+    Returns:
+        File instance or None
+    """
+    if lock:
+        lock_content_hash(db, storage_provider, content_hash)
+    return db.query(File).filter(
+        File.workspace_id == workspace_id,
+        File.content_hash == content_hash,
+        File.storage_provider == storage_provider,
+        File.storage_id.isnot(None)
+    ).order_by(File.created_at).first()
+
+
+def lock_content_hash(db: Session, storage_provider: str, content_hash: str) -> None:
+    """
+    Lock (FOR UPDATE) every file record on the backend with these contents, in every
+    workspace, until the transaction ends. Uploads reusing a stored object and deletes
+    removing one both take it, so they cannot interleave.
+    On PostgreSQL a transaction-level advisory lock on the hash is taken as well: with
+    no records left there are no rows to lock, and the orphaned file collector deleting
+    a local object (whose storage_id is its content hash) must still exclude an upload
+    storing the same contents again.
+    """
+    if db.bind.dialect.name == 'postgresql':
+        db.execute(select(func.pg_advisory_xact_lock(
+            func.hashtextextended(f"{storage_provider}:{content_hash}", 0)
+        )))
+    db.query(File.id).filter(
+        File.storage_provider == storage_provider,
+        File.content_hash == content_hash
+    ).order_by(File.id).with_for_update().all()
+
+
 def get_files_by_workspace(
     db: Session,
     workspace_id: UUID,
@@ -188,6 +278,208 @@ def delete_file(db: Session, file_id: UUID) -> bool:
     return False
 
 
+def delete_file_locked(db: Session, db_file: File) -> List[str]:
+    """
+    Delete a file record without committing, holding its content hash lock
+
+    Args:
+        db: Database session
+        db_file: File to delete
+
+    Returns:
+        Stored objects (contents, thumbnail) no remaining record references. Delete them
+        before committing: until then no upload can start reusing them.
+    """
+    if db_file.content_hash:
+        lock_content_hash(db, db_file.storage_provider, db_file.content_hash)
+    stored_ids = [db_file.storage_id, db_file.thumbnail_storage_id]
+    db.delete(db_file)
+    db.flush()
+    return [
+        storage_id for storage_id in stored_ids
+        if storage_id and not is_storage_referenced(db, db_file.storage_provider, storage_id)
+    ]
+
+
+def is_storage_referenced(db: Session, storage_provider: str, storage_id: Optional[str]) -> bool:
+    """
+    Check whether any file record still points at a stored object, as its contents or
+    its generated thumbnail (duplicated pages and deduplicated uploads share one)
+
+    Args:
+        db: Database session
+        storage_provider: Storage backend name
+        storage_id: Provider-specific ID
+
+    Returns:
+        True if the stored object is still referenced
+    """
+    if not storage_id:
+        return False
+    return db.query(
+        db.query(File).filter(
+            File.storage_provider == storage_provider,
+            or_(File.storage_id == storage_id, File.thumbnail_storage_id == storage_id)
+        ).exists()
+    ).scalar()
+
+
+def set_thumbnail(
+    db: Session,
+    storage_provider: str,
+    storage_id: str,
+    thumbnail_url: str,
+    thumbnail_storage_id: str
+) -> int:
+    """
+    Attach a generated thumbnail to every file record sharing the stored object
+
+    Args:
+        db: Database session
+        storage_provider: Storage backend name
+        storage_id: Provider-specific ID of the original
+        thumbnail_url: URL of the thumbnail
+        thumbnail_storage_id: Provider-specific ID of the thumbnail
+
+    Returns:
+        Number of records updated
+    """
+    updated = db.query(File).filter(
+        File.storage_provider == storage_provider,
+        File.storage_id == storage_id,
+        File.thumbnail_url.is_(None)
+    ).update(
+        {File.thumbnail_url: thumbnail_url, File.thumbnail_storage_id: thumbnail_storage_id},
+        synchronize_session=False
+    )
+    db.commit()
+    return updated
+
+
+def get_files_missing_thumbnails(
+    db: Session,
+    mime_types: List[str],
+    after_id: Optional[UUID] = None,
+    limit: int = 100
+) -> List[File]:
+    """
+    Get files of the given types without a thumbnail, in id order (for backfills)
+
+    Args:
+        db: Database session
+        mime_types: MIME types that get thumbnails
+        after_id: Only files with a greater id
+        limit: Maximum number of records to return
+
+    Returns:
+        List of File instances
+    """
+    query = db.query(File).filter(
+        File.mime_type.in_(mime_types),
+        File.thumbnail_url.is_(None),
+        File.storage_id.isnot(None)
+    )
+    if after_id is not None:
+        query = query.filter(File.id > after_id)
+    return query.order_by(File.id).limit(limit).all()
+
+
+def get_referenced_storage_ids(db: Session, storage_provider: str, storage_ids: List[str]) -> Set[str]:
+    """
+    Which of the given stored objects some file record points at, as its contents
+    or its thumbnail (batched is_storage_referenced)
+
+    Args:
+        db: Database session
+        storage_provider: Storage backend name
+        storage_ids: Provider-specific IDs to check
+
+    Returns:
+        The referenced subset of storage_ids
+    """
+    if not storage_ids:
+        return set()
+    rows = db.query(File.storage_id, File.thumbnail_storage_id).filter(
+        File.storage_provider == storage_provider,
+        or_(File.storage_id.in_(storage_ids), File.thumbnail_storage_id.in_(storage_ids))
+    ).all()
+    wanted = set(storage_ids)
+    return {storage_id for row in rows for storage_id in row if storage_id in wanted}
+
+
+def get_block_attached_files(
+    db: Session,
+    created_before: datetime,
+    after_id: Optional[UUID] = None,
+    limit: int = 100
+) -> List[Tuple[File, Any]]:
+    """
+    Get files attached to a block, with that block's content, in id order (for the
+    orphaned file collector)
+
+    Args:
+        db: Database session
+        created_before: Only files created before this time
+        after_id: Only files with a greater id
+        limit: Maximum number of records to return
+
+    Returns:
+        List of (File, block content) pairs
+    """
+    query = (
+        db.query(File, Block.content)
+        .join(Block, Block.id == File.block_id)
+        .filter(File.created_at < created_before)
+    )
+    if after_id is not None:
+        query = query.filter(File.id > after_id)
+    return query.order_by(File.id).limit(limit).all()
+
+
+def get_workspace_storage_breakdown(db: Session, workspace_id: UUID) -> Dict[FileType, Tuple[int, int]]:
+    """
+    Count files and bytes per file type with one grouped query over the files table
+
+    Args:
+        db: Database session
+        workspace_id: Workspace ID
+
+    Returns:
+        Dict of file type -> (file count, total bytes), for types with files
+    """
+    rows = (
+        db.query(File.file_type, func.count(File.id), func.coalesce(func.sum(File.size_bytes), 0))
+        .filter(File.workspace_id == workspace_id)
+        .group_by(File.file_type)
+        .all()
+    )
+    return {file_type: (count, int(total)) for file_type, count, total in rows}
+
+
+def get_workspace_storage_summary(db: Session, workspace_id: UUID) -> Dict[FileType, Tuple[int, int]]:
+    """
+    Files and bytes per file type for a workspace. On PostgreSQL this reads the
+    trigger-maintained workspace_storage_usage rollup (at most one row per type);
+    elsewhere it falls back to the grouped query.
+
+    Args:
+        db: Database session
+        workspace_id: Workspace ID
+
+    Returns:
+        Dict of file type -> (file count, total bytes), for types with files
+    """
+    if db.bind.dialect.name != 'postgresql':
+        return get_workspace_storage_breakdown(db, workspace_id)
+
+    rows = (
+        db.query(WorkspaceStorageUsage.file_type, WorkspaceStorageUsage.file_count, WorkspaceStorageUsage.total_bytes)
+        .filter(WorkspaceStorageUsage.workspace_id == workspace_id, WorkspaceStorageUsage.file_count > 0)
+        .all()
+    )
+    return {file_type: (count, total) for file_type, count, total in rows}
+
+
 def get_workspace_storage_usage(db: Session, workspace_id: UUID) -> int:
     """
     Get total storage usage for a workspace in bytes
@@ -199,14 +491,7 @@ def get_workspace_storage_usage(db: Session, workspace_id: UUID) -> int:
     Returns:
         Total size in bytes
     """
-    from sqlalchemy import func
-
-    result = (
-        db.query(func.sum(File.size_bytes))
-        .filter(File.workspace_id == workspace_id)
-        .scalar()
-    )
-    return result or 0
+    return sum(total for _, total in get_workspace_storage_summary(db, workspace_id).values())
 
 
 def get_workspace_file_count(
@@ -225,9 +510,35 @@ def get_workspace_file_count(
     Returns:
         Number of files
     """
-    query = db.query(File).filter(File.workspace_id == workspace_id)
-
+    summary = get_workspace_storage_summary(db, workspace_id)
     if file_type:
-        query = query.filter(File.file_type == file_type)
+        return summary.get(file_type, (0, 0))[0]
+    return sum(count for count, _ in summary.values())
+
+
+def count_files_by_page(db: Session, page_id: UUID) -> int:
+    """
+    Get count of files attached to a page (served by ix_files_page)
 
-    return query.count()
+    Args:
+        db: Database session
+        page_id: Page ID
+
+    Returns:
+        Number of files
+    """
+    return db.query(func.count()).select_from(File).filter(File.page_id == page_id).scalar()
+
+
+def count_files_by_block(db: Session, block_id: UUID) -> int:
+    """
+    Get count of files attached to a block (served by ix_files_block)
+
+    Args:
+        db: Database session
+        block_id: Block ID
+
+    Returns:
+        Number of files
+    """
+    return db.query(func.count()).select_from(File).filter(File.block_id == block_id).scalar()
@@ -1,10 +1,15 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, literal, or_, select
+from sqlalchemy.orm import Session, aliased
 from typing import List, Optional, Dict
+from datetime import datetime
 from uuid import UUID, uuid4
+from app.crud import block as crud_block
+from app.crud import storage_quota as crud_storage_quota
 from app.models.page import Page
 from app.models.block import Block
+from app.models.tag import PageTag
+from app.models.file import File
 from app.schemas.page import PageCreate, PageUpdate, PageMove
-from app.crud import page_version as crud_page_version
 
 
 def create(db: Session, page_in: PageCreate, created_by: UUID) -> Page:
@@ -29,6 +34,14 @@ def get_by_id(db: Session, page_id: UUID) -> Optional[Page]:
     return db.query(Page).filter(Page.id == page_id).first()
 
 
+def get_workspace_ids(db: Session, page_ids: List[UUID]) -> Dict[UUID, UUID]:
+    """Map page ID to workspace ID for the given pages (missing pages are absent)"""
+    return {
+        row.id: row.workspace_id
+        for row in db.query(Page.id, Page.workspace_id).filter(Page.id.in_(page_ids))
+    }
+
+
 def get_by_workspace(db: Session, workspace_id: UUID, include_archived: bool = False) -> List[Page]:
     """Get all pages in a workspace"""
     query = db.query(Page).filter(Page.workspace_id == workspace_id)
@@ -47,32 +60,9 @@ def get_tree(db: Session, workspace_id: UUID, parent_id: Optional[UUID] = None)
     return query.order_by(Page.order).all()
 
 
-def update(
-    db: Session,
-    page: Page,
-    page_in: PageUpdate,
-    created_by: Optional[UUID] = None,
-    change_summary: Optional[str] = None,
-    create_version: bool = True
-) -> Page:
-    """Update page and optionally create a version snapshot"""
+def update(db: Session, page: Page, page_in: PageUpdate) -> Page:
+    """Update page metadata (versions are taken by the versioning policy)"""
     update_data = page_in.model_dump(exclude_unset=True)
-
-    # Create version before updating if requested and user provided
-    if create_version and created_by and update_data:
-        # Check if there are significant changes (title, icon, cover_image)
-        significant_fields = {'title', 'icon', 'cover_image'}
-        has_significant_changes = any(field in update_data for field in significant_fields)
-
-        if has_significant_changes:
-            crud_page_version.create_version(
-                db=db,
-                page=page,
-                created_by=created_by,
-                change_summary=change_summary
-            )
-
-    # Update page fields
     for field, value in update_data.items():
         setattr(page, field, value)
 
@@ -82,8 +72,11 @@ def update(
 
 
 def archive(db: Session, page: Page) -> Page:
-    """Archive page (soft delete)"""
-    page.is_archived = True
+    """Archive page and its subpages (soft delete) with one UPDATE over the subtree"""
+    tree = _subtree_cte(page.id, include_archived=False)
+    db.query(Page).filter(
+        Page.id.in_(select(tree.c.id))
+    ).update({Page.is_archived: True, Page.archived_at: func.now()}, synchronize_session=False)
     db.commit()
     db.refresh(page)
     return page
@@ -98,83 +91,210 @@ def move(db: Session, page: Page, move_data: PageMove) -> Page:
     return page
 
 
-def get_archived(db: Session, workspace_id: UUID) -> List[Page]:
-    """Get all archived pages in a workspace (trash)"""
+def get_archived(db: Session, workspace_id: UUID, skip: int = 0, limit: int = 100) -> List[Page]:
+    """Get archived pages in a workspace (trash), most recently archived first"""
     return db.query(Page).filter(
         Page.workspace_id == workspace_id,
         Page.is_archived == True
-    ).order_by(Page.updated_at.desc()).all()
+    ).order_by(Page.archived_at.desc(), Page.id).offset(skip).limit(limit).all()
+
+
+def get_expired_archived_ids(
+    db: Session,
+    archived_before: datetime,
+    exclude_ids: Optional[List[UUID]] = None,
+    limit: int = 100
+) -> List[UUID]:
+    """IDs of pages archived before the given time, oldest first"""
+    query = db.query(Page.id).filter(
+        Page.is_archived == True,
+        Page.archived_at < archived_before
+    )
+    if exclude_ids:
+        query = query.filter(Page.id.notin_(exclude_ids))
+    return [row.id for row in query.order_by(Page.archived_at).limit(limit)]
 
 
 def restore(db: Session, page: Page) -> Page:
-    """Restore page from trash"""
-    page.is_archived = False
+    """
+    Restore page and its subpages from trash with one UPDATE over the subtree.
+    Only subpages archived together with the page (same archived_at) come back; ones
+    trashed on their own before it stay in the trash, as archive left them alone.
+    A page whose parent is still archived is restored to the workspace root.
+    """
+    tree = _subtree_cte(page.id, same_archive=True)
+    db.query(Page).filter(
+        Page.id.in_(select(tree.c.id))
+    ).update({Page.is_archived: False, Page.archived_at: None}, synchronize_session=False)
+
+    if page.parent_id is not None and page.parent.is_archived:
+        page.parent_id = None
+
     db.commit()
     db.refresh(page)
     return page
 
 
-def delete(db: Session, page: Page) -> None:
-    """Permanently delete page"""
-    db.delete(page)
-    db.commit()
-
-
-def duplicate(db: Session, page: Page, created_by: UUID, include_blocks: bool = True) -> Page:
-    """Duplicate a page with all its blocks"""
-    # Create new page with copied attributes
-    new_page = Page(
-        workspace_id=page.workspace_id,
-        parent_id=page.parent_id,
-        title=f"{page.title} (Copy)",
-        icon=page.icon,
-        cover_image=page.cover_image,
-        is_archived=False,  # New copy should not be archived
-        is_public=False,    # New copy should not be public
-        order=page.order,
-        created_by=created_by
-    )
-    db.add(new_page)
-    db.flush()  # Get the new page ID
-
-    # Duplicate blocks if requested
-    if include_blocks:
-        # Get all blocks from original page
-        original_blocks = db.query(Block).filter(
-            Block.page_id == page.id
-        ).order_by(Block.order).all()
-
-        # Map old block IDs to new block IDs (for parent_block_id references)
-        block_id_mapping: Dict[UUID, UUID] = {}
-
-        # First pass: create all blocks with new IDs
-        for original_block in original_blocks:
-            new_block_id = uuid4()
-            block_id_mapping[original_block.id] = new_block_id
-
-            new_block = Block(
-                id=new_block_id,
-                page_id=new_page.id,
-                parent_block_id=None,  # Will be updated in second pass
-                type=original_block.type,
-                content=original_block.content.copy() if original_block.content else {},
-                order=original_block.order
+def delete(db: Session, page: Page, batch_size: int = 500) -> int:
+    """
+    Permanently delete page and its subpages, returning the number of pages deleted.
+    Pages are deleted deepest first in batches of batch_size (to bound the IN list) within
+    a single transaction, so a failure leaves the whole tree in place; blocks, comments,
+    versions and other dependents go with them through ON DELETE CASCADE.
+    """
+    tree = _subtree_cte(page.id)
+    subtree_ids = [
+        row.id for row in db.execute(select(tree.c.id).order_by(tree.c.depth.desc()))
+    ]
+    db.expunge(page)
+
+    deleted = 0
+    try:
+        for start in range(0, len(subtree_ids), batch_size):
+            deleted += db.query(Page).filter(
+                Page.id.in_(subtree_ids[start:start + batch_size])
+            ).delete(synchronize_session=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return deleted
+
+
+def _subtree_cte(page_id: UUID, include_archived: bool = True, same_archive: bool = False):
+    """
+    Recursive CTE of (id, depth) for a page and its descendants. With same_archive, only
+    descendants archived at the same time as the page (in the same archive) are followed.
+    """
+    tree = select(
+        Page.id, literal(0).label("depth")
+    ).where(Page.id == page_id).cte(name="page_tree", recursive=True)
+
+    children = select(Page.id, (tree.c.depth + 1).label("depth")).where(Page.parent_id == tree.c.id)
+    if not include_archived:
+        children = children.where(Page.is_archived == False)
+    if same_archive:
+        # Compared in SQL, as SQLite keeps the timestamp as text in its own format
+        root = aliased(Page)
+        children = children.where(
+            Page.archived_at == select(root.archived_at).where(root.id == page_id).scalar_subquery()
+        )
+    return tree.union_all(children)
+
+
+def get_subtree_ids(db: Session, page_id: UUID, include_archived: bool = True) -> List[UUID]:
+    """
+    IDs of a page and all its descendants, parents before children (single recursive query).
+    With include_archived=False, archived descendants and everything below them are skipped.
+    """
+    tree = _subtree_cte(page_id, include_archived)
+    return [row.id for row in db.execute(select(tree.c.id).order_by(tree.c.depth))]
+
+
+def duplicate(
+    db: Session,
+    page: Page,
+    created_by: UUID,
+    include_blocks: bool = True,
+    include_subpages: bool = False
+) -> Page:
+    """
+    Duplicate a page, optionally with its blocks and its (non-archived) subpage tree.
+    Tags and file records are copied along. New IDs are assigned up front and every
+    table is copied with one bulk INSERT, so the statement count does not grow with the tree.
+    Raises ValueError if the copied files do not fit in the workspace's storage quota.
+    """
+    source_ids = get_subtree_ids(db, page.id, include_archived=False) if include_subpages else [page.id]
+    page_id_map: Dict[UUID, UUID] = {source_id: uuid4() for source_id in source_ids}
+
+    source_pages = {
+        source.id: source
+        for source in db.query(Page).filter(Page.id.in_(source_ids))
+    }
+
+    # File records point at the same stored object; deletion keeps it while references remain
+    source_files = [
+        source_file for source_file in db.query(File).filter(
+            or_(
+                File.page_id.in_(source_ids),
+                File.block_id.in_(select(Block.id).where(Block.page_id.in_(source_ids)))
+            )
+        )
+        if source_file.page_id in page_id_map or (include_blocks and source_file.block_id is not None)
+    ]
+
+    # The copies count toward the workspace's storage usage. The reservation commits,
+    # so it is taken before anything is inserted and released with the copy's commit.
+    copied_bytes = sum(source_file.size_bytes for source_file in source_files)
+    reservation_id = None
+    if copied_bytes:
+        reservation_id = crud_storage_quota.reserve(db, page.workspace_id, copied_bytes)
+        if reservation_id is None:
+            raise ValueError("Workspace storage quota exceeded")
+
+    try:
+        # Parents first (source_ids is ordered by depth) so self-references resolve in order
+        page_rows = []
+        for source_id in source_ids:
+            source = source_pages[source_id]
+            is_root = source_id == page.id
+            page_rows.append({
+                "id": page_id_map[source_id],
+                "workspace_id": source.workspace_id,
+                "parent_id": source.parent_id if is_root else page_id_map[source.parent_id],
+                "title": f"{source.title} (Copy)" if is_root else source.title,
+                "icon": source.icon,
+                "cover_image": source.cover_image,
+                "is_archived": False,  # New copy should not be archived
+                "is_public": False,    # New copy should not be public
+                "order": source.order,
+                "created_by": created_by,
+            })
+        db.execute(insert(Page), page_rows)
+
+        block_id_map: Dict[UUID, UUID] = {}
+        if include_blocks:
+            source_blocks = db.query(
+                Block.id, Block.page_id, Block.parent_block_id, Block.type, Block.content, Block.order
+            ).filter(Block.page_id.in_(source_ids)).order_by(Block.order).all()
+            block_id_map = crud_block.bulk_copy(
+                db, [dict(block._mapping) for block in source_blocks], page_id_map
             )
-            db.add(new_block)
-
-        db.flush()
-
-        # Second pass: update parent_block_id references
-        for original_block in original_blocks:
-            if original_block.parent_block_id:
-                new_block_id = block_id_mapping[original_block.id]
-                new_parent_id = block_id_mapping.get(original_block.parent_block_id)
-
-                if new_parent_id:
-                    new_block = db.query(Block).filter(Block.id == new_block_id).first()
-                    if new_block:
-                        new_block.parent_block_id = new_parent_id
 
-    db.commit()
-    db.refresh(new_page)
-    return new_page
+        page_tags = db.query(PageTag.page_id, PageTag.tag_id).filter(PageTag.page_id.in_(source_ids)).all()
+        if page_tags:
+            db.execute(insert(PageTag), [
+                {"page_id": page_id_map[page_tag.page_id], "tag_id": page_tag.tag_id}
+                for page_tag in page_tags
+            ])
+
+        file_rows = [
+            {
+                "filename": source_file.filename,
+                "file_type": source_file.file_type,
+                "mime_type": source_file.mime_type,
+                "size_bytes": source_file.size_bytes,
+                "storage_provider": source_file.storage_provider,
+                "storage_url": source_file.storage_url,
+                "storage_id": source_file.storage_id,
+                "thumbnail_url": source_file.thumbnail_url,
+                "thumbnail_storage_id": source_file.thumbnail_storage_id,
+                "content_hash": source_file.content_hash,
+                "uploaded_by": source_file.uploaded_by,
+                "workspace_id": source_file.workspace_id,
+                "page_id": page_id_map.get(source_file.page_id),
+                "block_id": block_id_map.get(source_file.block_id),
+            }
+            for source_file in source_files
+        ]
+        if file_rows:
+            db.execute(insert(File), file_rows)
+            crud_storage_quota.release(db, reservation_id, commit=False)
+
+        db.commit()
+    except BaseException:
+        if reservation_id is not None:
+            db.rollback()
+            crud_storage_quota.release(db, reservation_id)
+        raise
+    return get_by_id(db, page_id_map[page.id])
@@ -1,72 +1,376 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import delete, func, literal, select, true
+from sqlalchemy.orm import Session, aliased, load_only
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Iterator, List, Optional, Dict, Any, Tuple
 from uuid import UUID
+from datetime import datetime
+import hashlib
+import json
+import logging
+import time
+import zlib
+from app.core.database import dialect_insert
+from app.crud import block as crud_block
 from app.models.page_version import PageVersion
+from app.models.block_blob import BlockBlob
 from app.models.page import Page
 from app.models.block import Block
 
+logger = logging.getLogger(__name__)
+
+# zlib level used for block blobs (6 is zlib's default speed/ratio trade-off)
+BLOB_COMPRESSION_LEVEL = 6
+
+
+def _canonical_json(block_data: Dict[str, Any]) -> bytes:
+    """Serialize a snapshot block deterministically so equal blocks hash equally"""
+    return json.dumps(block_data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def store_block_blobs(
+    db: Session,
+    page_id: UUID,
+    content_snapshot: List[Dict[str, Any]]
+) -> Tuple[List[str], int]:
+    """
+    Store snapshot blocks in the content-addressed blob table.
+    Only blocks not already stored for the page are compressed and inserted.
+    Returns (ordered block hashes, total uncompressed size) without committing.
+    """
+    refs = []
+    total_size = 0
+    payloads: Dict[str, bytes] = {}
+    for block_data in content_snapshot:
+        raw = _canonical_json(block_data)
+        digest = hashlib.sha256(raw).hexdigest()
+        refs.append(digest)
+        total_size += len(raw)
+        payloads[digest] = raw
+
+    if not payloads:
+        return refs, total_size
+
+    existing = {
+        row.hash for row in db.query(BlockBlob.hash).filter(
+            BlockBlob.page_id == page_id,
+            BlockBlob.hash.in_(payloads.keys())
+        )
+    }
+    missing = [
+        {
+            "page_id": page_id,
+            "hash": digest,
+            "data": zlib.compress(raw, BLOB_COMPRESSION_LEVEL),
+            "size_bytes": len(raw)
+        }
+        for digest, raw in payloads.items()
+        if digest not in existing
+    ]
+    if missing:
+        # A concurrent snapshot of the same page may insert the same blob first
+        db.execute(dialect_insert(db, BlockBlob.__table__).on_conflict_do_nothing(), missing)
+
+    return refs, total_size
+
+
+def load_snapshot(db: Session, version: PageVersion) -> List[Dict[str, Any]]:
+    """
+    Return the blocks of a version, decompressing blob references if needed.
+    Raises LookupError if a referenced blob is missing.
+    """
+    if version.block_refs is None:
+        # Versions created before blob storage keep their blocks inline
+        return version.content_snapshot or []
+
+    rows = db.query(BlockBlob.hash, BlockBlob.data).filter(
+        BlockBlob.page_id == version.page_id,
+        BlockBlob.hash.in_(set(version.block_refs))
+    ).all()
+    blobs = {row.hash: json.loads(zlib.decompress(row.data)) for row in rows}
+    missing = set(version.block_refs) - blobs.keys()
+    if missing:
+        # A partial snapshot would silently drop blocks on restore
+        raise LookupError(
+            f"Version {version.version_number} of page {version.page_id} is missing "
+            f"{len(missing)} block blob(s): {', '.join(sorted(missing))}"
+        )
+    return [blobs[digest] for digest in version.block_refs]
+
+
+def iter_snapshot_texts(db: Session, batch_size: int = 1000) -> Iterator[str]:
+    """
+    Yield the JSON of the blocks page versions can restore: every block blob, and the
+    inline snapshot of each version created before blob storage
+    """
+    for (data,) in db.query(BlockBlob.data).yield_per(batch_size):
+        yield zlib.decompress(data).decode("utf-8")
+    inline = db.query(PageVersion.content_snapshot).filter(PageVersion.content_snapshot.isnot(None))
+    for (snapshot,) in inline.yield_per(batch_size):
+        if snapshot:
+            yield json.dumps(snapshot, ensure_ascii=False)
+
+
+def hydrate(db: Session, version: Optional[PageVersion]) -> Optional[PageVersion]:
+    """Populate version.content_snapshot from blob storage without marking it dirty"""
+    if version is not None and version.block_refs is not None:
+        set_committed_value(version, "content_snapshot", load_snapshot(db, version))
+    return version
+
+
+def capture_snapshot(db: Session, page: Page) -> Dict[str, Any]:
+    """
+    Read a page's metadata and blocks as create_version would store them, without
+    storing anything (one query over the block columns)
+    """
+    blocks = db.query(
+        Block.id, Block.type, Block.content, Block.order, Block.parent_block_id
+    ).filter(Block.page_id == page.id).order_by(Block.order)
+    return {
+        "title": page.title,
+        "icon": page.icon,
+        "cover_image": page.cover_image,
+        "blocks": [
+            {
+                "id": str(block.id),
+                "type": block.type,
+                "content": block.content,
+                "order": block.order,
+                "parent_block_id": str(block.parent_block_id) if block.parent_block_id else None
+            }
+            for block in blocks
+        ],
+    }
+
 
 def create_version(
     db: Session,
     page: Page,
     created_by: UUID,
-    change_summary: Optional[str] = None
+    change_summary: Optional[str] = None,
+    commit: bool = True,
+    snapshot: Optional[Dict[str, Any]] = None
 ) -> PageVersion:
-    """Create a new version snapshot of a page"""
+    """
+    Create a new version snapshot of a page (commit=False only flushes, for larger transactions).
+    Stores the page's current state, or a state read earlier with capture_snapshot.
+    """
 
-    # Get current version number
-    last_version = db.query(PageVersion).filter(
-        PageVersion.page_id == page.id
-    ).order_by(PageVersion.version_number.desc()).first()
+    # Lock the page first: concurrent snapshots then number their versions one after the
+    # other, and blob garbage collection cannot drop blobs this snapshot reuses
+    db.query(Page.id).filter(Page.id == page.id).with_for_update().first()
 
-    version_number = 1 if not last_version else last_version.version_number + 1
+    last_number = db.query(func.max(PageVersion.version_number)).filter(
+        PageVersion.page_id == page.id
+    ).scalar()
+    version_number = (last_number or 0) + 1
 
-    # Capture all blocks as snapshot
-    blocks = db.query(Block).filter(Block.page_id == page.id).order_by(Block.order).all()
-    content_snapshot = [
-        {
-            "id": str(block.id),
-            "type": block.type,
-            "content": block.content,
-            "order": block.order,
-            "parent_block_id": str(block.parent_block_id) if block.parent_block_id else None
-        }
-        for block in blocks
-    ]
+    if snapshot is None:
+        snapshot = capture_snapshot(db, page)
 
-    # Create version
+    # Create version referencing deduplicated block blobs
+    block_refs, snapshot_size = store_block_blobs(db, page.id, snapshot["blocks"])
     version = PageVersion(
         page_id=page.id,
         version_number=version_number,
-        title=page.title,
-        icon=page.icon,
-        cover_image=page.cover_image,
-        content_snapshot=content_snapshot,
+        title=snapshot["title"],
+        icon=snapshot["icon"],
+        cover_image=snapshot["cover_image"],
+        block_refs=block_refs,
+        blocks_count=len(block_refs),
+        snapshot_size_bytes=snapshot_size,
         created_by=created_by,
         change_summary=change_summary
     )
 
     db.add(version)
+    if not commit:
+        db.flush()
+        return version
     db.commit()
     db.refresh(version)
     return version
 
 
-def get_versions(db: Session, page_id: UUID, limit: int = 50) -> List[PageVersion]:
-    """Get all versions of a page"""
-    return db.query(PageVersion).filter(
+def restore_version(
+    db: Session,
+    page: Page,
+    version: PageVersion,
+    restored_by: UUID
+) -> Dict[str, float]:
+    """
+    Restore a page to a hydrated version in one transaction.
+    The current state is saved as a new version first, then the blocks are brought back
+    under their snapshot IDs: missing ones inserted, changed ones updated and only the
+    blocks absent from the version deleted (with their comments and file records).
+    Returns the duration of each phase in milliseconds.
+    """
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+
+    # Serialize with concurrent restores/edits of the page for the short write phase
+    db.query(Page.id).filter(Page.id == page.id).with_for_update().first()
+
+    create_version(
+        db=db,
+        page=page,
+        created_by=restored_by,
+        change_summary=f"Before restoring to version {version.version_number}",
+        commit=False
+    )
+    timings["snapshot"] = (time.perf_counter() - started) * 1000
+
+    phase_started = time.perf_counter()
+    page.title = version.title
+    page.icon = version.icon
+    page.cover_image = version.cover_image
+
+    crud_block.bulk_restore(db, page.id, version.content_snapshot or [])
+    timings["blocks"] = (time.perf_counter() - phase_started) * 1000
+
+    phase_started = time.perf_counter()
+    db.commit()
+    timings["commit"] = (time.perf_counter() - phase_started) * 1000
+    timings["total"] = (time.perf_counter() - started) * 1000
+
+    db.refresh(page)
+    logger.info(
+        "Restored page %s to version %s (%d blocks) in %.1fms",
+        page.id, version.version_number, version.blocks_count, timings["total"]
+    )
+    return timings
+
+
+def get_last_version_time(db: Session, page_id: UUID) -> Optional[datetime]:
+    """Creation time of the page's most recent version, if any"""
+    return db.query(func.max(PageVersion.created_at)).filter(
         PageVersion.page_id == page_id
-    ).order_by(PageVersion.version_number.desc()).limit(limit).all()
+    ).scalar()
 
 
-def get_version(db: Session, page_id: UUID, version_number: int) -> Optional[PageVersion]:
-    """Get a specific version of a page"""
-    return db.query(PageVersion).filter(
+def get_versions(
+    db: Session,
+    page_id: UUID,
+    limit: int = 50,
+    before_version: Optional[int] = None
+) -> List[PageVersion]:
+    """
+    Get versions of a page, newest first, without loading snapshot data.
+    Pass the last version_number seen as before_version to fetch the next page.
+    """
+    query = db.query(PageVersion).options(
+        load_only(
+            PageVersion.id,
+            PageVersion.page_id,
+            PageVersion.version_number,
+            PageVersion.title,
+            PageVersion.created_at,
+            PageVersion.created_by,
+            PageVersion.change_summary,
+            PageVersion.blocks_count,
+            PageVersion.snapshot_size_bytes
+        )
+    ).filter(PageVersion.page_id == page_id)
+
+    if before_version is not None:
+        query = query.filter(PageVersion.version_number < before_version)
+
+    return query.order_by(PageVersion.version_number.desc()).limit(limit).all()
+
+
+def get_version(
+    db: Session,
+    page_id: UUID,
+    version_number: int,
+    load_blocks: bool = True
+) -> Optional[PageVersion]:
+    """
+    Get a specific version of a page.
+    Blocks are rehydrated unless load_blocks is False (call hydrate() later if needed).
+    """
+    version = db.query(PageVersion).filter(
         PageVersion.page_id == page_id,
         PageVersion.version_number == version_number
     ).first()
+    return hydrate(db, version) if load_blocks else version
 
 
 def get_version_by_id(db: Session, version_id: UUID) -> Optional[PageVersion]:
-    """Get version by ID"""
-    return db.query(PageVersion).filter(PageVersion.id == version_id).first()
+    """Get version by ID with its blocks rehydrated"""
+    version = db.query(PageVersion).filter(PageVersion.id == version_id).first()
+    return hydrate(db, version)
+
+
+def get_pages_with_versions_before(
+    db: Session,
+    cutoff: datetime,
+    after_page_id: Optional[UUID] = None,
+    limit: int = 100
+) -> List[UUID]:
+    """Page IDs having versions older than cutoff, in ID order (keyset paginated)"""
+    query = db.query(PageVersion.page_id).filter(PageVersion.created_at < cutoff)
+    if after_page_id is not None:
+        query = query.filter(PageVersion.page_id > after_page_id)
+    rows = query.distinct().order_by(PageVersion.page_id).limit(limit).all()
+    return [row.page_id for row in rows]
+
+
+def get_version_timeline(db: Session, page_id: UUID) -> List[Tuple[UUID, int, datetime]]:
+    """(id, version_number, created_at) of every version of a page, newest first"""
+    return [
+        (row.id, row.version_number, row.created_at)
+        for row in db.query(
+            PageVersion.id, PageVersion.version_number, PageVersion.created_at
+        ).filter(
+            PageVersion.page_id == page_id
+        ).order_by(PageVersion.version_number.desc())
+    ]
+
+
+def delete_versions(db: Session, version_ids: List[UUID]) -> int:
+    """Delete versions by ID with a single statement (does not commit)"""
+    if not version_ids:
+        return 0
+    return db.query(PageVersion).filter(
+        PageVersion.id.in_(version_ids)
+    ).delete(synchronize_session=False)
+
+
+def _version_refs(db: Session):
+    """Table-valued function expanding PageVersion.block_refs into one row per hash"""
+    if db.bind.dialect.name == 'postgresql':
+        return func.json_array_elements_text(PageVersion.block_refs).table_valued("value")
+    return func.json_each(PageVersion.block_refs).table_valued("value")
+
+
+def delete_unreferenced_blobs(db: Session, page_id: UUID, batch_size: int = 1000) -> int:
+    """
+    Delete the page's blobs no remaining version references.
+    Each batch locks the page row and re-checks references with NOT EXISTS, so a blob
+    reused by a snapshot committed between batches is never deleted.
+    Commits after each batch and returns the number of blobs deleted.
+    """
+    refs = _version_refs(db)
+    candidate = aliased(BlockBlob)
+    referenced = (
+        select(literal(1))
+        .select_from(PageVersion)
+        .join(refs, true())
+        .where(PageVersion.page_id == page_id, refs.c.value == candidate.hash)
+    )
+    batch = (
+        select(candidate.hash)
+        .where(candidate.page_id == page_id, ~referenced.exists())
+        .limit(batch_size)
+        .scalar_subquery()
+    )
+
+    deleted = 0
+    while True:
+        db.query(Page.id).filter(Page.id == page_id).with_for_update().first()
+        count = db.execute(
+            delete(BlockBlob).where(BlockBlob.page_id == page_id, BlockBlob.hash.in_(batch))
+        ).rowcount
+        db.commit()
+        deleted += count
+        if count < batch_size:
+            return deleted
@@ -0,0 +1,138 @@
+"""
+CRUD operations for WorkspaceStorageQuota and WorkspaceStorageReservation models
+
+Uploads reserve their size with a row of their own, inserted while holding a lock on
+the workspace's quota row, so concurrent uploads serialize on that row and cannot
+together overshoot the quota. Each reservation expires on its own, so an abandoned
+upload stops counting however many uploads follow it. The reservation is deleted in
+the same commit that creates the file record, at which point the bytes count as used
+instead.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from uuid import UUID
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import dialect_insert
+from app.crud import file as crud_file
+from app.models.workspace_storage_usage import WorkspaceStorageQuota, WorkspaceStorageReservation
+
+
+def _expires_at() -> datetime:
+    """
+    When a reservation taken now counts as abandoned (crashed or timed-out upload): a
+    live one is released within the storage transfer's timeout
+    """
+    return datetime.now(timezone.utc) + timedelta(seconds=2 * settings.UPLOAD_TIMEOUT_SECONDS)
+
+
+def _limit(quota_bytes: Optional[int]) -> Optional[int]:
+    """Effective quota in bytes, or None when unlimited"""
+    limit = settings.WORKSPACE_STORAGE_QUOTA_BYTES if quota_bytes is None else quota_bytes
+    return limit if limit > 0 else None
+
+
+def _ensure_row(db: Session, workspace_id: UUID) -> None:
+    """
+    Create the workspace's quota row if it does not exist yet. On PostgreSQL the files
+    triggers create it with the first file, so a row made here starts with nothing used.
+    """
+    db.execute(
+        dialect_insert(db, WorkspaceStorageQuota.__table__)
+        .values(workspace_id=workspace_id, used_bytes=0)
+        .on_conflict_do_nothing(index_elements=["workspace_id"])
+    )
+
+
+def _used_bytes(db: Session, quota: WorkspaceStorageQuota) -> int:
+    if db.bind.dialect.name == 'postgresql':
+        return quota.used_bytes
+    # used_bytes is only trigger-maintained on PostgreSQL
+    return crud_file.get_workspace_storage_usage(db, quota.workspace_id)
+
+
+def _reserved_bytes(db: Session, workspace_id: UUID) -> int:
+    """Bytes held by the workspace's unexpired reservations"""
+    return db.query(func.coalesce(func.sum(WorkspaceStorageReservation.size_bytes), 0)).filter(
+        WorkspaceStorageReservation.workspace_id == workspace_id,
+        WorkspaceStorageReservation.expires_at > datetime.now(timezone.utc)
+    ).scalar()
+
+
+def get_usage(db: Session, workspace_id: UUID) -> Tuple[int, int, Optional[int]]:
+    """
+    Storage accounting for a workspace
+
+    Args:
+        db: Database session
+        workspace_id: Workspace ID
+
+    Returns:
+        (bytes used, bytes reserved by uploads in flight, quota in bytes or None if unlimited)
+    """
+    quota = db.query(WorkspaceStorageQuota).filter(WorkspaceStorageQuota.workspace_id == workspace_id).first()
+    if quota is None:
+        return 0, 0, _limit(None)
+    return _used_bytes(db, quota), _reserved_bytes(db, workspace_id), _limit(quota.quota_bytes)
+
+
+def has_room(db: Session, workspace_id: UUID, size_bytes: int) -> bool:
+    """
+    Whether size_bytes more would currently fit in the workspace's quota. Advisory only
+    (nothing is reserved); used to reject uploads before their body is transferred.
+    """
+    used, reserved, limit = get_usage(db, workspace_id)
+    return limit is None or used + reserved + size_bytes <= limit
+
+
+def reserve(db: Session, workspace_id: UUID, size_bytes: int) -> Optional[UUID]:
+    """
+    Reserve size_bytes of the workspace's quota and commit, so concurrent uploads see it
+
+    Args:
+        db: Database session
+        workspace_id: Workspace ID
+        size_bytes: Size of the upload
+
+    Returns:
+        The reservation's ID, or None (nothing reserved) if the upload would exceed the quota
+    """
+    _ensure_row(db, workspace_id)
+    quota = db.query(WorkspaceStorageQuota).filter(
+        WorkspaceStorageQuota.workspace_id == workspace_id
+    ).with_for_update().populate_existing().one()
+
+    # Expired reservations no longer count; drop them while the row is locked
+    db.query(WorkspaceStorageReservation).filter(
+        WorkspaceStorageReservation.workspace_id == workspace_id,
+        WorkspaceStorageReservation.expires_at <= datetime.now(timezone.utc)
+    ).delete(synchronize_session=False)
+
+    limit = _limit(quota.quota_bytes)
+    if limit is not None and _used_bytes(db, quota) + _reserved_bytes(db, workspace_id) + size_bytes > limit:
+        db.rollback()
+        return None
+
+    reservation = WorkspaceStorageReservation(
+        workspace_id=workspace_id,
+        size_bytes=size_bytes,
+        expires_at=_expires_at()
+    )
+    db.add(reservation)
+    db.commit()
+    return reservation.id
+
+
+def release(db: Session, reservation_id: UUID, commit: bool = True) -> None:
+    """
+    Give back a reservation. Pass commit=False to release it in the same transaction
+    that creates the file record.
+    """
+    db.query(WorkspaceStorageReservation).filter(
+        WorkspaceStorageReservation.id == reservation_id
+    ).delete(synchronize_session=False)
+    if commit:
+        db.commit()
@@ -0,0 +1,91 @@
+"""
+CRUD operations for UploadSession model
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from uuid import UUID
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.upload_session import UploadSession
+from app.schemas.file import UploadSessionCreate
+
+
+def _expiry() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+
+
+def create(db: Session, session_in: UploadSessionCreate, user_id: UUID, chunk_size: int) -> UploadSession:
+    """Start a resumable upload"""
+    upload_session = UploadSession(
+        workspace_id=session_in.workspace_id,
+        user_id=user_id,
+        page_id=session_in.page_id,
+        block_id=session_in.block_id,
+        folder=session_in.folder or "notion-clone",
+        filename=session_in.filename,
+        mime_type=session_in.mime_type,
+        size_bytes=session_in.size_bytes,
+        chunk_size=chunk_size,
+        expires_at=_expiry()
+    )
+    db.add(upload_session)
+    db.commit()
+    db.refresh(upload_session)
+    return upload_session
+
+
+def get_by_id(db: Session, session_id: UUID, lock: bool = False) -> Optional[UploadSession]:
+    """Get an upload session; lock=True holds it FOR UPDATE (completing it twice is serialised)"""
+    query = db.query(UploadSession).filter(UploadSession.id == session_id)
+    if lock:
+        query = query.with_for_update()
+    return query.first()
+
+
+def is_expired(upload_session: UploadSession) -> bool:
+    """Check if the session is past its expiry"""
+    expires_at = upload_session.expires_at
+    if expires_at.tzinfo is None:
+        # SQLite returns naive datetimes
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at < datetime.now(timezone.utc)
+
+
+def touch(db: Session, upload_session: UploadSession) -> UploadSession:
+    """Push back the expiry of a session that is still receiving chunks"""
+    upload_session.expires_at = _expiry()
+    db.commit()
+    db.refresh(upload_session)
+    return upload_session
+
+
+def delete(db: Session, upload_session: UploadSession, commit: bool = True) -> None:
+    """Delete an upload session record"""
+    db.delete(upload_session)
+    if commit:
+        db.commit()
+    else:
+        db.flush()
+
+
+def get_expired_ids(
+    db: Session,
+    now: datetime,
+    exclude_ids: Optional[List[UUID]] = None,
+    limit: int = 100
+) -> List[UUID]:
+    """IDs of sessions past their expiry, oldest first"""
+    query = db.query(UploadSession.id).filter(UploadSession.expires_at < now)
+    if exclude_ids:
+        query = query.filter(UploadSession.id.notin_(exclude_ids))
+    return [row.id for row in query.order_by(UploadSession.expires_at).limit(limit)]
+
+
+def get_existing_ids(db: Session, session_ids: List[UUID]) -> List[UUID]:
+    """Which of the given session IDs still have a record"""
+    if not session_ids:
+        return []
+    rows = db.query(UploadSession.id).filter(UploadSession.id.in_(session_ids)).all()
+    return [row.id for row in rows]
@@ -3,10 +3,15 @@ from app.models.workspace import Workspace
 from app.models.workspace_member import WorkspaceMember, WorkspaceRole
 from app.models.page import Page
 from app.models.page_version import PageVersion
+from app.models.block_blob import BlockBlob
 from app.models.page_favorite import PageFavorite
 from app.models.page_permission import PagePermission, PermissionLevel
 from app.models.tag import Tag, PageTag
 from app.models.file import File, FileType
+from app.models.upload_session import UploadSession
+from app.models.workspace_storage_usage import (
+    WorkspaceStorageUsage, WorkspaceStorageQuota, WorkspaceStorageReservation
+)
 from app.models.block import Block
 from app.models.comment import Comment
 from app.models.comment_reaction import CommentReaction
@@ -20,6 +25,7 @@ __all__ = [
     "WorkspaceRole",
     "Page",
     "PageVersion",
+    "BlockBlob",
     "PageFavorite",
     "PagePermission",
     "PermissionLevel",
@@ -27,6 +33,10 @@ __all__ = [
     "PageTag",
     "File",
     "FileType",
+    "UploadSession",
+    "WorkspaceStorageUsage",
+    "WorkspaceStorageQuota",
+    "WorkspaceStorageReservation",
     "Block",
     "Comment",
     "CommentReaction",
@@ -11,7 +11,7 @@ class Block(Base):
     
     id = Column(GUID, primary_key=True, default=uuid.uuid4)
     page_id = Column(GUID, ForeignKey("pages.id", ondelete="CASCADE"), index=True, nullable=False)
-    parent_block_id = Column(GUID, ForeignKey("blocks.id"), nullable=True, index=True)
+    parent_block_id = Column(GUID, ForeignKey("blocks.id", ondelete="CASCADE"), nullable=True, index=True)
     type = Column(String(50), nullable=False)  # 'paragraph', 'heading1', 'image', 'code', etc.
     content = Column(JSON, nullable=False)  # Flexible content structure (works in SQLite and PostgreSQL)
     order = Column(Integer, nullable=False)
@@ -21,5 +21,5 @@ class Block(Base):
     # Relationships
     page = relationship("Page", back_populates="blocks")
     parent_block = relationship("Block", remote_side=[id], back_populates="child_blocks")
-    child_blocks = relationship("Block", back_populates="parent_block", cascade="all, delete-orphan")
-    comments = relationship("Comment", back_populates="block", cascade="all, delete-orphan")
+    child_blocks = relationship("Block", back_populates="parent_block", cascade="all, delete-orphan", passive_deletes=True)
+    comments = relationship("Comment", back_populates="block", cascade="all, delete-orphan", passive_deletes=True)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, LargeBinary
+from sqlalchemy.sql import func
+from app.core.database import Base
+from app.core.types import GUID
+
+
+class BlockBlob(Base):
+    """
+    Content-addressed storage for block snapshots used by page versions.
+    Each row holds one zlib-compressed block, keyed by the SHA-256 of its
+    canonical JSON, so identical blocks are stored once per page no matter
+    how many versions reference them.
+    """
+    __tablename__ = "block_blobs"
+
+    page_id = Column(GUID, ForeignKey("pages.id", ondelete="CASCADE"), primary_key=True)
+    hash = Column(String(64), primary_key=True)  # SHA-256 hex of the canonical block JSON
+    data = Column(LargeBinary, nullable=False)  # zlib-compressed canonical JSON
+    size_bytes = Column(Integer, nullable=False)  # Uncompressed size
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<BlockBlob(page_id={self.page_id}, hash={self.hash[:12]})>"
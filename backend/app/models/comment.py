@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Boolean, Integer, DateTime, ForeignKey, Text, CheckConstraint
+from sqlalchemy import Column, String, Boolean, Integer, DateTime, ForeignKey, Text, CheckConstraint, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -23,6 +23,10 @@ class Comment(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     edited_at = Column(DateTime(timezone=True), nullable=True)
 
+    # Denormalized counters, maintained on write by crud comment / comment_reaction
+    reply_count = Column(Integer, default=0, nullable=False)  # Non-deleted direct replies
+    reaction_counts = Column(JSON, default=dict, nullable=False)  # {reaction_type: count}
+
     # Relationships
     page = relationship("Page", back_populates="comments")
     block = relationship("Block", back_populates="comments")
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -13,6 +13,7 @@ class CommentMention(Base):
     comment_id = Column(GUID, ForeignKey("comments.id", ondelete="CASCADE"), index=True, nullable=False)
     mentioned_user_id = Column(GUID, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    read_at = Column(DateTime(timezone=True), nullable=True)  # Set when the mentioned user reads it
 
     # Relationships
     comment = relationship("Comment", back_populates="mentions")
@@ -21,4 +22,6 @@ class CommentMention(Base):
     # Table constraints
     __table_args__ = (
         UniqueConstraint("comment_id", "mentioned_user_id", name="uq_comment_mention"),
+        # Mentions inbox: WHERE mentioned_user_id = X ORDER BY created_at DESC
+        Index("ix_comment_mentions_user_created", "mentioned_user_id", "created_at"),
     )
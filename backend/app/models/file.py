@@ -1,6 +1,6 @@
 """
 File model for storing uploaded files metadata.
-Actual files are stored in Cloudinary (or other cloud storage).
+Actual files are stored by a storage backend (Cloudinary or local disk).
 """
 
 import uuid
@@ -24,7 +24,7 @@ class FileType(str, enum.Enum):
 class File(Base):
     """
     Model for storing file metadata.
-    The actual file is stored in cloud storage (Cloudinary).
+    The actual file is stored by the backend named in storage_provider.
     """
     __tablename__ = "files"
 
@@ -37,12 +37,16 @@ class File(Base):
     size_bytes = Column(Integer, nullable=False)  # File size in bytes
 
     # Cloud storage info
-    storage_provider = Column(String(50), nullable=False, default="cloudinary")  # cloudinary, s3, etc.
+    storage_provider = Column(String(50), nullable=False, default="cloudinary")  # cloudinary, local
     storage_url = Column(String(500), nullable=False)  # Full URL to access the file
     storage_id = Column(String(255), nullable=True)  # Provider-specific ID (e.g., Cloudinary public_id)
 
+    # SHA-256 of the contents; identical uploads in a workspace share one stored object
+    content_hash = Column(String(64), nullable=True)
+
     # Optional: Thumbnail for images/videos
     thumbnail_url = Column(String(500), nullable=True)
+    thumbnail_storage_id = Column(String(255), nullable=True)  # Set when the thumbnail was generated and stored by us
 
     # Relationships
     uploaded_by = Column(GUID, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
@@ -67,6 +71,8 @@ class File(Base):
         Index('ix_files_workspace_type', 'workspace_id', 'file_type'),
         Index('ix_files_page', 'page_id'),
         Index('ix_files_block', 'block_id'),
+        Index('ix_files_workspace_content_hash', 'workspace_id', 'content_hash'),
+        Index('ix_files_provider_content_hash', 'storage_provider', 'content_hash'),
     )
 
     def __repr__(self):
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Boolean, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, String, Boolean, Integer, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -16,6 +16,7 @@ class Page(Base):
     icon = Column(String(100), nullable=True)  # emoji
     cover_image = Column(String(500), nullable=True)  # URL
     is_archived = Column(Boolean, default=False, index=True, nullable=False)
+    archived_at = Column(DateTime(timezone=True), nullable=True)  # When moved to trash (drives trash retention)
     is_public = Column(Boolean, default=False, nullable=False)
     public_slug = Column(String(100), unique=True, index=True, nullable=True)
     order = Column(Integer, default=0, nullable=False)
@@ -26,8 +27,14 @@ class Page(Base):
     # Relationships
     workspace = relationship("Workspace", back_populates="pages")
     parent = relationship("Page", remote_side=[id], back_populates="children")
-    children = relationship("Page", back_populates="parent", cascade="all, delete-orphan")
+    # Dependents are removed by their FK cascades; never loaded just to delete them
+    children = relationship("Page", back_populates="parent", cascade="all, delete-orphan", passive_deletes=True)
     creator = relationship("User", back_populates="pages_created")
-    blocks = relationship("Block", back_populates="page", cascade="all, delete-orphan", order_by="Block.order")
-    comments = relationship("Comment", back_populates="page", cascade="all, delete-orphan")
-    versions = relationship("PageVersion", back_populates="page", cascade="all, delete-orphan", order_by="PageVersion.version_number.desc()")
+    blocks = relationship("Block", back_populates="page", cascade="all, delete-orphan", passive_deletes=True, order_by="Block.order")
+    comments = relationship("Comment", back_populates="page", cascade="all, delete-orphan", passive_deletes=True)
+    versions = relationship("PageVersion", back_populates="page", cascade="all, delete-orphan", passive_deletes=True, order_by="PageVersion.version_number.desc()")
+
+    __table_args__ = (
+        # Trash listing and retention: WHERE is_archived AND archived_at < cutoff
+        Index('ix_pages_archived_at', 'is_archived', 'archived_at'),
+    )
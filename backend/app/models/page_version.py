@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, JSON, Text
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, JSON, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -17,7 +17,10 @@ class PageVersion(Base):
     title = Column(String(500), nullable=False)
     icon = Column(String(100), nullable=True)
     cover_image = Column(String(500), nullable=True)
-    content_snapshot = Column(JSON, nullable=False)  # Snapshot of all blocks
+    content_snapshot = Column(JSON, nullable=True)  # Legacy inline snapshot of all blocks
+    block_refs = Column(JSON, nullable=True)  # Ordered BlockBlob hashes making up the snapshot
+    blocks_count = Column(Integer, default=0, nullable=False)  # Number of blocks in snapshot
+    snapshot_size_bytes = Column(Integer, default=0, nullable=False)  # Serialized (uncompressed) snapshot size
 
     # Metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -28,5 +31,10 @@ class PageVersion(Base):
     page = relationship("Page", back_populates="versions")
     creator = relationship("User")
 
+    # Keyset pagination of a page's history by version number
+    __table_args__ = (
+        Index('ix_page_versions_page_version', 'page_id', 'version_number'),
+    )
+
     def __repr__(self):
         return f"<PageVersion(page_id={self.page_id}, version={self.version_number})>"
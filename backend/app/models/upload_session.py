@@ -0,0 +1,50 @@
+"""
+UploadSession model for resumable (chunked) uploads.
+Chunks are kept on local disk until the session is completed or expires.
+"""
+
+import math
+import uuid
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+from app.core.types import GUID
+
+
+class UploadSession(Base):
+    """A resumable upload in progress"""
+    __tablename__ = "upload_sessions"
+
+    id = Column(GUID, primary_key=True, default=uuid.uuid4)
+
+    # Target of the finished upload
+    workspace_id = Column(GUID, ForeignKey("workspaces.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(GUID, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    page_id = Column(GUID, ForeignKey("pages.id", ondelete="CASCADE"), nullable=True)
+    block_id = Column(GUID, ForeignKey("blocks.id", ondelete="CASCADE"), nullable=True)
+    folder = Column(String(100), nullable=False, default="notion-clone")
+
+    # Declared file metadata
+    filename = Column(String(255), nullable=False)
+    mime_type = Column(String(100), nullable=True)
+    size_bytes = Column(BigInteger, nullable=False)
+    chunk_size = Column(Integer, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)  # Pushed back by every chunk received
+
+    __table_args__ = (
+        Index('ix_upload_sessions_expires_at', 'expires_at'),
+    )
+
+    def __repr__(self):
+        return f"<UploadSession(id={self.id}, filename='{self.filename}', size={self.size_bytes})>"
+
+    @property
+    def total_chunks(self) -> int:
+        """Number of chunks the file is split into"""
+        return math.ceil(self.size_bytes / self.chunk_size)
+
+    def chunk_length(self, index: int) -> int:
+        """Expected size of chunk `index` (only the last one may be shorter)"""
+        return min(self.chunk_size, self.size_bytes - index * self.chunk_size)
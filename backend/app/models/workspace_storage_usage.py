@@ -0,0 +1,67 @@
+"""
+Workspace storage accounting.
+WorkspaceStorageUsage is a per-workspace, per-file-type rollup of file counts and bytes;
+WorkspaceStorageQuota holds each workspace's quota and bytes used, and
+WorkspaceStorageReservation the bytes held by each upload in flight. On PostgreSQL both
+usage figures are maintained by statement-level triggers on the files table, so bulk
+inserts (page duplication) and cascaded deletes are counted as well.
+"""
+
+import uuid
+from sqlalchemy import Column, BigInteger, DateTime, ForeignKey, Index, Enum as SQLEnum
+from sqlalchemy.sql import func
+from app.core.database import Base
+from app.core.types import GUID
+from app.models.file import FileType
+
+
+class WorkspaceStorageUsage(Base):
+    """Files and bytes stored by a workspace for one file type"""
+    __tablename__ = "workspace_storage_usage"
+
+    workspace_id = Column(GUID, ForeignKey("workspaces.id", ondelete="CASCADE"), primary_key=True)
+    file_type = Column(SQLEnum(FileType), primary_key=True)
+    file_count = Column(BigInteger, nullable=False, default=0)
+    total_bytes = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<WorkspaceStorageUsage(workspace_id={self.workspace_id}, type={self.file_type}, "
+            f"files={self.file_count}, bytes={self.total_bytes})>"
+        )
+
+
+class WorkspaceStorageQuota(Base):
+    """Quota row: uploads lock it to reserve bytes before storing anything"""
+    __tablename__ = "workspace_storage_quotas"
+
+    workspace_id = Column(GUID, ForeignKey("workspaces.id", ondelete="CASCADE"), primary_key=True)
+    quota_bytes = Column(BigInteger, nullable=True)  # NULL: WORKSPACE_STORAGE_QUOTA_BYTES; 0: unlimited
+    used_bytes = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return (
+            f"<WorkspaceStorageQuota(workspace_id={self.workspace_id}, used={self.used_bytes}, "
+            f"quota={self.quota_bytes})>"
+        )
+
+
+class WorkspaceStorageReservation(Base):
+    """Bytes held against a workspace's quota by one upload in flight"""
+    __tablename__ = "workspace_storage_reservations"
+
+    id = Column(GUID, primary_key=True, default=uuid.uuid4)
+    workspace_id = Column(GUID, ForeignKey("workspaces.id", ondelete="CASCADE"), nullable=False)
+    size_bytes = Column(BigInteger, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)  # Abandoned (crashed upload) after this
+
+    __table_args__ = (
+        Index("ix_workspace_storage_reservations_workspace_expires", "workspace_id", "expires_at"),
+    )
+
+    def __repr__(self):
+        return (
+            f"<WorkspaceStorageReservation(id={self.id}, workspace_id={self.workspace_id}, "
+            f"size={self.size_bytes}, expires_at={self.expires_at})>"
+        )
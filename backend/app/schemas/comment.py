@@ -149,13 +149,32 @@ class CommentWithReplies(CommentResponse):
     replies: List["CommentWithReplies"] = []
 
 
+class CommentThreadListResponse(BaseModel):
+    """Schema for paginated comment threads (pagination is by root comment)"""
+    threads: List[CommentWithReplies]
+    total: Optional[int] = None  # Only counted when include_total=true
+    page: int = 1
+    page_size: int = 20
+    has_more: bool
+    next_cursor: Optional[str] = None  # Pass as `cursor` to get the next page
+
+
 class CommentListResponse(BaseModel):
     """Schema for paginated comment list"""
     comments: List[CommentResponse]
-    total: int
+    total: Optional[int] = None  # Only counted when include_total=true
     page: int = 1
     page_size: int = 20
     has_more: bool
+    next_cursor: Optional[str] = None  # Pass as `cursor` to get the next page
+
+
+class PageCommentSummary(BaseModel):
+    """Comment counts for a page (its own comments plus comments on its blocks)"""
+    page_id: UUID
+    total: int = 0
+    open_threads: int = 0  # Non-deleted top-level comments
+    mentions_me: int = 0  # Comments mentioning the current user
 
 
 # ============================================================================
@@ -168,11 +187,37 @@ class MentionResponse(BaseModel):
     comment_id: UUID
     mentioned_user_id: UUID
     created_at: datetime
+    read_at: Optional[datetime] = None
     mentioned_user: Optional[UserBasic] = None
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class MentionInboxItem(BaseModel):
+    """A mention of the current user, with the comment it appears in"""
+    id: UUID
+    comment_id: UUID
+    created_at: datetime
+    read_at: Optional[datetime] = None
+    comment: CommentResponse
+
+
+class MentionInboxResponse(BaseModel):
+    """Schema for a page of the mentions inbox (keyset paginated)"""
+    items: List[MentionInboxItem]
+    next_cursor: Optional[str] = None  # Pass as `cursor` to get the next page; None when done
+
+
+class MentionMarkRead(BaseModel):
+    """Schema for marking mentions as read (all unread ones when mention_ids is omitted)"""
+    mention_ids: Optional[List[UUID]] = Field(None, max_length=500)
+
+
+class MentionUnreadCount(BaseModel):
+    """Schema for the unread mentions badge"""
+    unread_count: int
+
+
 # ============================================================================
 # Forward Reference Resolution
 # ============================================================================
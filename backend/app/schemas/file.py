@@ -19,11 +19,13 @@ class FileBase(BaseModel):
     storage_url: str = Field(..., max_length=500)
     storage_id: Optional[str] = Field(None, max_length=255)
     thumbnail_url: Optional[str] = Field(None, max_length=500)
+    content_hash: Optional[str] = Field(None, max_length=64)
 
 
 class FileCreate(FileBase):
     """Schema for creating a File"""
     workspace_id: UUID
+    thumbnail_storage_id: Optional[str] = Field(None, max_length=255)
     page_id: Optional[UUID] = None
     block_id: Optional[UUID] = None
 
@@ -61,6 +63,9 @@ class FileResponse(FileInDB):
     """Schema for File response with computed fields"""
     size_kb: float
     size_mb: float
+    # Short-lived links for direct display (presigned on private backends); store storage_url instead
+    download_url: Optional[str] = None
+    thumbnail_download_url: Optional[str] = None
 
     @staticmethod
     def from_orm_with_sizes(file) -> "FileResponse":
@@ -75,6 +80,7 @@ class FileResponse(FileInDB):
             storage_url=file.storage_url,
             storage_id=file.storage_id,
             thumbnail_url=file.thumbnail_url,
+            content_hash=file.content_hash,
             uploaded_by=file.uploaded_by,
             workspace_id=file.workspace_id,
             page_id=file.page_id,
@@ -109,6 +115,34 @@ class WorkspaceStorageStats(BaseModel):
     total_size_bytes: int
     total_size_mb: float
     files_by_type: dict[str, int]
+    quota_bytes: Optional[int] = None  # None: unlimited
+    reserved_bytes: int = 0  # Held by uploads in flight
+    available_bytes: Optional[int] = None
 
     class Config:
         from_attributes = True
+
+
+class UploadSessionCreate(BaseModel):
+    """Schema for starting a resumable upload"""
+    workspace_id: UUID
+    filename: str = Field(..., min_length=1, max_length=255)
+    size_bytes: int = Field(..., gt=0)
+    mime_type: Optional[str] = Field(None, max_length=100)
+    page_id: Optional[UUID] = None
+    block_id: Optional[UUID] = None
+    folder: Optional[str] = Field(default="notion-clone", max_length=100)
+
+
+class UploadSessionResponse(BaseModel):
+    """Schema for a resumable upload's progress"""
+    id: UUID
+    workspace_id: UUID
+    filename: str
+    size_bytes: int
+    chunk_size: int
+    total_chunks: int
+    received_chunks: list[int]
+    received_ranges: list[tuple[int, int]]  # [start, end) byte ranges already stored
+    received_bytes: int
+    expires_at: datetime
@@ -37,6 +37,7 @@ class PageResponse(PageBase):
     workspace_id: UUID
     parent_id: Optional[UUID] = None
     is_archived: bool
+    archived_at: Optional[datetime] = None
     is_public: bool
     public_slug: Optional[str] = None
     order: int
@@ -35,5 +35,50 @@ class PageVersionListItem(BaseModel):
     created_by: Optional[UUID] = None
     change_summary: Optional[str] = None
     blocks_count: int  # Number of blocks in snapshot
+    snapshot_size_bytes: int = 0  # Serialized snapshot size
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class PageMetadataChange(BaseModel):
+    """A page-level field that differs between two versions"""
+    field: str
+    before: Optional[str] = None
+    after: Optional[str] = None
+
+
+class TextDiffSegment(BaseModel):
+    """Word-level diff segment (op is one of equal, insert, delete, replace)"""
+    op: str
+    before: str
+    after: str
+
+
+class BlockMoveDiff(BaseModel):
+    block_id: str
+    order_before: int
+    order_after: int
+    parent_block_id_before: Optional[str] = None
+    parent_block_id_after: Optional[str] = None
+
+
+class BlockChangeDiff(BaseModel):
+    block_id: str
+    type_before: str
+    type_after: str
+    changed_keys: List[str]
+    content: Dict[str, Any]  # Content in the newer version
+    text_diff: List[TextDiffSegment]
+
+
+class PageVersionDiffResponse(BaseModel):
+    """Block-level structural diff between two versions of a page"""
+    page_id: UUID
+    from_version: int
+    to_version: int
+    metadata_changes: List[PageMetadataChange]
+    added: List[Dict[str, Any]]
+    removed: List[Dict[str, Any]]
+    moved: List[BlockMoveDiff]
+    changed: List[BlockChangeDiff]
+    unchanged_count: int
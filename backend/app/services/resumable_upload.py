@@ -0,0 +1,170 @@
+"""
+Resumable uploads.
+A session's chunks are written to <LOCAL_STORAGE_PATH>/.sessions/<session id>/<index> as they
+arrive (in any order, re-sendable) and concatenated into the final file on completion.
+"""
+
+import logging
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, List, Optional, Tuple
+from uuid import UUID
+
+import anyio
+import anyio.to_thread
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud import upload_session as crud_upload_session
+from app.models.upload_session import UploadSession
+from app.services.upload import StagedUpload
+
+logger = logging.getLogger(__name__)
+
+
+def sessions_root() -> str:
+    """Directory holding every session's chunks"""
+    return os.path.join(os.path.abspath(settings.LOCAL_STORAGE_PATH), ".sessions")
+
+
+def session_dir(session_id: UUID) -> str:
+    return os.path.join(sessions_root(), str(session_id))
+
+
+def chunk_paths(upload_session: UploadSession) -> List[str]:
+    """Paths of all chunks in order (complete sessions only)"""
+    directory = session_dir(upload_session.id)
+    return [os.path.join(directory, f"{index:06d}") for index in range(upload_session.total_chunks)]
+
+
+def received_chunks(upload_session: UploadSession) -> List[int]:
+    """Indexes of the chunks stored so far"""
+    try:
+        names = os.listdir(session_dir(upload_session.id))
+    except FileNotFoundError:
+        return []
+    # In-flight chunks are staged under temp names and only renamed once complete
+    return sorted(int(name) for name in names if name.isdigit())
+
+
+def received_ranges(upload_session: UploadSession, chunks: List[int]) -> List[Tuple[int, int]]:
+    """Stored chunks merged into [start, end) byte ranges"""
+    ranges: List[Tuple[int, int]] = []
+    for index in chunks:
+        start = index * upload_session.chunk_size
+        end = start + upload_session.chunk_length(index)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return ranges
+
+
+async def write_chunk(upload_session: UploadSession, index: int, body: AsyncIterator[bytes]) -> None:
+    """
+    Stream one chunk to disk. It must be exactly the expected length; it only becomes
+    visible once complete, and sending the same chunk again replaces it.
+
+    Raises:
+        HTTPException: 400 for a bad index or length, 413 if the chunk is too long
+    """
+    if not 0 <= index < upload_session.total_chunks:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Chunk index must be between 0 and {upload_session.total_chunks - 1}"
+        )
+    expected = upload_session.chunk_length(index)
+
+    directory = session_dir(upload_session.id)
+    await anyio.to_thread.run_sync(lambda: os.makedirs(directory, exist_ok=True))
+
+    staged = StagedUpload(expected, directory)
+    try:
+        async for data in body:
+            if data:
+                await anyio.to_thread.run_sync(staged.write, data)
+        staged.close()
+        if staged.size != expected:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Chunk {index} must be {expected} bytes, got {staged.size}"
+            )
+        os.replace(staged.path, os.path.join(directory, f"{index:06d}"))
+    finally:
+        staged.discard()
+
+
+def remove_session_files(session_id: UUID) -> None:
+    """Delete a session's chunks"""
+    shutil.rmtree(session_dir(session_id), ignore_errors=True)
+
+
+@dataclass
+class SessionPurgeStats:
+    """Counters reported by an upload session cleanup"""
+    sessions_removed: int = 0
+    orphaned_dirs_removed: int = 0
+    elapsed_seconds: float = 0.0
+
+
+def purge_expired_sessions(
+    db: Session,
+    batch_size: int = 100,
+    dry_run: bool = False,
+    now: Optional[datetime] = None
+) -> SessionPurgeStats:
+    """
+    Delete expired upload sessions with their chunks, then chunk directories that have no
+    session record (left behind by a crash) and are older than the session TTL
+    """
+    started = time.monotonic()
+    now = now or datetime.now(timezone.utc)
+    stats = SessionPurgeStats()
+
+    # Dry runs delete nothing, so sessions already counted are skipped explicitly
+    seen: List[UUID] = []
+    while True:
+        session_ids = crud_upload_session.get_expired_ids(db, now, exclude_ids=seen, limit=batch_size)
+        if not session_ids:
+            break
+        for session_id in session_ids:
+            if dry_run:
+                seen.append(session_id)
+            else:
+                upload_session = crud_upload_session.get_by_id(db, session_id)
+                if upload_session is not None:
+                    crud_upload_session.delete(db, upload_session)
+                remove_session_files(session_id)
+            stats.sessions_removed += 1
+        logger.info("Upload session purge: %d sessions removed so far", stats.sessions_removed)
+
+    root = sessions_root()
+    try:
+        names = os.listdir(root)
+    except FileNotFoundError:
+        names = []
+    cutoff = (now - timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)).timestamp()
+    candidates: List[UUID] = []
+    for name in names:
+        try:
+            session_id = UUID(name)
+        except ValueError:
+            continue
+        if os.path.getmtime(os.path.join(root, name)) < cutoff:
+            candidates.append(session_id)
+    for offset in range(0, len(candidates), batch_size):
+        batch = candidates[offset:offset + batch_size]
+        existing = set(crud_upload_session.get_existing_ids(db, batch))
+        for session_id in batch:
+            if session_id in existing:
+                continue
+            if not dry_run:
+                remove_session_files(session_id)
+            stats.orphaned_dirs_removed += 1
+
+    stats.elapsed_seconds = time.monotonic() - started
+    return stats
@@ -0,0 +1,385 @@
+"""
+Storage backends for uploaded files.
+Each provider stores raw bytes under a provider-specific storage_id; File.storage_provider
+records which backend holds a file so reads and deletes go back to the same place.
+"""
+
+import hashlib
+import hmac
+import os
+import re
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterator, Optional, Set
+from urllib.parse import urlencode
+
+import cloudinary
+import cloudinary.api
+import cloudinary.uploader
+import cloudinary.utils
+import requests
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.models.file import FileType
+
+CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class StoredObject:
+    """Where a backend put an uploaded file"""
+    storage_id: str
+    storage_url: str
+    size_bytes: int
+    thumbnail_url: Optional[str] = None
+
+
+class StorageBackend(ABC):
+    """Interface implemented by every storage provider"""
+
+    name: str
+
+    @property
+    def is_configured(self) -> bool:
+        """Whether the backend can be used with the current settings"""
+        return True
+
+    def ensure_configured(self) -> None:
+        """Raise 503 if the backend is missing its configuration"""
+        if not self.is_configured:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"File storage '{self.name}' is not configured"
+            )
+
+    @abstractmethod
+    def put(self, fileobj: BinaryIO, filename: str, file_type: FileType, folder: str) -> StoredObject:
+        """Store the contents of fileobj (read from its current position)"""
+
+    def staging_dir(self) -> Optional[str]:
+        """Directory for upload staging files (None: system temp dir)"""
+        return None
+
+    def put_staged(
+        self, path: str, sha256: str, filename: str, file_type: FileType, folder: str
+    ) -> StoredObject:
+        """Store a fully written staging file whose SHA-256 is already known"""
+        with open(path, "rb") as f:
+            return self.put(f, filename=filename, file_type=file_type, folder=folder)
+
+    @abstractmethod
+    def get(self, storage_id: str) -> bytes:
+        """Return the whole stored object"""
+
+    @abstractmethod
+    def stream(
+        self, storage_id: str, chunk_size: int = CHUNK_SIZE, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[bytes]:
+        """Yield the stored object, or bytes start..end (inclusive) of it, in chunks"""
+
+    @abstractmethod
+    def delete(self, storage_id: str) -> bool:
+        """Remove the stored object; returns False if it was not there"""
+
+    @abstractmethod
+    def presign(self, storage_id: str, expires_in: Optional[int] = None) -> Optional[str]:
+        """
+        Time-limited download URL, or None when the stored URL is already public
+        """
+
+    @abstractmethod
+    def list_objects(self, created_before: datetime, prefix: str = "notion-clone") -> Iterator[str]:
+        """
+        Yield the storage_id of every stored object created before created_before
+        (prefix limits the scan to the app's own folders where the provider has folders)
+        """
+
+    @abstractmethod
+    def find_storage_ids(self, text: str) -> Set[str]:
+        """
+        storage_ids that text (block content, a version snapshot) may embed in this
+        backend's URLs. May over-match: the orphaned file collector keeps whatever it returns.
+        """
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Files on local disk, content-addressed by SHA-256 (<root>/ab/cd/<sha256>).
+    Identical uploads share one file. Downloads go through the blob endpoint: records store
+    its unsigned URL, which does not expire and needs an authenticated workspace member,
+    and presign() mints expiring links that need no authentication.
+    """
+
+    name = "local"
+    _KEY_RE = re.compile(r"[0-9a-f]{64}")
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def path(self, storage_id: str) -> str:
+        """Absolute path of a stored object"""
+        if not self._KEY_RE.fullmatch(storage_id or ""):
+            raise FileNotFoundError(storage_id)
+        return os.path.join(self.root, storage_id[:2], storage_id[2:4], storage_id)
+
+    def url(self, storage_id: str) -> str:
+        """Unsigned blob endpoint URL for a stored object (the stable storage_url)"""
+        return f"{settings.API_V1_STR}/files/blob/{storage_id}"
+
+    def staging_dir(self) -> str:
+        # Same filesystem as the store, so a staged file can be renamed into place
+        path = os.path.join(self.root, ".tmp")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def put(self, fileobj: BinaryIO, filename: str, file_type: FileType, folder: str) -> StoredObject:
+        """Stream into a staging file while hashing, then move it to its content address"""
+        digest = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(dir=self.staging_dir(), delete=False) as tmp:
+            try:
+                while chunk := fileobj.read(CHUNK_SIZE):
+                    digest.update(chunk)
+                    tmp.write(chunk)
+            except BaseException:
+                os.unlink(tmp.name)
+                raise
+        return self.put_staged(tmp.name, digest.hexdigest(), filename, file_type, folder)
+
+    def put_staged(
+        self, path: str, sha256: str, filename: str, file_type: FileType, folder: str
+    ) -> StoredObject:
+        """Move the staging file to its content address (it is consumed either way)"""
+        size = os.path.getsize(path)
+        target = self.path(sha256)
+        if os.path.exists(target):
+            # Same content already stored; touched so the orphan collector treats it as new
+            os.unlink(path)
+            os.utime(target)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(path, target)
+
+        return StoredObject(storage_id=sha256, storage_url=self.url(sha256), size_bytes=size)
+
+    def get(self, storage_id: str) -> bytes:
+        with open(self.path(storage_id), "rb") as f:
+            return f.read()
+
+    def stream(
+        self, storage_id: str, chunk_size: int = CHUNK_SIZE, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[bytes]:
+        with open(self.path(storage_id), "rb") as f:
+            f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def delete(self, storage_id: str) -> bool:
+        try:
+            os.unlink(self.path(storage_id))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _signature(self, storage_id: str, expires: int) -> str:
+        message = f"{storage_id}:{expires}".encode("utf-8")
+        return hmac.new(settings.SECRET_KEY.encode("utf-8"), message, hashlib.sha256).hexdigest()
+
+    def presign(self, storage_id: str, expires_in: Optional[int] = None) -> str:
+        expires = int(time.time()) + (expires_in or settings.STORAGE_URL_EXPIRE_SECONDS)
+        query = urlencode({"expires": expires, "signature": self._signature(storage_id, expires)})
+        return f"{self.url(storage_id)}?{query}"
+
+    def verify(self, storage_id: str, expires: int, signature: str) -> bool:
+        """Check a presigned URL's signature and expiry"""
+        if expires < time.time():
+            return False
+        return hmac.compare_digest(self._signature(storage_id, expires), signature)
+
+    def list_objects(self, created_before: datetime, prefix: str = "notion-clone") -> Iterator[str]:
+        """Objects by modification time; the store is flat, so prefix does not apply"""
+        cutoff = created_before.timestamp()
+        for directory, subdirs, names in os.walk(self.root):
+            if directory == self.root:
+                # Staging files and resumable upload chunks are not stored objects
+                subdirs[:] = [name for name in subdirs if not name.startswith(".")]
+            for name in names:
+                if not self._KEY_RE.fullmatch(name):
+                    continue
+                try:
+                    if os.path.getmtime(os.path.join(directory, name)) < cutoff:
+                        yield name
+                except FileNotFoundError:
+                    continue
+
+    def find_storage_ids(self, text: str) -> Set[str]:
+        # Blob URLs, signed or not, end in the content hash
+        return set(self._KEY_RE.findall(text))
+
+
+class CloudinaryStorageBackend(StorageBackend):
+    """Files on Cloudinary; delivery URLs are public"""
+
+    name = "cloudinary"
+    # Delivery URL path after the transformations and version: <public_id>[.<format>]
+    _DELIVERY_RE = re.compile(r"/upload/(?:[^/\s\"'?#]+/)*?v\d+/([^\s\"'?#<>\\]+)")
+
+    def __init__(self):
+        if self.is_configured:
+            cloudinary.config(
+                cloud_name=settings.CLOUDINARY_CLOUD_NAME,
+                api_key=settings.CLOUDINARY_API_KEY,
+                api_secret=settings.CLOUDINARY_API_SECRET,
+                secure=True
+            )
+
+    @property
+    def is_configured(self) -> bool:
+        return settings.is_cloudinary_configured
+
+    def put(self, fileobj: BinaryIO, filename: str, file_type: FileType, folder: str) -> StoredObject:
+        result = cloudinary.uploader.upload(
+            fileobj,
+            folder=folder,
+            resource_type="auto",  # Let Cloudinary detect the type
+            use_filename=True,
+            unique_filename=True,
+            timeout=settings.UPLOAD_TIMEOUT_SECONDS
+        )
+
+        # Generate thumbnail for images and videos
+        thumbnail_url = None
+        if file_type == FileType.IMAGE:
+            thumbnail_url = cloudinary.CloudinaryImage(result['public_id']).build_url(
+                transformation=[
+                    {'width': 200, 'height': 200, 'crop': 'fill'},
+                    {'quality': 'auto', 'fetch_format': 'auto'}
+                ]
+            )
+        elif file_type == FileType.VIDEO:
+            # Cloudinary automatically generates video thumbnails
+            thumbnail_url = result.get('thumbnail_url') or cloudinary.CloudinaryVideo(result['public_id']).build_url(
+                transformation=[
+                    {'width': 200, 'height': 200, 'crop': 'fill'},
+                    {'quality': 'auto'}
+                ],
+                format='jpg'
+            )
+
+        return StoredObject(
+            storage_id=result['public_id'],
+            storage_url=result['secure_url'],
+            size_bytes=result.get('bytes', 0),
+            thumbnail_url=thumbnail_url
+        )
+
+    def get(self, storage_id: str) -> bytes:
+        return b"".join(self.stream(storage_id))
+
+    def stream(
+        self, storage_id: str, chunk_size: int = CHUNK_SIZE, start: int = 0, end: Optional[int] = None
+    ) -> Iterator[bytes]:
+        headers = {}
+        if start or end is not None:
+            headers["Range"] = f"bytes={start}-{'' if end is None else end}"
+
+        # Uploads use resource_type="auto", so the delivery path is not known from the public_id
+        for resource_type in ("image", "video", "raw"):
+            url = cloudinary.utils.cloudinary_url(storage_id, resource_type=resource_type, secure=True)[0]
+            with requests.get(
+                url, headers=headers, stream=True, timeout=settings.UPLOAD_TIMEOUT_SECONDS
+            ) as response:
+                if response.status_code == 404:
+                    continue
+                response.raise_for_status()
+                chunks = response.iter_content(chunk_size)
+                if headers and response.status_code != 206:
+                    # Range ignored: cut the requested bytes out of the whole object
+                    chunks = _slice_chunks(chunks, start, end)
+                yield from chunks
+                return
+        raise FileNotFoundError(storage_id)
+
+    def delete(self, storage_id: str, resource_type: str = "auto") -> bool:
+        result = cloudinary.uploader.destroy(
+            storage_id,
+            resource_type=resource_type,
+            timeout=settings.UPLOAD_TIMEOUT_SECONDS
+        )
+        return result.get('result') == 'ok'
+
+    def presign(self, storage_id: str, expires_in: Optional[int] = None) -> None:
+        return None
+
+    def list_objects(self, created_before: datetime, prefix: str = "notion-clone") -> Iterator[str]:
+        for resource_type in ("image", "video", "raw"):
+            options = {}
+            while True:
+                page = cloudinary.api.resources(
+                    type="upload",
+                    resource_type=resource_type,
+                    prefix=prefix,
+                    max_results=500,
+                    timeout=settings.UPLOAD_TIMEOUT_SECONDS,
+                    **options
+                )
+                for resource in page.get("resources", []):
+                    created_at = datetime.fromisoformat(resource["created_at"].replace("Z", "+00:00"))
+                    if created_at < created_before:
+                        yield resource["public_id"]
+                if not page.get("next_cursor"):
+                    break
+                options["next_cursor"] = page["next_cursor"]
+
+    def find_storage_ids(self, text: str) -> Set[str]:
+        found = set()
+        for path in self._DELIVERY_RE.findall(text):
+            # Image and video public_ids have no extension, raw ones keep it
+            found.add(path)
+            stem, dot, extension = path.rpartition(".")
+            if dot and "/" not in extension:
+                found.add(stem)
+        return found
+
+
+def _slice_chunks(chunks: Iterator[bytes], start: int, end: Optional[int]) -> Iterator[bytes]:
+    """Bytes start..end (inclusive) of a chunked stream"""
+    offset = 0
+    for chunk in chunks:
+        chunk_start, offset = offset, offset + len(chunk)
+        if offset <= start:
+            continue
+        if end is not None and chunk_start > end:
+            return
+        yield chunk[max(start - chunk_start, 0):None if end is None else end + 1 - chunk_start]
+
+
+_backends: Dict[str, StorageBackend] = {}
+
+
+def get_storage_backend(name: Optional[str] = None) -> StorageBackend:
+    """
+    Backend instance by provider name (default: settings.STORAGE_BACKEND).
+    "auto" picks Cloudinary when it is configured and local disk otherwise.
+    """
+    name = name or settings.STORAGE_BACKEND
+    if name == "auto":
+        name = "cloudinary" if settings.is_cloudinary_configured else "local"
+
+    if name not in _backends:
+        if name == "local":
+            _backends[name] = LocalStorageBackend(settings.LOCAL_STORAGE_PATH)
+        elif name == "cloudinary":
+            _backends[name] = CloudinaryStorageBackend()
+        else:
+            raise ValueError(f"Unknown storage backend '{name}'")
+    return _backends[name]
@@ -0,0 +1,231 @@
+"""
+Orphaned file collection.
+Deleting a page or block cascades to its file records but leaves the stored objects behind,
+and a block whose content drops a file keeps the record. The collector removes file records
+attached to blocks that no longer mention them, then stored objects no file record points at.
+Content that can come back without its file record (current blocks, and the page version
+snapshots a restore brings back) counts as a live reference in both passes.
+"""
+
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.crud import block as crud_block
+from app.crud import file as crud_file
+from app.crud import page_version as crud_page_version
+from app.models.file import File
+from app.services.storage import StorageBackend
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StorageGCStats:
+    """Counters reported by an orphaned file collection"""
+    files_scanned: int = 0
+    unreferenced_files: int = 0
+    objects_scanned: int = 0
+    orphaned_objects: int = 0
+    objects_deleted: int = 0
+    delete_failures: int = 0
+    bytes_freed: int = 0
+    elapsed_seconds: float = 0.0
+
+
+class _RateLimiter:
+    """Spaces storage deletes at most rate per second apart"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_at = 0.0
+
+    def wait(self) -> None:
+        now = time.monotonic()
+        if self.next_at > now:
+            time.sleep(self.next_at - now)
+            now = self.next_at
+        self.next_at = now + self.interval
+
+
+def _content_text(content) -> str:
+    return content if isinstance(content, str) else json.dumps(content, ensure_ascii=False)
+
+
+def is_referenced_by_block(db_file: File, content) -> bool:
+    """
+    Whether a block's content still mentions the file: by id, or by storage_id, which is
+    part of every URL the file is served from (delivery URL, blob URL, presigned URL)
+    """
+    text = _content_text(content)
+    return str(db_file.id) in text or (bool(db_file.storage_id) and db_file.storage_id in text)
+
+
+def get_embedded_storage_ids(
+    db: Session,
+    backends: List[StorageBackend],
+    batch_size: int = 100
+) -> Dict[str, Set[str]]:
+    """
+    storage_ids embedded in any block's content or any page version snapshot, by backend
+    name. Read once per collection, before anything is deleted.
+    """
+    embedded: Dict[str, Set[str]] = {backend.name: set() for backend in backends}
+    texts = (_content_text(content) for content in crud_block.iter_contents(db, batch_size))
+    for source in (texts, crud_page_version.iter_snapshot_texts(db, batch_size)):
+        for text in source:
+            for backend in backends:
+                embedded[backend.name] |= backend.find_storage_ids(text)
+    db.rollback()
+    return embedded
+
+
+def _delete_object(
+    backend: StorageBackend,
+    storage_id: str,
+    limiter: _RateLimiter,
+    stats: StorageGCStats
+) -> bool:
+    """Rate-limited delete of one stored object; failures are counted and logged"""
+    limiter.wait()
+    try:
+        deleted = backend.delete(storage_id)
+    except Exception:
+        stats.delete_failures += 1
+        logger.exception("Failed to delete stored object %s from %s", storage_id, backend.name)
+        return False
+    if deleted:
+        stats.objects_deleted += 1
+    return deleted
+
+
+def _collect_unreferenced_files(
+    db: Session,
+    backends: List[StorageBackend],
+    embedded: Dict[str, Set[str]],
+    created_before: datetime,
+    batch_size: int,
+    limiter: _RateLimiter,
+    stats: StorageGCStats,
+    dry_run: bool
+) -> None:
+    """Delete block-attached file records the block no longer mentions, and their objects"""
+    by_name = {backend.name: backend for backend in backends}
+    last_id = None
+    while True:
+        rows = crud_file.get_block_attached_files(db, created_before, after_id=last_id, limit=batch_size)
+        if not rows:
+            break
+        last_id = rows[-1][0].id
+        stats.files_scanned += len(rows)
+
+        for db_file, content in rows:
+            backend = by_name.get(db_file.storage_provider)
+            if backend is None:
+                # Left for a run that scans this provider
+                continue
+            if is_referenced_by_block(db_file, content) or db_file.storage_id in embedded[backend.name]:
+                # Still shown by its block, another block or a restorable version
+                continue
+            stats.unreferenced_files += 1
+            if dry_run:
+                continue
+
+            storage_id = db_file.storage_id
+            size_bytes = db_file.size_bytes
+            # Committed once the objects are gone, like a file deleted through the API
+            unreferenced = crud_file.delete_file_locked(db, db_file)
+            try:
+                for unreferenced_id in unreferenced:
+                    if unreferenced_id in embedded[backend.name]:
+                        continue
+                    if _delete_object(backend, unreferenced_id, limiter, stats) and unreferenced_id == storage_id:
+                        stats.bytes_freed += size_bytes
+            finally:
+                db.commit()
+        logger.info(
+            "Orphaned file collection: %d block files scanned, %d unreferenced",
+            stats.files_scanned, stats.unreferenced_files
+        )
+
+
+def _collect_orphaned_objects(
+    db: Session,
+    backend: StorageBackend,
+    embedded: Set[str],
+    created_before: datetime,
+    batch_size: int,
+    limiter: _RateLimiter,
+    stats: StorageGCStats,
+    dry_run: bool,
+    prefix: str
+) -> None:
+    """Delete stored objects that no file record points at and no content embeds"""
+    batch: List[str] = []
+
+    def flush() -> None:
+        referenced = crud_file.get_referenced_storage_ids(db, backend.name, batch)
+        db.rollback()
+        for storage_id in batch:
+            if storage_id in referenced or storage_id in embedded:
+                continue
+            stats.orphaned_objects += 1
+            if dry_run:
+                continue
+            # Re-checked under the content hash lock (a local storage_id is the content
+            # hash), which an upload reusing the object holds until its record commits
+            try:
+                crud_file.lock_content_hash(db, backend.name, storage_id)
+                if not crud_file.is_storage_referenced(db, backend.name, storage_id):
+                    _delete_object(backend, storage_id, limiter, stats)
+            finally:
+                db.commit()
+        batch.clear()
+
+    for storage_id in backend.list_objects(created_before, prefix=prefix):
+        stats.objects_scanned += 1
+        batch.append(storage_id)
+        if len(batch) >= batch_size:
+            flush()
+            logger.info(
+                "Orphaned file collection (%s): %d objects scanned, %d orphaned",
+                backend.name, stats.objects_scanned, stats.orphaned_objects
+            )
+    if batch:
+        flush()
+
+
+def collect_orphaned_files(
+    db: Session,
+    backends: List[StorageBackend],
+    min_age_hours: float = 24,
+    batch_size: int = 100,
+    deletes_per_second: float = 10,
+    dry_run: bool = False,
+    prefix: str = "notion-clone",
+    now: Optional[datetime] = None
+) -> StorageGCStats:
+    """
+    Remove unreferenced block files, then orphaned stored objects from each backend.
+    Anything newer than min_age_hours is left alone: an upload stores its object before
+    creating the record, and a block is saved after the file attached to it is uploaded.
+    """
+    started = time.monotonic()
+    created_before = (now or datetime.now(timezone.utc)) - timedelta(hours=min_age_hours)
+    limiter = _RateLimiter(deletes_per_second)
+    stats = StorageGCStats()
+
+    embedded = get_embedded_storage_ids(db, backends, batch_size)
+    _collect_unreferenced_files(db, backends, embedded, created_before, batch_size, limiter, stats, dry_run)
+    for backend in backends:
+        _collect_orphaned_objects(
+            db, backend, embedded[backend.name], created_before, batch_size, limiter, stats, dry_run, prefix
+        )
+
+    stats.elapsed_seconds = time.monotonic() - started
+    return stats
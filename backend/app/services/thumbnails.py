@@ -0,0 +1,144 @@
+"""
+Thumbnail generation for uploaded images.
+Thumbnails are rendered in a process pool by a background task after the upload response
+is sent, stored through the file's storage backend and attached to File.thumbnail_url.
+Backends with their own thumbnails (Cloudinary transformations) already set thumbnail_url
+on upload and are skipped.
+"""
+
+import io
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Union
+from uuid import UUID
+
+from fastapi import BackgroundTasks
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud import file as crud_file
+from app.models.file import File, FileType
+from app.services.storage import LocalStorageBackend, get_storage_backend
+
+logger = logging.getLogger(__name__)
+
+# Image types Pillow can decode
+SOURCE_MIME_TYPES = {
+    "image/jpeg", "image/jpg", "image/png", "image/gif", "image/webp", "image/bmp"
+}
+
+# Larger originals are left without a thumbnail rather than decoded in full
+MAX_SOURCE_BYTES = 50 * 1024 * 1024
+
+THUMBNAIL_QUALITY = 80
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Worker pool, started on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a multi-threaded server process is not safe
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.THUMBNAIL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def render_thumbnail(source: Union[str, bytes], max_size: int) -> bytes:
+    """
+    Resize an image so its longest side is at most max_size and encode it as WebP.
+    Runs in a worker process; source is a file path or the image bytes.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source if isinstance(source, str) else io.BytesIO(source)) as image:
+        # Lets the JPEG decoder downscale while decoding
+        image.draft("RGB", (max_size, max_size))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_size, max_size))
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+
+        output = io.BytesIO()
+        image.save(output, "WEBP", quality=THUMBNAIL_QUALITY)
+        return output.getvalue()
+
+
+def _render(source: Union[str, bytes]) -> bytes:
+    """Render a thumbnail in the worker pool, replacing the pool if a worker died"""
+    global _pool
+    pool = _get_pool()
+    try:
+        return pool.submit(render_thumbnail, source, settings.THUMBNAIL_MAX_SIZE).result(
+            timeout=settings.UPLOAD_TIMEOUT_SECONDS
+        )
+    except BrokenProcessPool:
+        with _pool_lock:
+            if _pool is pool:
+                _pool = None
+        pool.shutdown(wait=False)
+        raise
+
+
+def needs_thumbnail(db_file: File) -> bool:
+    """Whether a thumbnail should be generated for the file"""
+    return (
+        db_file.mime_type in SOURCE_MIME_TYPES
+        and not db_file.thumbnail_url
+        and bool(db_file.storage_id)
+        and db_file.size_bytes <= MAX_SOURCE_BYTES
+    )
+
+
+def generate_thumbnail(file_id: UUID) -> bool:
+    """
+    Render, store and attach a thumbnail for a file (and every record sharing its stored
+    object). Returns whether a thumbnail was attached; failures are logged, not raised.
+    """
+    db = SessionLocal()
+    try:
+        db_file = crud_file.get_file_by_id(db, file_id)
+        if db_file is None or not needs_thumbnail(db_file):
+            return False
+
+        backend = get_storage_backend(db_file.storage_provider)
+        if isinstance(backend, LocalStorageBackend):
+            source = backend.path(db_file.storage_id)
+        else:
+            source = backend.get(db_file.storage_id)
+
+        data = _render(source)
+
+        stored = backend.put(
+            io.BytesIO(data),
+            filename=f"thumbnail_{db_file.filename}",
+            file_type=FileType.IMAGE,
+            folder=f"notion-clone/{db_file.workspace_id}/thumbnails"
+        )
+        crud_file.set_thumbnail(
+            db,
+            storage_provider=db_file.storage_provider,
+            storage_id=db_file.storage_id,
+            thumbnail_url=stored.storage_url,
+            thumbnail_storage_id=stored.storage_id
+        )
+        return True
+    except Exception:
+        logger.exception("Failed to generate thumbnail for file %s", file_id)
+        return False
+    finally:
+        db.close()
+
+
+def schedule_thumbnail(background_tasks: BackgroundTasks, db_file: File) -> None:
+    """Queue thumbnail generation for a new file if it needs one"""
+    if needs_thumbnail(db_file):
+        background_tasks.add_task(generate_thumbnail, db_file.id)
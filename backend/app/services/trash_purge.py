@@ -0,0 +1,91 @@
+"""
+Trash retention.
+Pages archived longer than the retention period are permanently deleted in bounded batches.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.crud import page as crud_page
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PurgeStats:
+    """Counters reported by a purge run"""
+    trash_roots_purged: int = 0
+    pages_deleted: int = 0
+    batches: int = 0
+    errors: int = 0
+    failed_pages: List[UUID] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+
+def purge_expired_trash(
+    db: Session,
+    retention_days: int,
+    batch_size: int = 100,
+    max_batches: Optional[int] = None,
+    dry_run: bool = False,
+    now: Optional[datetime] = None
+) -> PurgeStats:
+    """
+    Permanently delete pages archived more than retention_days ago.
+    Each batch fetches up to batch_size expired pages and deletes each with its subtree
+    (deepest first, ON DELETE CASCADE for dependents). A failing page is logged and skipped.
+    """
+    started = time.monotonic()
+    archived_before = (now or datetime.now(timezone.utc)) - timedelta(days=retention_days)
+    stats = PurgeStats()
+    # Dry runs delete nothing, so pages already counted (with their subtrees) are tracked here
+    seen: List[UUID] = []
+    counted: Set[UUID] = set()
+
+    while max_batches is None or stats.batches < max_batches:
+        page_ids = crud_page.get_expired_archived_ids(
+            db, archived_before, exclude_ids=stats.failed_pages + seen, limit=batch_size
+        )
+        if not page_ids:
+            break
+        stats.batches += 1
+
+        for page_id in page_ids:
+            page = crud_page.get_by_id(db, page_id=page_id)
+            if page is None:
+                # Already removed with an expired ancestor earlier in this batch
+                continue
+
+            if dry_run:
+                seen.append(page_id)
+                if page_id not in counted:
+                    stats.trash_roots_purged += 1
+                subtree = set(crud_page.get_subtree_ids(db, page_id))
+                stats.pages_deleted += len(subtree - counted)
+                counted.update(subtree)
+                continue
+
+            try:
+                stats.pages_deleted += crud_page.delete(db, page=page)
+            except Exception:
+                db.rollback()
+                stats.errors += 1
+                stats.failed_pages.append(page_id)
+                logger.exception("Trash purge failed for page %s", page_id)
+                continue
+            stats.trash_roots_purged += 1
+
+        db.rollback()
+        logger.info(
+            "Trash purge batch %d: %d pages deleted so far (%d errors)",
+            stats.batches, stats.pages_deleted, stats.errors
+        )
+
+    stats.elapsed_seconds = time.monotonic() - started
+    return stats
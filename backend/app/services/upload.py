@@ -1,18 +1,239 @@
 """
-Upload service for handling file uploads to cloud storage (Cloudinary).
+Upload service for handling file uploads to the configured storage backend.
 """
 
 import cloudinary
-import cloudinary.uploader
-from typing import Optional, Dict, Any
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from dataclasses import dataclass
+from functools import partial
+from typing import Optional, Dict, Any, AsyncIterator, Callable, List, TypeVar
+from uuid import UUID
+import anyio
+import anyio.from_thread
+import anyio.to_thread
 from fastapi import UploadFile, HTTPException, status
 import mimetypes
+from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud import file as crud_file
+from app.crud import storage_quota as crud_storage_quota
+from app.crud import upload_session as crud_upload_session
 from app.models.file import FileType
+from app.schemas.file import FileCreate
+from app.services.storage import CHUNK_SIZE, StorageBackend, get_storage_backend
+
+T = TypeVar("T")
+
+# Bytes kept from the start of an upload for type sniffing
+SNIFF_BYTES = 512
+
+# Office Open XML documents are ZIP archives; the declared type is trusted for those
+OOXML_TYPES = {
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+}
+
+# Declared types that always start with a recognisable signature
+SIGNED_TYPES = {
+    "image/png", "image/jpeg", "image/jpg", "image/gif",
+    "image/webp", "image/bmp", "application/pdf",
+}
+
+
+def sniff_mime_type(head: bytes) -> Optional[str]:
+    """MIME type from a file's leading magic bytes, or None if not recognised"""
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if head.startswith(b"BM"):
+        return "image/bmp"
+    if head.startswith(b"RIFF") and len(head) >= 12:
+        return {b"WEBP": "image/webp", b"WAVE": "audio/wav", b"AVI ": "video/x-msvideo"}.get(head[8:12])
+    if head.startswith(b"%PDF-"):
+        return "application/pdf"
+    if head.startswith(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"):
+        # OLE2 container: legacy doc/xls/ppt
+        return "application/msword"
+    if head.startswith(b"PK\x03\x04"):
+        return "application/zip"
+    if head[4:8] == b"ftyp":
+        brand = head[8:12]
+        if brand == b"M4A ":
+            return "audio/mp4"
+        return "video/quicktime" if brand == b"qt  " else "video/mp4"
+    if head.startswith(b"\x1a\x45\xdf\xa3"):
+        return "video/webm"
+    if head.startswith(b"OggS"):
+        return "audio/ogg"
+    if head.startswith(b"ID3") or head[:2] in (b"\xff\xfb", b"\xff\xf3", b"\xff\xf2"):
+        return "audio/mpeg"
+    if head.startswith(b"\x00\x00\x01\xba") or head.startswith(b"\x00\x00\x01\xb3"):
+        return "video/mpeg"
+    return None
+
+
+class StagedUpload:
+    """
+    Upload body written chunk by chunk to a staging file while it is hashed and measured.
+    Writing past max_size raises 413 straight away, so an oversized body is never read in full.
+    """
+
+    def __init__(self, max_size: int, staging_dir: Optional[str] = None):
+        self.max_size = max_size
+        self.size = 0
+        self.head = b""
+        self._digest = hashlib.sha256()
+        self._file = tempfile.NamedTemporaryFile(dir=staging_dir, delete=False)
+        self.path = self._file.name
+
+    @property
+    def sha256(self) -> str:
+        if self._digest is None:
+            # Contents were appended without passing through Python: hash the file once
+            if not self._file.closed:
+                self._file.flush()
+            self._digest = hashlib.sha256()
+            with open(self.path, "rb") as f:
+                while chunk := f.read(CHUNK_SIZE):
+                    self._digest.update(chunk)
+        return self._digest.hexdigest()
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File size exceeds maximum allowed size of {self.max_size / (1024 * 1024)}MB"
+            )
+        if len(self.head) < SNIFF_BYTES:
+            self.head += chunk[:SNIFF_BYTES - len(self.head)]
+        self._digest.update(chunk)
+        self._file.write(chunk)
+
+    def append_file(self, path: str) -> None:
+        """
+        Append a file's contents with copy_file_range (kernel-side, no copy through
+        user space), falling back to a buffered copy where it is unavailable
+        """
+        length = os.path.getsize(path)
+        if self.size + length > self.max_size:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File size exceeds maximum allowed size of {self.max_size / (1024 * 1024)}MB"
+            )
+
+        with open(path, "rb") as src:
+            if len(self.head) < SNIFF_BYTES:
+                self.head += src.read(SNIFF_BYTES - len(self.head))
+
+            self._file.flush()
+            copied = 0
+            try:
+                while copied < length:
+                    # Explicit source offset: the buffered read above moved the descriptor's own
+                    n = os.copy_file_range(
+                        src.fileno(), self._file.fileno(), length - copied, offset_src=copied
+                    )
+                    if n == 0:
+                        break
+                    copied += n
+            except (AttributeError, OSError):
+                pass
+            if copied < length:
+                src.seek(copied)
+                shutil.copyfileobj(src, self._file, CHUNK_SIZE)
+            # copy_file_range moved the descriptor's offset behind the buffered file's back
+            self._file.seek(0, os.SEEK_END)
+
+        self.size += length
+        self._digest = None
+
+    def close(self) -> None:
+        self._file.close()
+
+    def discard(self) -> None:
+        """Close and remove the staging file if the backend did not consume it"""
+        self._file.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+@dataclass
+class UploadTarget:
+    """Where an upload's file record goes and who made it"""
+    workspace_id: UUID
+    uploaded_by: UUID
+    page_id: Optional[UUID] = None
+    block_id: Optional[UUID] = None
+    # Resumable upload being completed; its record is deleted with the file's creation
+    upload_session_id: Optional[UUID] = None
+
+
+# The _WorkerCall the current worker thread is running, if any
+_current_call = threading.local()
+
+
+class _WorkerCall:
+    """
+    A transfer slot handed to a worker thread. The thread gives it back when it finishes,
+    also after the waiting request gave up, so abandoned transfers still count toward
+    the concurrency limit.
+    """
+
+    def __init__(self, limiter: anyio.CapacityLimiter):
+        self.limiter = limiter
+        self._lock = threading.Lock()
+        self._started = False
+        self._abandoned = False
+
+    @property
+    def abandoned(self) -> bool:
+        return self._abandoned
+
+    def run(self, func: Callable[[], T]) -> Optional[T]:
+        """Run func in the worker thread, then release the slot"""
+        with self._lock:
+            if self._abandoned:
+                return None
+            self._started = True
+        _current_call.call = self
+        try:
+            return func()
+        finally:
+            _current_call.call = None
+            anyio.from_thread.run_sync(self.limiter.release_on_behalf_of, self)
+
+    def abandon(self) -> bool:
+        """
+        Stop waiting; releases the slot here if the thread never started.
+        Returns whether the thread started, and so owns whatever func was given.
+        """
+        with self._lock:
+            self._abandoned = True
+            if not self._started:
+                self.limiter.release_on_behalf_of(self)
+            return self._started
+
+
+def _call_abandoned() -> bool:
+    """Whether the request waiting for this worker thread has given up on it"""
+    call = getattr(_current_call, "call", None)
+    return call is not None and call.abandoned
 
 
 class UploadService:
-    """Service for handling file uploads to Cloudinary"""
+    """Service for validating uploads and handing them to a storage backend"""
 
     # Maximum file size (default: 10MB)
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB in bytes
@@ -41,25 +262,54 @@ class UploadService:
     }
 
     def __init__(self):
-        """Initialize Cloudinary configuration"""
-        self._configured = False
-
-        if settings.is_cloudinary_configured:
-            cloudinary.config(
-                cloud_name=settings.CLOUDINARY_CLOUD_NAME,
-                api_key=settings.CLOUDINARY_API_KEY,
-                api_secret=settings.CLOUDINARY_API_SECRET,
-                secure=True
-            )
-            self._configured = True
+        """Set up the transfer limiter"""
+        # Bounds storage transfers per worker; created on first use inside the event loop
+        self._limiter: Optional[anyio.CapacityLimiter] = None
+
+    def _get_backend(self, provider: Optional[str] = None) -> StorageBackend:
+        """Storage backend by provider name (default: the configured one), 503 if unusable"""
+        backend = get_storage_backend(provider)
+        backend.ensure_configured()
+        return backend
 
-    def _ensure_configured(self):
-        """Ensure Cloudinary is configured before operations"""
-        if not self._configured:
+    async def _run_blocking(
+        self,
+        func: Callable[..., T],
+        *args,
+        on_not_started: Optional[Callable[[], None]] = None,
+        **kwargs
+    ) -> T:
+        """
+        Run blocking storage I/O in a worker thread, at most UPLOAD_MAX_CONCURRENCY at a time.
+        The wait is capped at UPLOAD_TIMEOUT_SECONDS from the moment a slot is free; time
+        queued behind other transfers does not count. On timeout the thread is abandoned,
+        so func must not use the request's session, and must clean up after itself: the
+        request cannot tell when it is done. on_not_started runs instead when func never
+        ran (cancelled while queued).
+
+        Raises:
+            HTTPException: 504 if the transfer does not finish in time
+        """
+        if self._limiter is None:
+            self._limiter = anyio.CapacityLimiter(settings.UPLOAD_MAX_CONCURRENCY)
+
+        call = _WorkerCall(self._limiter)
+        await self._limiter.acquire_on_behalf_of(call)
+        try:
+            with anyio.fail_after(settings.UPLOAD_TIMEOUT_SECONDS):
+                # Cloudinary calls also get their own HTTP timeout, so an abandoned
+                # thread does not keep its slot for long
+                return await anyio.to_thread.run_sync(
+                    call.run, partial(func, *args, **kwargs), abandon_on_cancel=True
+                )
+        except TimeoutError:
             raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="File upload service is not configured. Please configure Cloudinary credentials."
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail="File storage did not respond in time"
             )
+        finally:
+            if not call.abandon() and on_not_started is not None:
+                on_not_started()
 
     def _determine_file_type(self, mime_type: Optional[str]) -> FileType:
         """Determine FileType enum from MIME type"""
@@ -77,155 +327,325 @@ class UploadService:
         else:
             return FileType.OTHER
 
-    def _validate_file(self, file: UploadFile) -> None:
-        """Validate file before upload"""
-        # Check file size
-        file.file.seek(0, 2)  # Seek to end
-        file_size = file.file.tell()
-        file.file.seek(0)  # Reset to beginning
-
-        if file_size > self.MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"File size exceeds maximum allowed size of {self.MAX_FILE_SIZE / (1024 * 1024)}MB"
-            )
-
-        # Determine MIME type
-        mime_type = file.content_type
-        if not mime_type:
-            # Guess from filename
-            guessed_type, _ = mimetypes.guess_type(file.filename)
-            mime_type = guessed_type
-
-        # Check if MIME type is allowed
+    def is_allowed_type(self, mime_type: Optional[str]) -> bool:
+        """Whether uploads of this MIME type are accepted (unknown types are)"""
         all_allowed_types = (
             self.ALLOWED_IMAGE_TYPES |
             self.ALLOWED_VIDEO_TYPES |
             self.ALLOWED_DOCUMENT_TYPES |
             self.ALLOWED_AUDIO_TYPES
         )
+        return not mime_type or mime_type in all_allowed_types
+
+    def _resolve_mime_type(
+        self,
+        head: bytes,
+        declared: Optional[str],
+        filename: Optional[str]
+    ) -> Optional[str]:
+        """
+        MIME type of an upload: sniffed from its first bytes when recognisable,
+        otherwise the declared type or a guess from the filename. Raises 415 if not allowed.
+        """
+        if declared == "application/octet-stream":
+            declared = None
+        if not declared and filename:
+            declared, _ = mimetypes.guess_type(filename)
 
-        if mime_type and mime_type not in all_allowed_types:
+        sniffed = sniff_mime_type(head)
+        if sniffed is None and declared in SIGNED_TYPES:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail=f"File content does not match its type '{declared}'"
+            )
+        if sniffed == "application/zip" and declared in OOXML_TYPES:
+            mime_type = declared
+        elif sniffed == "application/msword" and declared and declared.startswith("application/vnd.ms-"):
+            mime_type = declared
+        else:
+            mime_type = sniffed or declared
+
+        if not self.is_allowed_type(mime_type):
             raise HTTPException(
                 status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
                 detail=f"File type '{mime_type}' is not supported"
             )
+        return mime_type
+
+    def _quota_exceeded(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_507_INSUFFICIENT_STORAGE,
+            detail="Workspace storage quota exceeded"
+        )
+
+    def check_quota(self, db: Session, workspace_id: UUID, size_bytes: int) -> None:
+        """
+        Reject an upload of size_bytes up front if it would not fit in the workspace's
+        storage quota (the reservation itself happens once the file is staged)
+
+        Raises:
+            HTTPException: 507 if the quota would be exceeded
+        """
+        if not crud_storage_quota.has_room(db, workspace_id, size_bytes):
+            raise self._quota_exceeded()
+
+    def _store_staged(
+        self,
+        backend: StorageBackend,
+        staged: StagedUpload,
+        filename: str,
+        declared_mime_type: Optional[str],
+        folder: str,
+        target: UploadTarget
+    ) -> UUID:
+        """
+        Validate a complete staged upload, store it and create its file record; runs in a
+        worker thread with its own session, as the request may stop waiting for it.
+        The size is reserved against the workspace's storage quota first (507 when full),
+        and the reservation is given back in the commit that creates the record. Returns
+        the new file's ID.
+        """
+        staged.close()
+        if staged.size == 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Empty file"
+            )
+
+        mime_type = self._resolve_mime_type(staged.head, declared_mime_type, filename)
+
+        db = SessionLocal()
+        reservation_id = None
+        try:
+            # Committed before anything is stored, so concurrent uploads see it
+            reservation_id = crud_storage_quota.reserve(db, target.workspace_id, staged.size)
+            if reservation_id is None:
+                raise self._quota_exceeded()
+
+            upload_session = None
+            if target.upload_session_id is not None:
+                # Locked so completing the same session twice cannot create two files
+                upload_session = crud_upload_session.get_by_id(db, target.upload_session_id, lock=True)
+                if upload_session is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Upload session not found"
+                    )
+
+            stored = self._put_staged(db, backend, staged, filename, mime_type, folder, target.workspace_id)
+            file_create = FileCreate(
+                filename=filename,
+                file_type=self._determine_file_type(mime_type),
+                mime_type=mime_type,
+                size_bytes=staged.size,
+                content_hash=staged.sha256,
+                storage_provider=backend.name,
+                workspace_id=target.workspace_id,
+                page_id=target.page_id,
+                block_id=target.block_id,
+                **stored
+            )
+
+            if _call_abandoned():
+                # The client was already told the upload timed out; the stored object is
+                # left to the orphaned file collector
+                raise HTTPException(
+                    status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                    detail="File storage did not respond in time"
+                )
+            if upload_session is not None:
+                crud_upload_session.delete(db, upload_session, commit=False)
+            crud_storage_quota.release(db, reservation_id, commit=False)
+            db_file = crud_file.create_file(db, file_create, target.uploaded_by)
+            reservation_id = None
+            return db_file.id
+        finally:
+            if reservation_id is not None:
+                db.rollback()
+                crud_storage_quota.release(db, reservation_id)
+            db.close()
+
+    def _put_staged(
+        self,
+        db: Session,
+        backend: StorageBackend,
+        staged: StagedUpload,
+        filename: str,
+        mime_type: Optional[str],
+        folder: str,
+        workspace_id: UUID
+    ) -> Dict[str, Any]:
+        """
+        Reuse an identical file already in the workspace, or store the staged one.
+        Returns the file record's storage fields.
+        """
+        # Locked until the new record is committed, so a concurrent delete of the
+        # existing record still sees the stored object as referenced
+        existing = crud_file.get_by_content_hash(
+            db, workspace_id, backend.name, staged.sha256, lock=True
+        )
+        if existing is not None:
+            return {
+                "storage_url": existing.storage_url,
+                "storage_id": existing.storage_id,
+                "thumbnail_url": existing.thumbnail_url,
+                "thumbnail_storage_id": existing.thumbnail_storage_id,
+            }
+
+        try:
+            stored = backend.put_staged(
+                staged.path, staged.sha256, filename=filename,
+                file_type=self._determine_file_type(mime_type), folder=f"{folder}/{workspace_id}"
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to upload file: {str(e)}"
+            )
+
+        return {
+            "storage_url": stored.storage_url,
+            "storage_id": stored.storage_id,
+            "thumbnail_url": stored.thumbnail_url,
+        }
 
     async def upload_file(
         self,
         file: UploadFile,
-        folder: str = "notion-clone",
-        workspace_id: Optional[str] = None,
-        public_id: Optional[str] = None
-    ) -> Dict[str, Any]:
+        target: UploadTarget,
+        folder: str = "notion-clone"
+    ) -> UUID:
         """
-        Upload file to Cloudinary and return metadata
+        Upload file to the configured storage backend and create its database record
 
         Args:
             file: The file to upload
-            folder: Cloudinary folder to store the file (default: "notion-clone")
-            workspace_id: Optional workspace ID to organize files
-            public_id: Optional custom public ID for the file
+            target: Workspace, uploader and attachment of the file record
+            folder: Folder to store the file in (default: "notion-clone"; Cloudinary only)
 
         Returns:
-            Dict containing:
-                - filename: Original filename
-                - file_type: FileType enum value
-                - mime_type: MIME type of the file
-                - size_bytes: File size in bytes
-                - storage_url: Full URL to access the file
-                - storage_id: Cloudinary public_id
-                - thumbnail_url: Optional thumbnail URL for images/videos
+            ID of the created file record. An identical file already in the workspace
+            is reused instead of being stored again.
 
         Raises:
-            HTTPException: If file validation fails or upload fails
+            HTTPException: If file validation fails, the workspace's storage quota
+                is full or upload fails
         """
-        # Ensure Cloudinary is configured
-        self._ensure_configured()
+        backend = self._get_backend()
 
-        # Validate file
-        self._validate_file(file)
+        # Reading the spooled file and the transfer itself are blocking
+        return await self._run_blocking(self._upload_sync, backend, file, folder, target)
 
-        # Determine MIME type
-        mime_type = file.content_type
-        if not mime_type:
-            guessed_type, _ = mimetypes.guess_type(file.filename)
-            mime_type = guessed_type
-
-        # Determine file type
-        file_type = self._determine_file_type(mime_type)
-
-        # Get file size
-        file.file.seek(0, 2)
-        file_size = file.file.tell()
-        file.file.seek(0)
+    def _upload_sync(
+        self,
+        backend: StorageBackend,
+        file: UploadFile,
+        folder: str,
+        target: UploadTarget
+    ) -> UUID:
+        """Stage and upload a multipart file; runs in a worker thread"""
+        staged = StagedUpload(self.MAX_FILE_SIZE, backend.staging_dir())
+        try:
+            while chunk := file.file.read(CHUNK_SIZE):
+                staged.write(chunk)
+            return self._store_staged(
+                backend, staged, file.filename, file.content_type, folder, target
+            )
+        finally:
+            staged.discard()
 
-        # Build folder path
-        if workspace_id:
-            folder = f"{folder}/{workspace_id}"
+    async def upload_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        filename: str,
+        target: UploadTarget,
+        declared_mime_type: Optional[str] = None,
+        declared_size: Optional[int] = None,
+        folder: str = "notion-clone"
+    ) -> UUID:
+        """
+        Upload a raw request body as it arrives
 
-        try:
-            # Prepare upload options
-            upload_options = {
-                "folder": folder,
-                "resource_type": "auto",  # Let Cloudinary detect the type
-                "use_filename": True,
-                "unique_filename": True,
-            }
+        The body is written chunk by chunk to a staging file while it is hashed and
+        measured; a declared or running size over MAX_FILE_SIZE is rejected at once.
+        The type is sniffed from the first bytes. Returns the same as upload_file.
 
-            if public_id:
-                upload_options["public_id"] = public_id
+        Raises:
+            HTTPException: If file validation fails or upload fails
+        """
+        backend = self._get_backend()
 
-            # Upload to Cloudinary
-            result = cloudinary.uploader.upload(
-                file.file,
-                **upload_options
+        if declared_size is not None and declared_size > self.MAX_FILE_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File size exceeds maximum allowed size of {self.MAX_FILE_SIZE / (1024 * 1024)}MB"
             )
 
-            # Generate thumbnail for images and videos
-            thumbnail_url = None
-            if file_type in [FileType.IMAGE, FileType.VIDEO]:
-                # For images, use a transformation
-                if file_type == FileType.IMAGE:
-                    thumbnail_url = cloudinary.CloudinaryImage(result['public_id']).build_url(
-                        transformation=[
-                            {'width': 200, 'height': 200, 'crop': 'fill'},
-                            {'quality': 'auto', 'fetch_format': 'auto'}
-                        ]
-                    )
-                # For videos, Cloudinary automatically generates thumbnails
-                elif file_type == FileType.VIDEO:
-                    thumbnail_url = result.get('thumbnail_url') or cloudinary.CloudinaryVideo(result['public_id']).build_url(
-                        transformation=[
-                            {'width': 200, 'height': 200, 'crop': 'fill'},
-                            {'quality': 'auto'}
-                        ],
-                        format='jpg'
-                    )
+        staged = StagedUpload(self.MAX_FILE_SIZE, backend.staging_dir())
+        try:
+            async for chunk in chunks:
+                if chunk:
+                    await anyio.to_thread.run_sync(staged.write, chunk)
+        except BaseException:
+            staged.discard()
+            raise
+        # From here the worker thread owns the staging file, even after a timeout
+        return await self._run_blocking(
+            self._store_staged_sync, backend, staged, [], filename, declared_mime_type, folder, target,
+            on_not_started=staged.discard
+        )
 
-            return {
-                "filename": file.filename,
-                "file_type": file_type,
-                "mime_type": mime_type,
-                "size_bytes": file_size,
-                "storage_url": result['secure_url'],
-                "storage_id": result['public_id'],
-                "thumbnail_url": thumbnail_url,
-            }
+    async def upload_parts(
+        self,
+        part_paths: List[str],
+        filename: str,
+        target: UploadTarget,
+        declared_mime_type: Optional[str] = None,
+        max_size: Optional[int] = None,
+        folder: str = "notion-clone"
+    ) -> UUID:
+        """
+        Upload a file already on local disk in parts (resumable upload chunks), in order.
+        The parts are concatenated into the staging file without copying them through Python.
+        Returns the same as upload_file.
 
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to upload file: {str(e)}"
-            )
+        Raises:
+            HTTPException: If file validation fails or upload fails
+        """
+        backend = self._get_backend()
+        staged = StagedUpload(max_size or self.MAX_FILE_SIZE, backend.staging_dir())
+        # The worker thread owns the staging file, even after a timeout
+        return await self._run_blocking(
+            self._store_staged_sync, backend, staged, part_paths,
+            filename, declared_mime_type, folder, target,
+            on_not_started=staged.discard
+        )
 
-    async def delete_file(self, storage_id: str, resource_type: str = "auto") -> bool:
+    def _store_staged_sync(
+        self,
+        backend: StorageBackend,
+        staged: StagedUpload,
+        part_paths: List[str],
+        filename: str,
+        declared_mime_type: Optional[str],
+        folder: str,
+        target: UploadTarget
+    ) -> UUID:
+        """Append any parts, upload, then discard the staging file; runs in a worker thread"""
+        try:
+            for path in part_paths:
+                staged.append_file(path)
+            return self._store_staged(backend, staged, filename, declared_mime_type, folder, target)
+        finally:
+            staged.discard()
+
+    async def delete_file(self, storage_id: str, provider: str = "cloudinary") -> bool:
         """
-        Delete file from Cloudinary
+        Delete file from the backend that stores it
 
         Args:
-            storage_id: Cloudinary public_id of the file
-            resource_type: Type of resource (image, video, raw, auto)
+            storage_id: Provider-specific ID of the file
+            provider: File.storage_provider of the file
 
         Returns:
             True if deletion was successful
@@ -233,21 +653,37 @@ class UploadService:
         Raises:
             HTTPException: If deletion fails
         """
-        # Ensure Cloudinary is configured
-        self._ensure_configured()
+        backend = self._get_backend(provider)
 
         try:
-            result = cloudinary.uploader.destroy(
-                storage_id,
-                resource_type=resource_type
-            )
-            return result.get('result') == 'ok'
+            return await self._run_blocking(backend.delete, storage_id)
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to delete file: {str(e)}"
             )
 
+    def download_url(self, db_file) -> str:
+        """
+        Link for downloading a file right now: presigned (expiring) for private backends,
+        the stored URL otherwise. Never persisted; records keep the stable storage_url.
+        """
+        if db_file.storage_id:
+            url = get_storage_backend(db_file.storage_provider).presign(db_file.storage_id)
+            if url:
+                return url
+        return db_file.storage_url
+
+    def thumbnail_download_url(self, db_file) -> Optional[str]:
+        """Like download_url, for the file's thumbnail"""
+        if db_file.thumbnail_storage_id:
+            url = get_storage_backend(db_file.storage_provider).presign(db_file.thumbnail_storage_id)
+            if url:
+                return url
+        return db_file.thumbnail_url
+
     def get_file_url(
         self,
         storage_id: str,
@@ -263,8 +699,8 @@ class UploadService:
         Returns:
             Full URL to the file
         """
-        # Ensure Cloudinary is configured
-        self._ensure_configured()
+        # Cloudinary transformations only
+        self._get_backend("cloudinary")
 
         if transformation:
             return cloudinary.CloudinaryImage(storage_id).build_url(
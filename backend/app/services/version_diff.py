@@ -0,0 +1,173 @@
+"""
+Structural diff between two page version snapshots.
+Blocks are matched by ID; changed blocks also get a word-level text diff.
+Across restores from before block IDs were kept, blocks are matched by position and type.
+"""
+
+import difflib
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from app.models.page_version import PageVersion
+
+# Page fields compared besides the blocks
+METADATA_FIELDS = ("title", "icon", "cover_image")
+
+_TOKEN_PATTERN = re.compile(r"(\s+)")
+
+
+def _block_text(content: Any) -> str:
+    """Extract the diffable text of a block ('text' property or the whole content)"""
+    if isinstance(content, dict) and isinstance(content.get("text"), str):
+        return content["text"]
+    return json.dumps(content, sort_keys=True, ensure_ascii=False)
+
+
+def _text_diff(before: str, after: str) -> List[Dict[str, str]]:
+    """Word-level diff as a list of {op, before, after} segments"""
+    before_tokens = _TOKEN_PATTERN.split(before)
+    after_tokens = _TOKEN_PATTERN.split(after)
+    matcher = difflib.SequenceMatcher(a=before_tokens, b=after_tokens, autojunk=False)
+
+    return [
+        {
+            "op": op,
+            "before": "".join(before_tokens[i1:i2]),
+            "after": "".join(after_tokens[j1:j2]),
+        }
+        for op, i1, i2, j1, j2 in matcher.get_opcodes()
+    ]
+
+
+def _moved_block_ids(
+    old_blocks: Dict[str, Dict[str, Any]],
+    new_blocks: Dict[str, Dict[str, Any]],
+    common_ids: List[str]
+) -> List[str]:
+    """
+    Blocks that changed parent, or whose position among their common siblings changed.
+    Shifts caused only by inserted/removed neighbours are not reported as moves.
+    """
+    moved = []
+    siblings_old: Dict[Optional[str], List[str]] = {}
+    siblings_new: Dict[Optional[str], List[str]] = {}
+
+    for block_id in common_ids:
+        old_parent = old_blocks[block_id].get("parent_block_id")
+        new_parent = new_blocks[block_id].get("parent_block_id")
+        if old_parent != new_parent:
+            moved.append(block_id)
+            continue
+        siblings_old.setdefault(old_parent, []).append(block_id)
+        siblings_new.setdefault(new_parent, []).append(block_id)
+
+    for parent_id, old_ids in siblings_old.items():
+        old_sequence = sorted(old_ids, key=lambda block_id: old_blocks[block_id]["order"])
+        new_sequence = sorted(siblings_new[parent_id], key=lambda block_id: new_blocks[block_id]["order"])
+        matcher = difflib.SequenceMatcher(a=old_sequence, b=new_sequence, autojunk=False)
+        kept = set()
+        for match in matcher.get_matching_blocks():
+            kept.update(old_sequence[match.a:match.a + match.size])
+        moved.extend(block_id for block_id in old_sequence if block_id not in kept)
+
+    return moved
+
+
+def _match_by_position(
+    old_snapshot: List[Dict[str, Any]],
+    new_snapshot: List[Dict[str, Any]]
+) -> Dict[str, str]:
+    """
+    Map old block IDs to new ones when the snapshots share none, pairing blocks of the
+    same type in page order. Restores used to give every block a fresh ID, so a diff
+    spanning one would otherwise remove and re-add every block.
+    """
+    if not old_snapshot or not new_snapshot:
+        return {}
+    if {block["id"] for block in old_snapshot} & {block["id"] for block in new_snapshot}:
+        return {}
+
+    matcher = difflib.SequenceMatcher(
+        a=[block["type"] for block in old_snapshot],
+        b=[block["type"] for block in new_snapshot],
+        autojunk=False
+    )
+    return {
+        old_snapshot[match.a + offset]["id"]: new_snapshot[match.b + offset]["id"]
+        for match in matcher.get_matching_blocks()
+        for offset in range(match.size)
+    }
+
+
+def diff_versions(old: PageVersion, new: PageVersion) -> Dict[str, Any]:
+    """
+    Compute the structural diff from `old` to `new`.
+    Both versions must have content_snapshot loaded (see crud page_version.hydrate).
+    """
+    old_snapshot = old.content_snapshot or []
+    new_snapshot = new.content_snapshot or []
+
+    # Old blocks matched by position are reported under their new IDs
+    renamed = _match_by_position(old_snapshot, new_snapshot)
+    old_blocks = {
+        renamed.get(block["id"], block["id"]): dict(
+            block,
+            id=renamed.get(block["id"], block["id"]),
+            parent_block_id=renamed.get(block.get("parent_block_id"), block.get("parent_block_id"))
+        )
+        for block in old_snapshot
+    }
+    new_blocks = {block["id"]: block for block in new_snapshot}
+
+    common_ids = [block_id for block_id in old_blocks if block_id in new_blocks]
+
+    changed = []
+    unchanged_count = 0
+    for block_id in common_ids:
+        before = old_blocks[block_id]
+        after = new_blocks[block_id]
+        if before["type"] == after["type"] and before["content"] == after["content"]:
+            unchanged_count += 1
+            continue
+
+        before_content = before["content"] if isinstance(before["content"], dict) else {}
+        after_content = after["content"] if isinstance(after["content"], dict) else {}
+        changed.append({
+            "block_id": block_id,
+            "type_before": before["type"],
+            "type_after": after["type"],
+            "changed_keys": sorted(
+                key for key in before_content.keys() | after_content.keys()
+                if before_content.get(key) != after_content.get(key)
+            ),
+            "content": after["content"],
+            "text_diff": _text_diff(_block_text(before["content"]), _block_text(after["content"])),
+        })
+
+    moved = [
+        {
+            "block_id": block_id,
+            "order_before": old_blocks[block_id]["order"],
+            "order_after": new_blocks[block_id]["order"],
+            "parent_block_id_before": old_blocks[block_id].get("parent_block_id"),
+            "parent_block_id_after": new_blocks[block_id].get("parent_block_id"),
+        }
+        for block_id in _moved_block_ids(old_blocks, new_blocks, common_ids)
+    ]
+
+    return {
+        "page_id": new.page_id,
+        "from_version": old.version_number,
+        "to_version": new.version_number,
+        "metadata_changes": [
+            {"field": field, "before": getattr(old, field), "after": getattr(new, field)}
+            for field in METADATA_FIELDS
+            if getattr(old, field) != getattr(new, field)
+        ],
+        "added": [block for block_id, block in new_blocks.items() if block_id not in old_blocks],
+        "removed": [block for block_id, block in old_blocks.items() if block_id not in new_blocks],
+        "moved": moved,
+        "changed": changed,
+        "unchanged_count": unchanged_count,
+    }
@@ -0,0 +1,143 @@
+"""
+Page version retention.
+Recent versions are kept in full; older ones are thinned to one per day and then one per week.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.crud import page_version as crud_page_version
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CompactionStats:
+    """Counters reported by a compaction run"""
+    pages_scanned: int = 0
+    versions_pruned: int = 0
+    blobs_deleted: int = 0
+    errors: int = 0
+    failed_pages: List[UUID] = field(default_factory=list)
+
+
+def select_versions_to_prune(
+    timeline: List[Tuple[UUID, int, datetime]],
+    now: datetime,
+    keep_all_days: int,
+    daily_days: int
+) -> List[UUID]:
+    """
+    Pick the versions of one page that fall outside the retention policy.
+    `timeline` is (id, version_number, created_at), newest first.
+
+    - the latest version is always kept (numbering continues from it)
+    - versions younger than keep_all_days are all kept
+    - up to daily_days, the newest version of each UTC day is kept
+    - beyond that, the newest version of each ISO week is kept
+    """
+    keep_all_cutoff = now - timedelta(days=keep_all_days)
+    daily_cutoff = now - timedelta(days=daily_days)
+
+    prunable = []
+    kept_buckets = set()
+    for index, (version_id, _, created_at) in enumerate(timeline):
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        if index == 0 or created_at >= keep_all_cutoff:
+            continue
+
+        day = created_at.astimezone(timezone.utc).date()
+        if created_at >= daily_cutoff:
+            bucket = ("day", day)
+        else:
+            bucket = ("week",) + tuple(day.isocalendar()[:2])
+
+        if bucket in kept_buckets:
+            prunable.append(version_id)
+        else:
+            kept_buckets.add(bucket)
+
+    return prunable
+
+
+def compact_page(
+    db: Session,
+    page_id: UUID,
+    now: datetime,
+    keep_all_days: int,
+    daily_days: int,
+    batch_size: int = 500,
+    dry_run: bool = False
+) -> Tuple[int, int]:
+    """
+    Apply the retention policy to one page.
+    Deletes in batches of batch_size (one transaction each), then drops unreferenced blobs.
+    Returns (versions pruned, blobs deleted).
+    """
+    timeline = crud_page_version.get_version_timeline(db, page_id)
+    prunable = select_versions_to_prune(timeline, now, keep_all_days, daily_days)
+    if dry_run or not prunable:
+        db.rollback()
+        return len(prunable), 0
+
+    pruned = 0
+    for start in range(0, len(prunable), batch_size):
+        pruned += crud_page_version.delete_versions(db, prunable[start:start + batch_size])
+        db.commit()
+
+    blobs_deleted = crud_page_version.delete_unreferenced_blobs(db, page_id, batch_size=batch_size)
+    return pruned, blobs_deleted
+
+
+def compact_versions(
+    db: Session,
+    keep_all_days: int,
+    daily_days: int,
+    batch_size: int = 500,
+    dry_run: bool = False,
+    now: Optional[datetime] = None
+) -> CompactionStats:
+    """
+    Compact every page that has versions older than keep_all_days.
+    Pages are walked in ID order so the run never holds more than one page's timeline.
+    A failing page is logged and skipped.
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=keep_all_days)
+    stats = CompactionStats()
+
+    last_page_id = None
+    while True:
+        page_ids = crud_page_version.get_pages_with_versions_before(
+            db, cutoff, after_page_id=last_page_id, limit=batch_size
+        )
+        db.rollback()
+        if not page_ids:
+            break
+
+        for page_id in page_ids:
+            stats.pages_scanned += 1
+            try:
+                pruned, blobs_deleted = compact_page(
+                    db, page_id, now, keep_all_days, daily_days,
+                    batch_size=batch_size, dry_run=dry_run
+                )
+            except Exception:
+                db.rollback()
+                stats.errors += 1
+                stats.failed_pages.append(page_id)
+                logger.exception("Version compaction failed for page %s", page_id)
+                continue
+
+            stats.versions_pruned += pruned
+            stats.blobs_deleted += blobs_deleted
+
+        last_page_id = page_ids[-1]
+
+    return stats
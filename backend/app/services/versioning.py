@@ -0,0 +1,227 @@
+"""
+Automatic page versioning policy.
+Edits are counted per page and coalesced into time windows. The state just before
+the edit that opens a window is read in the request (once per window) and stored by a
+background worker once the edit commits, and a background thread takes a trailing
+snapshot when a window closes with unsaved edits, so a burst of edits costs at most
+two versions. Title, icon and cover changes always
+save the state they replace, as destructive metadata edits should stay restorable.
+"""
+
+import heapq
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.crud import page as crud_page
+from app.crud import page_version as crud_page_version
+from app.models.page import Page
+
+logger = logging.getLogger(__name__)
+
+# Stores the pre-edit snapshots read in requests, one at a time in the order they were read
+_snapshot_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="versioning-snapshot")
+
+
+@dataclass
+class _PageState:
+    """What the policy knows about a page since its last version"""
+    # Pages the policy has not seen are assumed changed since their last version
+    dirty: bool = True
+    pending_edits: int = 0
+    window_started: Optional[datetime] = None
+    last_editor: Optional[UUID] = None
+
+
+class VersioningPolicy:
+    """Decides when an edited page is due for an automatic version"""
+
+    # Pages tracked in memory; the least recently edited ones are forgotten first
+    MAX_TRACKED_PAGES = 10000
+
+    def __init__(
+        self,
+        coalesce_minutes: int,
+        edit_threshold: int,
+        on_window_close: Optional[Callable[[UUID, Optional[UUID]], None]] = None
+    ):
+        self.window = timedelta(minutes=coalesce_minutes)
+        self.edit_threshold = max(edit_threshold, 1)
+        self.on_window_close = on_window_close
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._pages: "OrderedDict[UUID, _PageState]" = OrderedDict()
+        # (window end, page_id, window start) heap for trailing snapshots
+        self._closing: List[Tuple[datetime, UUID, datetime]] = []
+        self._worker: Optional[threading.Thread] = None
+
+    def in_window(self, last_version_at: Optional[datetime]) -> bool:
+        """Whether a version taken at last_version_at still covers the current window"""
+        if last_version_at is None:
+            return False
+        if last_version_at.tzinfo is None:
+            last_version_at = last_version_at.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - last_version_at < self.window
+
+    def _track(self, page_id: UUID, state: _PageState) -> None:
+        self._pages[page_id] = state
+        while len(self._pages) > self.MAX_TRACKED_PAGES:
+            self._pages.popitem(last=False)
+
+    def record_edit(self, page_id: UUID, user_id: Optional[UUID] = None, significant: bool = False) -> bool:
+        """
+        Count an edit that is about to be applied and return True if the page's current
+        (pre-edit) state should be saved first. That is the case for the first edit of a
+        window once edit_threshold edits have piled up, and for every significant edit
+        (title, icon, cover) unless nothing changed since the last version.
+        """
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            state = self._pages.pop(page_id, None) or _PageState()
+            in_window = state.window_started is not None and now - state.window_started < self.window
+
+            due = significant or (not in_window and state.pending_edits + 1 >= self.edit_threshold)
+            snapshot_before = due and state.dirty
+            if snapshot_before:
+                state.pending_edits = 0
+            if due and not in_window:
+                state.window_started = now
+                self._schedule_close(page_id, now)
+
+            state.dirty = True
+            state.pending_edits += 1
+            state.last_editor = user_id
+            self._track(page_id, state)
+
+        return snapshot_before
+
+    def record_version(self, page_id: UUID) -> None:
+        """Mark the page as saved after a version was created outside the policy"""
+        with self._lock:
+            state = self._pages.pop(page_id, None) or _PageState()
+            state.dirty = False
+            state.pending_edits = 0
+            self._track(page_id, state)
+
+    def close_due_windows(self, now: Optional[datetime] = None) -> List[Tuple[UUID, Optional[UUID]]]:
+        """
+        Close windows that have ended and return (page_id, last editor) of those
+        with edits made after their opening snapshot
+        """
+        now = now or datetime.now(timezone.utc)
+        closed = []
+        with self._lock:
+            while self._closing and self._closing[0][0] <= now:
+                _, page_id, window_started = heapq.heappop(self._closing)
+                state = self._pages.get(page_id)
+                if state is None or state.window_started != window_started:
+                    # Forgotten page, or a window that was already replaced
+                    continue
+                state.window_started = None
+                if state.dirty:
+                    state.dirty = False
+                    state.pending_edits = 0
+                    closed.append((page_id, state.last_editor))
+        return closed
+
+    def _schedule_close(self, page_id: UUID, window_started: datetime) -> None:
+        """Queue the trailing snapshot of a window (caller holds the lock)"""
+        heapq.heappush(self._closing, (window_started + self.window, page_id, window_started))
+        if self.on_window_close is None:
+            return
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(
+                target=self._run_closer, name="versioning-window-closer", daemon=True
+            )
+            self._worker.start()
+        self._wakeup.notify()
+
+    def _run_closer(self) -> None:
+        """Background thread: take trailing snapshots as windows close"""
+        while True:
+            with self._lock:
+                timeout = None
+                if self._closing:
+                    timeout = max((self._closing[0][0] - datetime.now(timezone.utc)).total_seconds(), 0)
+                if timeout is None or timeout > 0:
+                    self._wakeup.wait(timeout)
+            for page_id, user_id in self.close_due_windows():
+                try:
+                    self.on_window_close(page_id, user_id)
+                except Exception:
+                    logger.exception("Trailing version of page %s failed", page_id)
+
+
+def snapshot_page(
+    page_id: UUID,
+    created_by: Optional[UUID],
+    change_summary: Optional[str] = None,
+    snapshot: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    Create a version of the page in its own session: of its current state (trailing
+    snapshots), or of a state captured earlier (pre-edit snapshots)
+    """
+    db = SessionLocal()
+    try:
+        page = crud_page.get_by_id(db, page_id=page_id)
+        if not page or created_by is None:
+            return
+        crud_page_version.create_version(
+            db=db,
+            page=page,
+            created_by=created_by,
+            change_summary=change_summary or "Automatic version",
+            snapshot=snapshot
+        )
+    except Exception:
+        logger.exception("Failed to create automatic version for page %s", page_id)
+    finally:
+        db.close()
+
+
+def track_edit(
+    db: Session,
+    page: Page,
+    user_id: UUID,
+    significant: bool = False,
+    change_summary: Optional[str] = None
+) -> None:
+    """
+    Record an edit before applying it; if the policy says so, reads the page's current
+    state and has it stored as a version in the background once the edit commits (an
+    edit that fails leaves no version). Minor edits skip that when another worker
+    versioned the page within the window.
+    """
+    if not versioning_policy.record_edit(page.id, user_id=user_id, significant=significant):
+        return
+    if not significant and versioning_policy.in_window(
+        crud_page_version.get_last_version_time(db, page_id=page.id)
+    ):
+        return
+
+    page_id = page.id
+    snapshot = crud_page_version.capture_snapshot(db, page)
+
+    def store_snapshot(session: Session) -> None:
+        _snapshot_executor.submit(snapshot_page, page_id, user_id, change_summary, snapshot)
+
+    event.listen(db, "after_commit", store_snapshot, once=True)
+
+
+# Singleton instance
+versioning_policy = VersioningPolicy(
+    coalesce_minutes=settings.VERSION_COALESCE_MINUTES,
+    edit_threshold=settings.VERSION_EDIT_THRESHOLD,
+    on_window_close=snapshot_page
+)
@@ -0,0 +1,54 @@
+"""
+HTTP Range and conditional request helpers (RFC 9110).
+Only single byte ranges are served; a multi-range or malformed Range header is
+ignored, which the RFC allows, and the whole representation is sent instead.
+"""
+
+from typing import Optional, Tuple
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Resolve a Range header against a representation of size bytes
+
+    Returns:
+        (start, end) inclusive, or None to send the whole representation
+
+    Raises:
+        ValueError: If the range cannot be satisfied (416)
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = (part.strip() for part in spec.partition("-"))
+    if not sep or not (first or last) or not all(part.isdigit() for part in (first, last) if part):
+        return None
+
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("Range not satisfiable")
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def etag_matches(header: Optional[str], etag: Optional[str]) -> bool:
+    """Whether an If-None-Match header matches etag (weak comparison)"""
+    if not header or not etag:
+        return False
+    if header.strip() == "*":
+        return True
+    return _opaque_tag(etag) in {_opaque_tag(tag) for tag in header.split(",")}
+
+
+def _opaque_tag(tag: str) -> str:
+    return tag.strip().removeprefix("W/")
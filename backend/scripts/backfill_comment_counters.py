@@ -0,0 +1,77 @@
+"""
+Script para recalcular os contadores desnormalizados dos comentários
+(reply_count e reaction_counts) a partir das tabelas de origem
+Execute: python scripts/backfill_comment_counters.py [--dry-run]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.crud import comment as crud_comment
+from app.models.comment import Comment
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Recompute comment reply and reaction counters")
+    parser.add_argument(
+        "--batch-size", type=int, default=500,
+        help="comments recomputed per transaction"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="report how many comments are out of sync without fixing them"
+    )
+    args = parser.parse_args()
+    if args.batch_size < 1:
+        parser.error("--batch-size must be positive")
+    return args
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 60)
+    print("RECÁLCULO DE CONTADORES DE COMENTÁRIOS - NOTION CLONE")
+    print("=" * 60)
+    print(f"   Lote: {args.batch_size} | Dry run: {args.dry_run}")
+    print()
+
+    started = time.monotonic()
+    scanned = corrected = 0
+    last_id = None
+
+    db = SessionLocal()
+    try:
+        while True:
+            query = db.query(Comment.id)
+            if last_id is not None:
+                query = query.filter(Comment.id > last_id)
+            comment_ids = [row.id for row in query.order_by(Comment.id).limit(args.batch_size)]
+            if not comment_ids:
+                break
+
+            corrected += crud_comment.recompute_counters(db, comment_ids)
+            if args.dry_run:
+                db.rollback()
+            else:
+                db.commit()
+
+            scanned += len(comment_ids)
+            last_id = comment_ids[-1]
+            print(f"   {scanned} comentários analisados, {corrected} corrigidos")
+    finally:
+        db.close()
+
+    print()
+    print(f"   Comentários {'fora de sincronia' if args.dry_run else 'corrigidos'}: {corrected}/{scanned}")
+    print(f"   Tempo: {time.monotonic() - started:.1f}s")
+    print("✓ PROCESSO CONCLUÍDO")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Script para compactar o histórico de versões das páginas
+Mantém todas as versões recentes e reduz as antigas a uma por dia / uma por semana
+Execute: python scripts/compact_versions.py [--dry-run]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.version_retention import compact_versions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compact page version history")
+    parser.add_argument(
+        "--keep-all-days", type=int, default=settings.VERSION_RETENTION_KEEP_ALL_DAYS,
+        help="keep every version younger than this many days"
+    )
+    parser.add_argument(
+        "--daily-days", type=int, default=settings.VERSION_RETENTION_DAILY_DAYS,
+        help="keep one version per day up to this age, then one per week"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=500,
+        help="maximum rows deleted per transaction"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="report what would be pruned without deleting anything"
+    )
+    args = parser.parse_args()
+    if args.daily_days < args.keep_all_days:
+        parser.error("--daily-days must be >= --keep-all-days")
+    if args.batch_size < 1:
+        parser.error("--batch-size must be positive")
+    return args
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    print("=" * 60)
+    print("COMPACTAÇÃO DE VERSÕES - NOTION CLONE")
+    print("=" * 60)
+    print(f"   Manter tudo: {args.keep_all_days} dias | Diário até: {args.daily_days} dias")
+    print(f"   Lote: {args.batch_size} | Dry run: {args.dry_run}")
+    print()
+
+    started = time.monotonic()
+    db = SessionLocal()
+    try:
+        stats = compact_versions(
+            db,
+            keep_all_days=args.keep_all_days,
+            daily_days=args.daily_days,
+            batch_size=args.batch_size,
+            dry_run=args.dry_run
+        )
+    finally:
+        db.close()
+
+    print(f"   Páginas analisadas: {stats.pages_scanned}")
+    print(f"   Versões {'a remover' if args.dry_run else 'removidas'}: {stats.versions_pruned}")
+    print(f"   Blobs removidos: {stats.blobs_deleted}")
+    print(f"   Erros: {stats.errors}")
+    print(f"   Tempo: {time.monotonic() - started:.1f}s")
+
+    if stats.errors:
+        print(f"   ✗ Falha nas páginas: {', '.join(str(page_id) for page_id in stats.failed_pages)}")
+        sys.exit(1)
+
+    print()
+    print("✓ PROCESSO CONCLUÍDO")
+
+
+if __name__ == "__main__":
+    main()
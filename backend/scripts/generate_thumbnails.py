@@ -0,0 +1,72 @@
+"""
+Script para gerar miniaturas de imagens já enviadas
+Processa arquivos de imagem sem miniatura (uploads anteriores ao pipeline ou que falharam)
+Execute: python scripts/generate_thumbnails.py [--batch-size 100] [--limit 1000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.crud import file as crud_file
+from app.services.thumbnails import SOURCE_MIME_TYPES, generate_thumbnail
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate missing image thumbnails")
+    parser.add_argument(
+        "--batch-size", type=int, default=100,
+        help="files fetched per batch"
+    )
+    parser.add_argument(
+        "--limit", type=int, default=None,
+        help="stop after this many files"
+    )
+    args = parser.parse_args()
+    if args.batch_size < 1:
+        parser.error("--batch-size must be positive")
+    return args
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 60)
+    print("GERAÇÃO DE MINIATURAS - NOTION CLONE")
+    print("=" * 60)
+    print(f"   Lote: {args.batch_size} | Limite: {args.limit or 'sem limite'}")
+    print()
+
+    started = time.monotonic()
+    scanned = generated = 0
+    last_id = None
+
+    db = SessionLocal()
+    try:
+        while args.limit is None or scanned < args.limit:
+            files = crud_file.get_files_missing_thumbnails(
+                db, sorted(SOURCE_MIME_TYPES), after_id=last_id, limit=args.batch_size
+            )
+            if not files:
+                break
+            for db_file in files:
+                generated += generate_thumbnail(db_file.id)
+                scanned += 1
+            last_id = files[-1].id
+            db.rollback()
+            print(f"   {scanned} arquivos analisados, {generated} miniaturas geradas")
+    finally:
+        db.close()
+
+    print()
+    print(f"   Miniaturas geradas: {generated}/{scanned}")
+    print(f"   Tempo: {time.monotonic() - started:.1f}s")
+    print("✓ PROCESSO CONCLUÍDO")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Script para remover arquivos órfãos do storage
+Remove registros de arquivos anexados a blocos que não os referenciam mais e objetos
+no storage (Cloudinary ou disco local) sem nenhum registro de arquivo
+Execute: python scripts/purge_orphaned_files.py [--dry-run] [--backend local] [--rate 10]
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.services.storage import get_storage_backend
+from app.services.storage_gc import collect_orphaned_files
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Delete orphaned files from storage")
+    parser.add_argument(
+        "--backend", choices=["local", "cloudinary"], action="append",
+        help="storage backend to scan (repeatable; default: every configured backend)"
+    )
+    parser.add_argument(
+        "--prefix", default="notion-clone",
+        help="only scan objects under this Cloudinary folder"
+    )
+    parser.add_argument(
+        "--min-age-hours", type=float, default=24,
+        help="leave files and objects newer than this alone"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=100,
+        help="records or objects checked per query"
+    )
+    parser.add_argument(
+        "--rate", type=float, default=10,
+        help="maximum storage deletes per second (0: unlimited)"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="report what would be deleted without deleting anything"
+    )
+    args = parser.parse_args()
+    if args.batch_size < 1:
+        parser.error("--batch-size must be positive")
+    if args.min_age_hours < 0:
+        parser.error("--min-age-hours must not be negative")
+    return args
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    backends = [get_storage_backend(name) for name in args.backend or ["local", "cloudinary"]]
+    backends = [backend for backend in backends if backend.is_configured]
+
+    print("=" * 60)
+    print("LIMPEZA DE ARQUIVOS ÓRFÃOS - NOTION CLONE")
+    print("=" * 60)
+    print(f"   Storage: {', '.join(backend.name for backend in backends) or 'nenhum configurado'}")
+    print(f"   Idade mínima: {args.min_age_hours}h | Lote: {args.batch_size} | "
+          f"Exclusões/s: {args.rate or 'sem limite'} | Dry run: {args.dry_run}")
+    print()
+
+    db = SessionLocal()
+    try:
+        stats = collect_orphaned_files(
+            db,
+            backends,
+            min_age_hours=args.min_age_hours,
+            batch_size=args.batch_size,
+            deletes_per_second=args.rate,
+            dry_run=args.dry_run,
+            prefix=args.prefix
+        )
+    finally:
+        db.close()
+
+    action = "a remover" if args.dry_run else "removidos"
+    print(f"   Arquivos de blocos analisados: {stats.files_scanned}")
+    print(f"   Arquivos sem referência no bloco {action}: {stats.unreferenced_files}")
+    print(f"   Objetos no storage analisados: {stats.objects_scanned}")
+    print(f"   Objetos órfãos {action}: {stats.orphaned_objects}")
+    if not args.dry_run:
+        print(f"   Objetos excluídos do storage: {stats.objects_deleted} ({stats.delete_failures} falhas)")
+        print(f"   Espaço liberado por arquivos de blocos: {stats.bytes_freed / (1024 * 1024):.2f} MB")
+    print(f"   Tempo: {stats.elapsed_seconds:.1f}s")
+    print("✓ PROCESSO CONCLUÍDO")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Script para esvaziar a lixeira
+Remove definitivamente páginas arquivadas há mais de N dias (com subpáginas)
+Execute: python scripts/purge_trash.py [--dry-run] [--loop --interval 3600]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.trash_purge import purge_expired_trash
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Purge expired pages from the trash")
+    parser.add_argument(
+        "--retention-days", type=int, default=settings.TRASH_RETENTION_DAYS,
+        help="purge pages archived more than this many days ago"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=100,
+        help="expired pages fetched per batch"
+    )
+    parser.add_argument(
+        "--max-batches", type=int, default=None,
+        help="stop a run after this many batches"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="report what would be purged without deleting anything"
+    )
+    parser.add_argument(
+        "--loop", action="store_true",
+        help="keep running, one purge every --interval seconds"
+    )
+    parser.add_argument(
+        "--interval", type=int, default=3600,
+        help="seconds between runs with --loop"
+    )
+    args = parser.parse_args()
+    if args.retention_days < 0:
+        parser.error("--retention-days must be >= 0")
+    if args.batch_size < 1:
+        parser.error("--batch-size must be positive")
+    return args
+
+
+def run_once(args) -> int:
+    """Run one purge and print its metrics; returns the number of failed pages"""
+    db = SessionLocal()
+    try:
+        stats = purge_expired_trash(
+            db,
+            retention_days=args.retention_days,
+            batch_size=args.batch_size,
+            max_batches=args.max_batches,
+            dry_run=args.dry_run
+        )
+    finally:
+        db.close()
+
+    print(f"   Páginas da lixeira {'a remover' if args.dry_run else 'removidas'}: {stats.trash_roots_purged}")
+    print(f"   Total de páginas (com subpáginas): {stats.pages_deleted}")
+    print(f"   Lotes: {stats.batches} | Erros: {stats.errors} | Tempo: {stats.elapsed_seconds:.1f}s")
+    if stats.errors:
+        print(f"   ✗ Falha nas páginas: {', '.join(str(page_id) for page_id in stats.failed_pages)}")
+    return stats.errors
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    print("=" * 60)
+    print("LIMPEZA DA LIXEIRA - NOTION CLONE")
+    print("=" * 60)
+    print(f"   Retenção: {args.retention_days} dias | Lote: {args.batch_size} | Dry run: {args.dry_run}")
+    print()
+
+    if not args.loop:
+        sys.exit(1 if run_once(args) else 0)
+
+    while True:
+        try:
+            run_once(args)
+        except Exception:
+            logging.exception("Trash purge run failed")
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Script para limpar uploads retomáveis abandonados
+Remove sessões expiradas (e suas partes em disco) e diretórios de partes sem sessão
+Execute: python scripts/purge_upload_sessions.py [--dry-run] [--loop --interval 3600]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.services.resumable_upload import purge_expired_sessions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Purge expired resumable upload sessions")
+    parser.add_argument(
+        "--batch-size", type=int, default=100,
+        help="expired sessions fetched per batch"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="report what would be purged without deleting anything"
+    )
+    parser.add_argument(
+        "--loop", action="store_true",
+        help="keep running, one purge every --interval seconds"
+    )
+    parser.add_argument(
+        "--interval", type=int, default=3600,
+        help="seconds between runs with --loop"
+    )
+    args = parser.parse_args()
+    if args.batch_size < 1:
+        parser.error("--batch-size must be positive")
+    return args
+
+
+def run_once(args) -> None:
+    """Run one purge and print its metrics"""
+    db = SessionLocal()
+    try:
+        stats = purge_expired_sessions(db, batch_size=args.batch_size, dry_run=args.dry_run)
+    finally:
+        db.close()
+
+    print(f"   Sessões expiradas {'a remover' if args.dry_run else 'removidas'}: {stats.sessions_removed}")
+    print(f"   Diretórios órfãos {'a remover' if args.dry_run else 'removidos'}: {stats.orphaned_dirs_removed}")
+    print(f"   Tempo: {stats.elapsed_seconds:.1f}s")
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    print("=" * 60)
+    print("LIMPEZA DE UPLOADS RETOMÁVEIS - NOTION CLONE")
+    print("=" * 60)
+    print(f"   Lote: {args.batch_size} | Dry run: {args.dry_run}")
+    print()
+
+    if not args.loop:
+        run_once(args)
+        return
+
+    while True:
+        try:
+            run_once(args)
+        except Exception:
+            logging.exception("Upload session purge run failed")
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
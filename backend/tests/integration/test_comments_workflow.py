@@ -141,6 +141,11 @@ def test_comment_workflow():
     print(f"   Thread depth: {comment2['thread_depth']}")
     print(f"   Parent: {comment2['parent_comment_id']}")
 
+    # The parent's reply counter is kept up to date on write
+    response = requests.get(f"{BASE_URL}/comments/{comment1_id}", headers=headers1)
+    assert response.json()["replies_count"] == 1, f"Unexpected replies_count: {response.json()['replies_count']}"
+    print_result(True, "Parent replies_count is 1")
+
     print_step("4. Create Comment with Mention")
 
     mention_data = {
@@ -184,6 +189,9 @@ def test_comment_workflow():
     print_result(True, f"Reactions aggregated: {len(comment_with_reactions['reactions'])} type(s)")
     for reaction in comment_with_reactions['reactions']:
         print(f"   - {reaction['reaction_type']}: {reaction['count']} (user reacted: {reaction['user_reacted']})")
+    reaction_counts = {r['reaction_type']: r['count'] for r in comment_with_reactions['reactions']}
+    assert reaction_counts == {"thumbs_up": 2, "heart": 1}, f"Unexpected reaction counts: {reaction_counts}"
+    print_result(True, "Reaction counts match (thumbs_up: 2, heart: 1)")
 
     print_step("6. Edit Comment")
 
@@ -220,14 +228,70 @@ def test_comment_workflow():
 
     print_step("8. List Comments by Page (with Pagination)")
 
-    response = requests.get(f"{BASE_URL}/comments/page/{page_id}?page=1&page_size=10", headers=headers1)
+    response = requests.get(f"{BASE_URL}/comments/page/{page_id}?page_size=1&include_total=true", headers=headers1)
     assert response.status_code == 200, f"Failed to list comments: {response.text}"
     comment_list = response.json()
-    print_result(True, f"Listed {len(comment_list['items'])} comments")
+    print_result(True, f"Listed {len(comment_list['comments'])} comments")
     print(f"   Total: {comment_list['total']}")
-    print(f"   Page: {comment_list['page']}/{comment_list['pages']}")
 
-    print_step("9. Remove Reaction")
+    # Follow the cursor through the remaining top-level comments
+    listed = [c['id'] for c in comment_list['comments']]
+    while comment_list['next_cursor']:
+        response = requests.get(
+            f"{BASE_URL}/comments/page/{page_id}",
+            params={"page_size": 1, "cursor": comment_list['next_cursor']},
+            headers=headers1
+        )
+        assert response.status_code == 200, f"Failed to follow cursor: {response.text}"
+        comment_list = response.json()
+        listed.extend(c['id'] for c in comment_list['comments'])
+    print_result(len(listed) == len(set(listed)), f"Cursor pagination returned {len(listed)} distinct comments")
+
+    # Listed comments carry the same reaction and reply aggregates as a single fetch
+    response = requests.get(f"{BASE_URL}/comments/page/{page_id}", headers=headers1)
+    listed_comment1 = next(c for c in response.json()['comments'] if c['id'] == comment1_id)
+    listed_reactions = {r['reaction_type']: (r['count'], r['user_reacted']) for r in listed_comment1['reactions']}
+    assert listed_reactions == {"thumbs_up": (2, True), "heart": (1, False)}, f"Unexpected listed reactions: {listed_reactions}"
+    assert listed_comment1['replies_count'] == 1, f"Unexpected listed replies_count: {listed_comment1['replies_count']}"
+    print_result(True, "Listed comment has its reactions and replies_count")
+
+    print_step("9. Comment Summary")
+
+    # A block comment counts toward its page; a page without comments gets zeros
+    block_data = {"page_id": page_id, "type": "paragraph", "content": {"text": "Commented block"}, "order": 0}
+    response = requests.post(f"{BASE_URL}/blocks/", json=block_data, headers=headers1)
+    assert response.status_code == 201, f"Failed to create block: {response.text}"
+    block_id = response.json()["id"]
+    response = requests.post(
+        f"{BASE_URL}/comments/",
+        json={"block_id": block_id, "content": "Comment on a block"},
+        headers=headers1
+    )
+    assert response.status_code == 201, f"Failed to comment on block: {response.text}"
+
+    response = requests.post(
+        f"{BASE_URL}/pages/",
+        json={"title": "Page without comments", "workspace_id": workspace_id},
+        headers=headers1
+    )
+    empty_page_id = response.json()["id"]
+
+    response = requests.get(
+        f"{BASE_URL}/comments/summary",
+        params={"page_ids": [page_id, empty_page_id]},
+        headers=headers2
+    )
+    assert response.status_code == 200, f"Failed to get comment summary: {response.text}"
+    summaries = {summary['page_id']: summary for summary in response.json()}
+    expected = {"total": 4, "open_threads": 3, "mentions_me": 1}
+    actual = {key: summaries[page_id][key] for key in expected}
+    assert actual == expected, f"Unexpected summary: {actual}"
+    print_result(True, f"Page summary: {actual}")
+    empty = summaries[empty_page_id]
+    assert (empty['total'], empty['open_threads'], empty['mentions_me']) == (0, 0, 0), f"Unexpected summary: {empty}"
+    print_result(True, "Page without comments has an all-zero summary")
+
+    print_step("10. Remove Reaction")
 
     response = requests.delete(f"{BASE_URL}/comments/{comment1_id}/reactions/thumbs_up", headers=headers1)
     assert response.status_code == 204, f"Failed to remove reaction: {response.text}"
@@ -237,19 +301,24 @@ def test_comment_workflow():
     response = requests.get(f"{BASE_URL}/comments/{comment1_id}", headers=headers1)
     comment_after_removal = response.json()
     thumbs_up_reaction = next((r for r in comment_after_removal['reactions'] if r['reaction_type'] == 'thumbs_up'), None)
-    if thumbs_up_reaction:
-        print_result(True, f"thumbs_up count is now {thumbs_up_reaction['count']} (was 2)")
+    assert thumbs_up_reaction and thumbs_up_reaction['count'] == 1, f"Unexpected thumbs_up reaction: {thumbs_up_reaction}"
+    print_result(True, f"thumbs_up count is now {thumbs_up_reaction['count']} (was 2)")
 
-    print_step("10. Soft Delete Comment")
+    print_step("11. Soft Delete Comment")
 
     response = requests.delete(f"{BASE_URL}/comments/{comment2_id}", headers=headers2)
     assert response.status_code == 204, f"Failed to soft delete comment: {response.text}"
     print_result(True, f"Comment soft deleted: {comment2_id}")
 
+    # Deleted replies no longer count toward the parent
+    response = requests.get(f"{BASE_URL}/comments/{comment1_id}", headers=headers1)
+    assert response.json()["replies_count"] == 0, f"Unexpected replies_count: {response.json()['replies_count']}"
+    print_result(True, "Parent replies_count is back to 0")
+
     # Verify deleted comment is not in list
     response = requests.get(f"{BASE_URL}/comments/page/{page_id}", headers=headers1)
     comment_list_after_delete = response.json()
-    deleted_comment_in_list = any(c['id'] == comment2_id for c in comment_list_after_delete['items'])
+    deleted_comment_in_list = any(c['id'] == comment2_id for c in comment_list_after_delete['comments'])
     print_result(not deleted_comment_in_list, "Deleted comment not in list")
 
     # Try to get deleted comment by ID
@@ -261,7 +330,7 @@ def test_comment_workflow():
         if deleted_comment.get('is_deleted'):
             print_result(True, f"Comment marked as deleted (content: '{deleted_comment['content']}')")
 
-    print_step("11. Test Thread Depth Limit")
+    print_step("12. Test Thread Depth Limit")
 
     # Create nested replies up to depth 5
     parent_id = comment1_id
@@ -289,7 +358,16 @@ def test_comment_workflow():
     else:
         print_result(False, f"Depth limit NOT enforced! Status: {response.status_code}")
 
-    print_step("12. Delete Attachment")
+    # Whole thread comes back nested in one request
+    response = requests.get(f"{BASE_URL}/comments/{comment1_id}/thread", headers=headers1)
+    assert response.status_code == 200, f"Failed to load thread: {response.text}"
+    node, thread_levels = response.json(), 0
+    while node['replies']:
+        node = node['replies'][-1]
+        thread_levels += 1
+    print_result(thread_levels >= 5, f"Thread loaded with {thread_levels} nested level(s)")
+
+    print_step("13. Delete Attachment")
 
     response = requests.delete(f"{BASE_URL}/comments/{comment1_id}/attachments/{attachment_id}", headers=headers1)
     assert response.status_code == 204, f"Failed to delete attachment: {response.text}"
@@ -306,12 +384,15 @@ def test_comment_workflow():
     print("  [OK] Create threaded replies (up to 5 levels)")
     print("  [OK] Add and remove reactions")
     print("  [OK] Reaction aggregation")
+    print("  [OK] Reply and reaction counters")
     print("  [OK] @mentions with workspace validation")
     print("  [OK] Edit comments")
     print("  [OK] Add and delete attachments")
     print("  [OK] Soft delete comments")
     print("  [OK] List comments with pagination")
+    print("  [OK] Bulk comment summary")
     print("  [OK] Thread depth limit enforcement")
+    print("  [OK] Whole-thread loading")
 
 if __name__ == "__main__":
     try:
@@ -106,6 +106,34 @@ if resp.status_code == 201:
 else:
     print(f"   Error: {resp.text}")
 
+print("10. Duplicating page WITH subpages...")
+resp = requests.post(f"{BASE_URL}/pages/", json={
+    "title": "Child Page",
+    "workspace_id": workspace_id,
+    "parent_id": page_id
+}, headers=headers)
+child_id = resp.json()["id"]
+requests.post(f"{BASE_URL}/blocks/", json={
+    "page_id": child_id,
+    "type": "paragraph",
+    "content": {"text": "Child paragraph"},
+    "order": 0
+}, headers=headers)
+
+resp = requests.post(f"{BASE_URL}/pages/{page_id}/duplicate?include_subpages=true", headers=headers)
+print(f"   Status: {resp.status_code}")
+if resp.status_code == 201:
+    dup_tree_id = resp.json()["id"]
+    resp = requests.get(f"{BASE_URL}/pages/?workspace_id={workspace_id}", headers=headers)
+    dup_children = [page for page in resp.json() if page.get("parent_id") == dup_tree_id]
+    print(f"   Duplicated subpages: {len(dup_children)} (should be 1)")
+    if len(dup_children) == 1:
+        resp = requests.get(f"{BASE_URL}/blocks/page/{dup_children[0]['id']}", headers=headers)
+        print(f"   Subpage blocks count: {len(resp.json())} (should be 1)")
+else:
+    print(f"   Error: {resp.text}")
+    exit(1)
+
 print("\n" + "="*50)
 print("All duplication tests completed successfully!")
 print("="*50)
@@ -0,0 +1,167 @@
+"""
+File Content Test
+Tests: byte ranges (206/416), ETag revalidation (304), If-Range, and the headers that
+keep uploaded files from running as active content
+"""
+
+import io
+import requests
+import time
+from typing import Dict, Any
+
+BASE_URL = "http://localhost:8001/api/v1"
+
+timestamp = int(time.time())
+
+user = {
+    "email": f"contentuser{timestamp}@example.com",
+    "password": "TestPassword123!",
+    "password_confirm": "TestPassword123!",
+    "name": "Content User"
+}
+
+TEXT = f"0123456789abcdefghijklmnopqrstuvwxyz {timestamp}".encode()
+
+SVG = (
+    b'<svg xmlns="http://www.w3.org/2000/svg" width="10" height="10">'
+    b'<script>alert(document.cookie)</script></svg>'
+)
+
+# 1x1 pixel PNG
+PNG = (
+    b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01'
+    b'\x08\x06\x00\x00\x00\x1f\x15\xc4\x89\x00\x00\x00\nIDATx\x9cc\x00\x01'
+    b'\x00\x00\x05\x00\x01\r\n-\xb4\x00\x00\x00\x00IEND\xaeB`\x82'
+)
+
+
+def print_step(message: str):
+    """Print a test step header"""
+    print(f"\n{'='*60}")
+    print(f"  {message}")
+    print(f"{'='*60}")
+
+
+def print_result(success: bool, message: str):
+    """Print test result"""
+    status = "[OK]" if success else "[FAIL]"
+    print(f"{status} {message}")
+
+
+def register_and_login(user_data: Dict[str, Any]) -> str:
+    """Register and login a user, return access token"""
+    requests.post(f"{BASE_URL}/auth/register", json=user_data)
+    response = requests.post(
+        f"{BASE_URL}/auth/login",
+        data={"username": user_data["email"], "password": user_data["password"]}
+    )
+    if response.status_code != 200:
+        raise Exception(f"Login failed (status {response.status_code}): {response.text}")
+    return response.json()["access_token"]
+
+
+def upload(headers: Dict[str, str], workspace_id: str, filename: str, content: bytes, mime_type: str) -> Dict[str, Any]:
+    response = requests.post(
+        f"{BASE_URL}/files/upload",
+        files={"file": (filename, io.BytesIO(content), mime_type)},
+        data={"workspace_id": workspace_id},
+        headers=headers
+    )
+    assert response.status_code == 201, f"Upload failed: {response.text}"
+    return response.json()
+
+
+def test_file_content():
+    """Run file content test"""
+
+    print_step("1. Setup: Creating workspace and uploading files")
+
+    headers = {"Authorization": f"Bearer {register_and_login(user)}"}
+    response = requests.post(f"{BASE_URL}/workspaces/", json={"name": "Content Test Workspace"}, headers=headers)
+    workspace_id = response.json()["id"]
+
+    text_file = upload(headers, workspace_id, "letters.txt", TEXT, "text/plain")
+    image_file = upload(headers, workspace_id, "pixel.png", PNG, "image/png")
+    svg_file = upload(headers, workspace_id, "drawing.svg", SVG, "image/svg+xml")
+    content_url = f"{BASE_URL}/files/{text_file['id']}/content"
+    print_result(True, "Uploaded a text file, a PNG and an SVG")
+
+    print_step("2. Whole file")
+
+    response = requests.get(content_url, headers=headers)
+    assert response.status_code == 200, f"Failed to get content: {response.text}"
+    assert response.content == TEXT, "Body should be the whole file"
+    assert response.headers["accept-ranges"] == "bytes"
+    etag = response.headers["etag"]
+    assert etag, "Content should carry an ETag"
+    print_result(True, f"200 with the whole file, ETag {etag}")
+
+    print_step("3. Byte ranges")
+
+    response = requests.get(content_url, headers={**headers, "Range": "bytes=2-5"})
+    assert response.status_code == 206, f"Expected 206, got {response.status_code}"
+    assert response.content == TEXT[2:6], f"Unexpected range body: {response.content!r}"
+    assert response.headers["content-range"] == f"bytes 2-5/{len(TEXT)}", response.headers["content-range"]
+    assert response.headers["content-length"] == "4"
+    print_result(True, "bytes=2-5 answered with 206 and 4 bytes")
+
+    response = requests.get(content_url, headers={**headers, "Range": "bytes=-3"})
+    assert response.status_code == 206 and response.content == TEXT[-3:], "Suffix range should return the last 3 bytes"
+    print_result(True, "Suffix range bytes=-3 returns the last 3 bytes")
+
+    response = requests.get(content_url, headers={**headers, "Range": f"bytes={len(TEXT)}-"})
+    assert response.status_code == 416, f"Expected 416, got {response.status_code}"
+    assert response.headers["content-range"] == f"bytes */{len(TEXT)}", response.headers.get("content-range")
+    print_result(True, "Range past the end answered with 416")
+
+    print_step("4. Conditional requests")
+
+    response = requests.get(content_url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304, f"Expected 304, got {response.status_code}"
+    assert not response.content, "304 should have no body"
+    print_result(True, "If-None-Match with the ETag answered with 304")
+
+    response = requests.get(content_url, headers={**headers, "Range": "bytes=0-1", "If-Range": etag})
+    assert response.status_code == 206 and response.content == TEXT[:2], "Matching If-Range should honour the range"
+    response = requests.get(content_url, headers={**headers, "Range": "bytes=0-1", "If-Range": '"stale"'})
+    assert response.status_code == 200 and response.content == TEXT, "Stale If-Range should send the whole file"
+    print_result(True, "If-Range honours the range only for the current ETag")
+
+    print_step("5. Active content headers")
+
+    response = requests.get(content_url, headers=headers)
+    assert response.headers["x-content-type-options"] == "nosniff"
+    assert response.headers["content-security-policy"] == "sandbox"
+    assert response.headers["content-disposition"].startswith("attachment;"), response.headers["content-disposition"]
+    print_result(True, "Text file is sandboxed, not sniffed and sent as an attachment")
+
+    response = requests.get(f"{BASE_URL}/files/{image_file['id']}/content", headers=headers)
+    assert response.headers["content-disposition"].startswith("inline;"), response.headers["content-disposition"]
+    assert response.headers["x-content-type-options"] == "nosniff"
+    print_result(True, "PNG is served inline")
+
+    response = requests.get(f"{BASE_URL}/files/{svg_file['id']}/content", headers=headers)
+    assert response.content == SVG
+    assert response.headers["content-disposition"].startswith("attachment;"), response.headers["content-disposition"]
+    assert response.headers["content-security-policy"] == "sandbox"
+    print_result(True, "SVG is sent as a sandboxed attachment")
+
+    if svg_file["storage_provider"] == "local":
+        # Local download URLs are paths on the API server
+        response = requests.get(BASE_URL.removesuffix("/api/v1") + svg_file["download_url"])
+        assert response.status_code == 200, f"Presigned download failed: {response.status_code}"
+        assert response.headers["content-disposition"].startswith("attachment;"), response.headers["content-disposition"]
+        assert response.headers["content-security-policy"] == "sandbox"
+        assert response.headers["x-content-type-options"] == "nosniff"
+        print_result(True, "Presigned blob URL sends the SVG as a sandboxed attachment")
+
+    print_step("ALL TESTS COMPLETED SUCCESSFULLY!")
+
+
+if __name__ == "__main__":
+    try:
+        test_file_content()
+    except Exception as e:
+        print(f"\n[FAIL] TEST FAILED: {str(e)}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,172 @@
+"""
+Mentions Inbox Test
+Tests: inbox listing with cursor pagination, unread count, marking mentions read
+"""
+
+import requests
+import time
+from typing import Dict, Any
+
+BASE_URL = "http://localhost:8001/api/v1"
+
+timestamp = int(time.time())
+
+author = {
+    "email": f"mentionauthor{timestamp}@example.com",
+    "password": "TestPassword123!",
+    "password_confirm": "TestPassword123!",
+    "name": "Mention Author"
+}
+
+mentioned = {
+    "email": f"mentioned{timestamp}@example.com",
+    "password": "TestPassword123!",
+    "password_confirm": "TestPassword123!",
+    "name": "Mentioned User"
+}
+
+
+def print_step(message: str):
+    """Print a test step header"""
+    print(f"\n{'='*60}")
+    print(f"  {message}")
+    print(f"{'='*60}")
+
+
+def print_result(success: bool, message: str):
+    """Print test result"""
+    status = "[OK]" if success else "[FAIL]"
+    print(f"{status} {message}")
+
+
+def register_and_login(user_data: Dict[str, Any]) -> str:
+    """Register and login a user, return access token"""
+    requests.post(f"{BASE_URL}/auth/register", json=user_data)
+    response = requests.post(
+        f"{BASE_URL}/auth/login",
+        data={"username": user_data["email"], "password": user_data["password"]}
+    )
+    if response.status_code != 200:
+        raise Exception(f"Login failed (status {response.status_code}): {response.text}")
+    return response.json()["access_token"]
+
+
+def test_mentions_inbox():
+    """Run mentions inbox test"""
+
+    print_step("1. Setup: Creating users, workspace and page")
+
+    headers1 = {"Authorization": f"Bearer {register_and_login(author)}"}
+    headers2 = {"Authorization": f"Bearer {register_and_login(mentioned)}"}
+    mentioned_id = requests.get(f"{BASE_URL}/auth/me", headers=headers2).json()["id"]
+
+    response = requests.post(f"{BASE_URL}/workspaces/", json={"name": "Mentions Test Workspace"}, headers=headers1)
+    workspace_id = response.json()["id"]
+
+    response = requests.post(
+        f"{BASE_URL}/workspaces/{workspace_id}/invitations",
+        json={"email": mentioned["email"], "role": "editor"},
+        headers=headers1
+    )
+    assert response.status_code == 201, f"Invitation failed: {response.text}"
+    response = requests.post(
+        f"{BASE_URL}/invitations/accept",
+        json={"token": response.json()["token"]},
+        headers=headers2
+    )
+    assert response.status_code == 200, f"Accept invitation failed: {response.text}"
+
+    response = requests.post(
+        f"{BASE_URL}/pages/",
+        json={"title": "Mentions Test Page", "workspace_id": workspace_id},
+        headers=headers1
+    )
+    page_id = response.json()["id"]
+    print_result(True, f"Workspace {workspace_id} with page {page_id}")
+
+    print_step("2. Mention the user in three comments")
+
+    mention_comment_ids = []
+    for i in range(3):
+        response = requests.post(
+            f"{BASE_URL}/comments/",
+            json={"page_id": page_id, "content": f"Ping {i} @[{mentioned['name']}]({mentioned_id})"},
+            headers=headers1
+        )
+        assert response.status_code == 201, f"Failed to create comment: {response.text}"
+        mention_comment_ids.append(response.json()["id"])
+    response = requests.post(
+        f"{BASE_URL}/comments/",
+        json={"page_id": page_id, "content": "No mention here"},
+        headers=headers1
+    )
+    assert response.status_code == 201, f"Failed to create comment: {response.text}"
+    print_result(True, "3 mentioning comments and 1 plain comment created")
+
+    response = requests.get(f"{BASE_URL}/comments/mentions/unread-count", headers=headers2)
+    assert response.json()["unread_count"] == 3, f"Unexpected unread count: {response.json()}"
+    print_result(True, "Unread count is 3")
+
+    print_step("3. Page through the inbox with the cursor")
+
+    response = requests.get(f"{BASE_URL}/comments/mentions", params={"limit": 2}, headers=headers2)
+    assert response.status_code == 200, f"Failed to list mentions: {response.text}"
+    inbox = response.json()
+    assert len(inbox["items"]) == 2 and inbox["next_cursor"], f"Unexpected first page: {inbox}"
+    items = inbox["items"]
+
+    response = requests.get(
+        f"{BASE_URL}/comments/mentions",
+        params={"limit": 2, "cursor": inbox["next_cursor"]},
+        headers=headers2
+    )
+    assert response.status_code == 200, f"Failed to follow cursor: {response.text}"
+    inbox = response.json()
+    assert len(inbox["items"]) == 1 and inbox["next_cursor"] is None, f"Unexpected last page: {inbox}"
+    items.extend(inbox["items"])
+
+    listed = [item["comment_id"] for item in items]
+    assert listed == mention_comment_ids[::-1], f"Inbox not newest first: {listed}"
+    assert all(item["read_at"] is None for item in items), "Mentions should start unread"
+    assert all(item["comment"]["id"] == item["comment_id"] for item in items), "Items should embed their comment"
+    print_result(True, "Cursor pagination returned the 3 mentions, newest first")
+
+    response = requests.get(f"{BASE_URL}/comments/mentions", params={"cursor": "not-a-cursor"}, headers=headers2)
+    assert response.status_code == 400, f"Malformed cursor should be rejected: {response.status_code}"
+    print_result(True, "Malformed cursor rejected")
+
+    response = requests.get(f"{BASE_URL}/comments/mentions", headers=headers1)
+    assert response.json()["items"] == [], "Author should have no mentions"
+    print_result(True, "Author's inbox is empty")
+
+    print_step("4. Mark mentions read")
+
+    first_mention_id = items[0]["id"]
+    response = requests.post(f"{BASE_URL}/comments/mentions/read", json={"mention_ids": [first_mention_id]}, headers=headers2)
+    assert response.status_code == 200, f"Failed to mark mention read: {response.text}"
+    assert response.json()["unread_count"] == 2, f"Unexpected unread count: {response.json()}"
+    print_result(True, "Marked one mention read; 2 unread left")
+
+    response = requests.get(f"{BASE_URL}/comments/mentions", params={"unread_only": True}, headers=headers2)
+    unread_ids = [item["id"] for item in response.json()["items"]]
+    assert len(unread_ids) == 2 and first_mention_id not in unread_ids, f"Unexpected unread mentions: {unread_ids}"
+    print_result(True, "unread_only listing skips the read mention")
+
+    response = requests.post(f"{BASE_URL}/comments/mentions/read", json={}, headers=headers2)
+    assert response.json()["unread_count"] == 0, f"Unexpected unread count: {response.json()}"
+    response = requests.get(f"{BASE_URL}/comments/mentions", params={"unread_only": True}, headers=headers2)
+    assert response.json()["items"] == [], "No unread mentions should be left"
+    response = requests.get(f"{BASE_URL}/comments/mentions", headers=headers2)
+    assert all(item["read_at"] for item in response.json()["items"]), "All mentions should be read"
+    print_result(True, "Marked all mentions read")
+
+    print_step("ALL TESTS COMPLETED SUCCESSFULLY!")
+
+
+if __name__ == "__main__":
+    try:
+        test_mentions_inbox()
+    except Exception as e:
+        print(f"\n[FAIL] TEST FAILED: {str(e)}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,158 @@
+"""
+Resumable Upload Test
+Tests: chunked upload sessions, progress after an interrupted upload, resuming with
+out-of-order and re-sent chunks, and completion into a file record
+"""
+
+import requests
+import time
+from typing import Dict, Any
+
+BASE_URL = "http://localhost:8001/api/v1"
+
+timestamp = int(time.time())
+
+user = {
+    "email": f"resumableuser{timestamp}@example.com",
+    "password": "TestPassword123!",
+    "password_confirm": "TestPassword123!",
+    "name": "Resumable User"
+}
+
+
+def print_step(message: str):
+    """Print a test step header"""
+    print(f"\n{'='*60}")
+    print(f"  {message}")
+    print(f"{'='*60}")
+
+
+def print_result(success: bool, message: str):
+    """Print test result"""
+    status = "[OK]" if success else "[FAIL]"
+    print(f"{status} {message}")
+
+
+def register_and_login(user_data: Dict[str, Any]) -> str:
+    """Register and login a user, return access token"""
+    requests.post(f"{BASE_URL}/auth/register", json=user_data)
+    response = requests.post(
+        f"{BASE_URL}/auth/login",
+        data={"username": user_data["email"], "password": user_data["password"]}
+    )
+    if response.status_code != 200:
+        raise Exception(f"Login failed (status {response.status_code}): {response.text}")
+    return response.json()["access_token"]
+
+
+def test_resumable_upload():
+    """Run resumable upload test"""
+
+    print_step("1. Setup: Creating workspace")
+
+    headers = {"Authorization": f"Bearer {register_and_login(user)}"}
+    response = requests.post(f"{BASE_URL}/workspaces/", json={"name": "Resumable Test Workspace"}, headers=headers)
+    workspace_id = response.json()["id"]
+    print_result(True, f"Workspace {workspace_id}")
+
+    print_step("2. Start and cancel an upload session")
+
+    response = requests.post(
+        f"{BASE_URL}/files/uploads",
+        json={"workspace_id": workspace_id, "filename": "probe.txt", "size_bytes": 1, "mime_type": "text/plain"},
+        headers=headers
+    )
+    assert response.status_code == 201, f"Failed to start upload: {response.text}"
+    probe = response.json()
+    chunk_size = probe["chunk_size"]
+    response = requests.delete(f"{BASE_URL}/files/uploads/{probe['id']}", headers=headers)
+    assert response.status_code == 204, f"Failed to cancel upload: {response.text}"
+    response = requests.get(f"{BASE_URL}/files/uploads/{probe['id']}", headers=headers)
+    assert response.status_code == 404, "Cancelled session should be gone"
+    print_result(True, f"Chunk size is {chunk_size} bytes; cancelled session is gone")
+
+    print_step("3. Upload part of a file, then stop")
+
+    line = f"resumable upload {timestamp}\n".encode()
+    content = (line * (2 * chunk_size // len(line) + 100))[:2 * chunk_size + 1000]
+    chunks = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+
+    response = requests.post(
+        f"{BASE_URL}/files/uploads",
+        json={
+            "workspace_id": workspace_id,
+            "filename": "resumable.txt",
+            "size_bytes": len(content),
+            "mime_type": "text/plain"
+        },
+        headers=headers
+    )
+    assert response.status_code == 201, f"Failed to start upload: {response.text}"
+    upload_session = response.json()
+    session_url = f"{BASE_URL}/files/uploads/{upload_session['id']}"
+    assert upload_session["total_chunks"] == 3, f"Unexpected chunk count: {upload_session}"
+    assert upload_session["received_chunks"] == [] and upload_session["received_bytes"] == 0
+
+    # Last chunk first: chunks may arrive in any order
+    for index in (2, 0):
+        response = requests.put(f"{session_url}/chunks/{index}", data=chunks[index], headers=headers)
+        assert response.status_code == 200, f"Failed to upload chunk {index}: {response.text}"
+
+    response = requests.put(f"{session_url}/chunks/1", data=chunks[1][:100], headers=headers)
+    assert response.status_code == 400, f"Short chunk should be rejected: {response.status_code}"
+    response = requests.put(f"{session_url}/chunks/3", data=b"x", headers=headers)
+    assert response.status_code == 400, f"Chunk past the end should be rejected: {response.status_code}"
+    print_result(True, "Chunks 2 and 0 stored; short and out-of-range chunks rejected")
+
+    response = requests.post(f"{session_url}/complete", headers=headers)
+    assert response.status_code == 409, f"Completing with a missing chunk should fail: {response.status_code}"
+    print_result(True, "Completing early answered with 409")
+
+    print_step("4. Resume from the reported progress")
+
+    response = requests.get(session_url, headers=headers)
+    assert response.status_code == 200, f"Failed to get progress: {response.text}"
+    progress = response.json()
+    assert progress["received_chunks"] == [0, 2], f"Unexpected chunks: {progress['received_chunks']}"
+    assert progress["received_ranges"] == [[0, chunk_size], [2 * chunk_size, len(content)]], progress["received_ranges"]
+    assert progress["received_bytes"] == chunk_size + 1000, progress["received_bytes"]
+    print_result(True, f"Progress reports chunks {progress['received_chunks']}")
+
+    missing = [index for index in range(progress["total_chunks"]) if index not in progress["received_chunks"]]
+    for index in missing + [0]:
+        # Re-sending a stored chunk is harmless
+        response = requests.put(f"{session_url}/chunks/{index}", data=chunks[index], headers=headers)
+        assert response.status_code == 200, f"Failed to upload chunk {index}: {response.text}"
+    progress = response.json()
+    assert progress["received_chunks"] == [0, 1, 2] and progress["received_bytes"] == len(content), progress
+    print_result(True, "Missing chunk sent; every byte received")
+
+    print_step("5. Complete the upload")
+
+    response = requests.post(f"{session_url}/complete", headers=headers)
+    assert response.status_code == 201, f"Failed to complete upload: {response.text}"
+    uploaded = response.json()
+    assert uploaded["filename"] == "resumable.txt" and uploaded["size_bytes"] == len(content), uploaded
+    assert uploaded["mime_type"] == "text/plain", uploaded["mime_type"]
+    print_result(True, f"File {uploaded['id']} created ({uploaded['size_bytes']} bytes)")
+
+    response = requests.get(f"{BASE_URL}/files/{uploaded['id']}/content", headers=headers)
+    assert response.status_code == 200 and response.content == content, "Assembled file should match the original"
+    print_result(True, "Downloaded contents match the chunks in order")
+
+    response = requests.get(session_url, headers=headers)
+    assert response.status_code == 404, "Completed session should be gone"
+    response = requests.post(f"{session_url}/complete", headers=headers)
+    assert response.status_code == 404, "Completing twice should not create a second file"
+    print_result(True, "Session removed; completing twice is rejected")
+
+    print_step("ALL TESTS COMPLETED SUCCESSFULLY!")
+
+
+if __name__ == "__main__":
+    try:
+        test_resumable_upload()
+    except Exception as e:
+        print(f"\n[FAIL] TEST FAILED: {str(e)}")
+        import traceback
+        traceback.print_exc()
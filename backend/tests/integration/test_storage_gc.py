@@ -0,0 +1,193 @@
+"""
+Orphaned File Collection Test
+Tests: unreferenced block files and orphaned objects are collected, while objects still
+embedded in block content or in page version snapshots survive
+
+Runs the collector in-process against the server's database, so the server must use
+the local storage backend with the same LOCAL_STORAGE_PATH.
+"""
+
+import io
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Any
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import requests
+
+BASE_URL = "http://localhost:8001/api/v1"
+
+timestamp = int(time.time())
+
+user = {
+    "email": f"gcuser{timestamp}@example.com",
+    "password": "TestPassword123!",
+    "password_confirm": "TestPassword123!",
+    "name": "GC User"
+}
+
+
+def print_step(message: str):
+    """Print a test step header"""
+    print(f"\n{'='*60}")
+    print(f"  {message}")
+    print(f"{'='*60}")
+
+
+def print_result(success: bool, message: str):
+    """Print test result"""
+    status = "[OK]" if success else "[FAIL]"
+    print(f"{status} {message}")
+
+
+def register_and_login(user_data: Dict[str, Any]) -> str:
+    """Register and login a user, return access token"""
+    requests.post(f"{BASE_URL}/auth/register", json=user_data)
+    response = requests.post(
+        f"{BASE_URL}/auth/login",
+        data={"username": user_data["email"], "password": user_data["password"]}
+    )
+    if response.status_code != 200:
+        raise Exception(f"Login failed (status {response.status_code}): {response.text}")
+    return response.json()["access_token"]
+
+
+def create_block(headers: Dict[str, str], page_id: str, order: int) -> str:
+    response = requests.post(
+        f"{BASE_URL}/blocks/",
+        json={"page_id": page_id, "type": "file", "content": {}, "order": order},
+        headers=headers
+    )
+    assert response.status_code == 201, f"Failed to create block: {response.text}"
+    return response.json()["id"]
+
+
+def update_block(headers: Dict[str, str], block_id: str, content: Dict[str, Any]):
+    response = requests.patch(f"{BASE_URL}/blocks/{block_id}", json={"content": content}, headers=headers)
+    assert response.status_code == 200, f"Failed to update block: {response.text}"
+
+
+def list_blocks(headers: Dict[str, str], page_id: str):
+    response = requests.get(f"{BASE_URL}/blocks/page/{page_id}", headers=headers)
+    assert response.status_code == 200, f"Failed to list blocks: {response.text}"
+    return response.json()
+
+
+def save_version(headers: Dict[str, str], page_id: str) -> int:
+    response = requests.post(f"{BASE_URL}/pages/{page_id}/versions", json={}, headers=headers)
+    assert response.status_code == 201, f"Failed to create version: {response.text}"
+    return response.json()["version_number"]
+
+
+def restore_version(headers: Dict[str, str], page_id: str, version_number: int):
+    response = requests.post(f"{BASE_URL}/pages/{page_id}/versions/{version_number}/restore", headers=headers)
+    assert response.status_code == 200, f"Failed to restore version: {response.text}"
+
+
+def upload(headers: Dict[str, str], workspace_id: str, block_id: str, content: bytes) -> Dict[str, Any]:
+    response = requests.post(
+        f"{BASE_URL}/files/upload",
+        files={"file": ("notes.txt", io.BytesIO(content), "text/plain")},
+        data={"workspace_id": workspace_id, "block_id": block_id},
+        headers=headers
+    )
+    assert response.status_code == 201, f"Upload failed: {response.text}"
+    return response.json()
+
+
+def test_storage_gc():
+    """Run orphaned file collection test"""
+    from app.core.database import SessionLocal
+    from app.services.storage import get_storage_backend
+    from app.services.storage_gc import collect_orphaned_files
+
+    backend = get_storage_backend("local")
+
+    print_step("1. Setup: Creating workspace, page and blocks")
+
+    headers = {"Authorization": f"Bearer {register_and_login(user)}"}
+    response = requests.post(f"{BASE_URL}/workspaces/", json={"name": "GC Test Workspace"}, headers=headers)
+    workspace_id = response.json()["id"]
+    response = requests.post(
+        f"{BASE_URL}/pages/",
+        json={"title": "GC Test Page", "workspace_id": workspace_id},
+        headers=headers
+    )
+    page_id = response.json()["id"]
+
+    block_id = create_block(headers, page_id, 0)
+    empty_version = save_version(headers, page_id)
+    other_block_id = create_block(headers, page_id, 1)
+    print_result(True, f"Page {page_id} with one block in version {empty_version}, then a second block")
+
+    print_step("2. Embed a file, restore past it and back")
+
+    restored = upload(headers, workspace_id, other_block_id, f"restored {timestamp}".encode())
+    hidden = upload(headers, workspace_id, other_block_id, f"hidden {timestamp}".encode())
+    update_block(headers, block_id, {"url": restored["storage_url"]})
+
+    # The second block is not in the version, so restoring deletes it, which cascades
+    # to the files attached to it; restoring the saved state brings the URL back
+    restore_version(headers, page_id, empty_version)
+    restore_version(headers, page_id, empty_version + 1)
+    response = requests.get(f"{BASE_URL}/files/{restored['id']}", headers=headers)
+    assert response.status_code == 404, "Restoring should cascade to the removed block's files"
+    assert any(
+        block["id"] == block_id and block["content"].get("url") == restored["storage_url"]
+        for block in list_blocks(headers, page_id)
+    ), "The restored block should embed the file again"
+    print_result(True, "Restored block embeds a file whose record is gone")
+
+    print_step("3. Drop a file from its block after a version embedded it")
+
+    versioned = upload(headers, workspace_id, block_id, f"versioned {timestamp}".encode())
+    update_block(headers, block_id, {"url": restored["storage_url"], "attachment": versioned["storage_url"]})
+    save_version(headers, page_id)
+    update_block(headers, block_id, {"url": restored["storage_url"]})
+    unreferenced = upload(headers, workspace_id, block_id, f"unreferenced {timestamp}".encode())
+    print_result(True, "One file only in a version snapshot, one never shown")
+
+    print_step("4. Run the collector")
+
+    db = SessionLocal()
+    try:
+        # Pretend a day has passed, so the new files are old enough to collect
+        stats = collect_orphaned_files(
+            db, [backend], now=datetime.now(timezone.utc) + timedelta(hours=25), deletes_per_second=0
+        )
+    finally:
+        db.close()
+    print(f"  {stats}")
+
+    response = requests.get(f"{BASE_URL}/files/{unreferenced['id']}", headers=headers)
+    assert response.status_code == 404, "A block file nothing shows should be collected"
+    assert not os.path.exists(backend.path(unreferenced["storage_id"])), "Its stored object should be deleted"
+    assert not os.path.exists(backend.path(hidden["storage_id"])), \
+        "An object with no record that nothing embeds should be deleted"
+    print_result(True, "Unreferenced block file and orphaned object collected")
+
+    assert os.path.exists(backend.path(restored["storage_id"])), \
+        "An object embedded in current block content must survive"
+    print_result(True, "Object embedded in the restored block kept")
+
+    response = requests.get(f"{BASE_URL}/files/{versioned['id']}", headers=headers)
+    assert response.status_code == 200, "A file embedded in a version snapshot must keep its record"
+    assert os.path.exists(backend.path(versioned["storage_id"])), \
+        "An object embedded in a version snapshot must survive"
+    print_result(True, "File only referenced by a version snapshot kept")
+
+    print_step("ALL TESTS COMPLETED SUCCESSFULLY!")
+
+
+if __name__ == "__main__":
+    try:
+        test_storage_gc()
+    except Exception as e:
+        print(f"\n[FAIL] TEST FAILED: {str(e)}")
+        import traceback
+        traceback.print_exc()
@@ -0,0 +1,208 @@
+"""
+Storage Stats Test
+Tests: workspace storage rollup (files and bytes per type) after uploads, deletes, page
+duplication and permanent page deletion, and the storage quota numbers and 507 responses
+
+The quota step sets a small per-workspace quota in the server's database directly, as
+no endpoint changes it.
+"""
+
+import io
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any
+
+# Add parent directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+import requests
+
+BASE_URL = "http://localhost:8001/api/v1"
+
+timestamp = int(time.time())
+
+user = {
+    "email": f"statsuser{timestamp}@example.com",
+    "password": "TestPassword123!",
+    "password_confirm": "TestPassword123!",
+    "name": "Stats User"
+}
+
+# 1x1 pixel PNG
+PNG = (
+    b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01'
+    b'\x08\x06\x00\x00\x00\x1f\x15\xc4\x89\x00\x00\x00\nIDATx\x9cc\x00\x01'
+    b'\x00\x00\x05\x00\x01\r\n-\xb4\x00\x00\x00\x00IEND\xaeB`\x82'
+)
+
+
+def print_step(message: str):
+    """Print a test step header"""
+    print(f"\n{'='*60}")
+    print(f"  {message}")
+    print(f"{'='*60}")
+
+
+def print_result(success: bool, message: str):
+    """Print test result"""
+    status = "[OK]" if success else "[FAIL]"
+    print(f"{status} {message}")
+
+
+def register_and_login(user_data: Dict[str, Any]) -> str:
+    """Register and login a user, return access token"""
+    requests.post(f"{BASE_URL}/auth/register", json=user_data)
+    response = requests.post(
+        f"{BASE_URL}/auth/login",
+        data={"username": user_data["email"], "password": user_data["password"]}
+    )
+    if response.status_code != 200:
+        raise Exception(f"Login failed (status {response.status_code}): {response.text}")
+    return response.json()["access_token"]
+
+
+def upload(headers: Dict[str, str], data: Dict[str, str], filename: str, content: bytes, mime_type: str):
+    return requests.post(
+        f"{BASE_URL}/files/upload",
+        files={"file": (filename, io.BytesIO(content), mime_type)},
+        data=data,
+        headers=headers
+    )
+
+
+def get_stats(headers: Dict[str, str], workspace_id: str) -> Dict[str, Any]:
+    response = requests.get(f"{BASE_URL}/files/workspace/{workspace_id}/stats", headers=headers)
+    assert response.status_code == 200, f"Failed to get stats: {response.text}"
+    return response.json()
+
+
+def set_quota(workspace_id: str, quota_bytes: int):
+    """Give the workspace its own quota (there is no endpoint for it)"""
+    from uuid import UUID
+    from app.core.database import SessionLocal
+    from app.models.workspace_storage_usage import WorkspaceStorageQuota
+
+    db = SessionLocal()
+    try:
+        quota = db.get(WorkspaceStorageQuota, UUID(workspace_id))
+        if quota is None:
+            quota = WorkspaceStorageQuota(workspace_id=UUID(workspace_id), used_bytes=0)
+            db.add(quota)
+        quota.quota_bytes = quota_bytes
+        db.commit()
+    finally:
+        db.close()
+
+
+def assert_stats(stats: Dict[str, Any], total_files: int, total_size_bytes: int, files_by_type: Dict[str, int]):
+    assert stats["total_files"] == total_files, f"Expected {total_files} files: {stats}"
+    assert stats["total_size_bytes"] == total_size_bytes, f"Expected {total_size_bytes} bytes: {stats}"
+    assert stats["files_by_type"] == files_by_type, f"Expected {files_by_type}: {stats}"
+
+
+def test_storage_stats():
+    """Run storage stats test"""
+
+    print_step("1. Setup: Creating workspace and page")
+
+    headers = {"Authorization": f"Bearer {register_and_login(user)}"}
+    response = requests.post(f"{BASE_URL}/workspaces/", json={"name": "Stats Test Workspace"}, headers=headers)
+    workspace_id = response.json()["id"]
+    response = requests.post(
+        f"{BASE_URL}/pages/",
+        json={"title": "Stats Test Page", "workspace_id": workspace_id},
+        headers=headers
+    )
+    page_id = response.json()["id"]
+
+    assert_stats(get_stats(headers, workspace_id), 0, 0, {})
+    print_result(True, "New workspace stores nothing")
+
+    print_step("2. Upload files")
+
+    notes = f"notes {timestamp}".encode()
+    report = f"quarterly report {timestamp}".encode()
+    response = upload(headers, {"workspace_id": workspace_id, "page_id": page_id}, "pixel.png", PNG, "image/png")
+    assert response.status_code == 201, f"Upload failed: {response.text}"
+    response = upload(headers, {"workspace_id": workspace_id, "page_id": page_id}, "notes.txt", notes, "text/plain")
+    assert response.status_code == 201, f"Upload failed: {response.text}"
+    notes_id = response.json()["id"]
+    response = upload(headers, {"workspace_id": workspace_id}, "report.txt", report, "text/plain")
+    assert response.status_code == 201, f"Upload failed: {response.text}"
+
+    stats = get_stats(headers, workspace_id)
+    assert_stats(stats, 3, len(PNG) + len(notes) + len(report), {"image": 1, "document": 2})
+    print_result(True, f"3 files, {stats['total_size_bytes']} bytes: {stats['files_by_type']}")
+
+    print_step("3. Delete a file")
+
+    response = requests.delete(f"{BASE_URL}/files/{notes_id}", headers=headers)
+    assert response.status_code == 204, f"Failed to delete file: {response.text}"
+    assert_stats(get_stats(headers, workspace_id), 2, len(PNG) + len(report), {"image": 1, "document": 1})
+    print_result(True, "Deleted file no longer counted")
+
+    print_step("4. Duplicate the page, then delete the copy for good")
+
+    response = requests.post(f"{BASE_URL}/pages/{page_id}/duplicate", headers=headers)
+    assert response.status_code == 201, f"Failed to duplicate page: {response.text}"
+    copy_id = response.json()["id"]
+    assert_stats(get_stats(headers, workspace_id), 3, 2 * len(PNG) + len(report), {"image": 2, "document": 1})
+    print_result(True, "Files copied with the page are counted")
+
+    response = requests.delete(f"{BASE_URL}/pages/{copy_id}", headers=headers)
+    assert response.status_code == 204, f"Failed to trash page: {response.text}"
+    response = requests.delete(f"{BASE_URL}/pages/{copy_id}/permanent", headers=headers)
+    assert response.status_code == 204, f"Failed to delete page: {response.text}"
+    assert_stats(get_stats(headers, workspace_id), 2, len(PNG) + len(report), {"image": 1, "document": 1})
+    print_result(True, "Files removed with the page are no longer counted")
+
+    print_step("5. Storage quota")
+
+    used = len(PNG) + len(report)
+    set_quota(workspace_id, used + 100)
+    stats = get_stats(headers, workspace_id)
+    assert stats["quota_bytes"] == used + 100, f"Unexpected quota: {stats}"
+    assert stats["reserved_bytes"] == 0 and stats["available_bytes"] == 100, f"Unexpected quota numbers: {stats}"
+    print_result(True, f"Quota {stats['quota_bytes']} bytes, {stats['available_bytes']} available")
+
+    response = upload(headers, {"workspace_id": workspace_id}, "big.txt", b"x" * 101, "text/plain")
+    assert response.status_code == 507, f"Upload over the quota should fail: {response.status_code}"
+    response = requests.post(
+        f"{BASE_URL}/files/uploads",
+        json={"workspace_id": workspace_id, "filename": "big.txt", "size_bytes": 101, "mime_type": "text/plain"},
+        headers=headers
+    )
+    assert response.status_code == 507, f"Resumable upload over the quota should fail: {response.status_code}"
+    stats = get_stats(headers, workspace_id)
+    assert stats["reserved_bytes"] == 0 and stats["available_bytes"] == 100, f"Rejected uploads leaked: {stats}"
+    print_result(True, "Uploads over the quota rejected with 507, nothing left reserved")
+
+    response = upload(headers, {"workspace_id": workspace_id}, "fits.txt", b"y" * 60, "text/plain")
+    assert response.status_code == 201, f"Upload within the quota failed: {response.text}"
+    fits_id = response.json()["id"]
+    stats = get_stats(headers, workspace_id)
+    assert stats["reserved_bytes"] == 0 and stats["available_bytes"] == 40, f"Unexpected quota numbers: {stats}"
+    print_result(True, "Upload within the quota stored; 40 bytes available")
+
+    response = requests.post(f"{BASE_URL}/pages/{page_id}/duplicate", headers=headers)
+    assert response.status_code == 507, f"Duplicating files over the quota should fail: {response.status_code}"
+    assert get_stats(headers, workspace_id)["total_files"] == 3, "A rejected duplication should copy nothing"
+    print_result(True, "Page duplication over the quota rejected with 507")
+
+    response = requests.delete(f"{BASE_URL}/files/{fits_id}", headers=headers)
+    assert response.status_code == 204, f"Failed to delete file: {response.text}"
+    stats = get_stats(headers, workspace_id)
+    assert stats["available_bytes"] == 100, f"Deleting should free its bytes: {stats}"
+    print_result(True, "Deleting the file frees its bytes")
+
+    print_step("ALL TESTS COMPLETED SUCCESSFULLY!")
+
+
+if __name__ == "__main__":
+    try:
+        test_storage_stats()
+    except Exception as e:
+        print(f"\n[FAIL] TEST FAILED: {str(e)}")
+        import traceback
+        traceback.print_exc()
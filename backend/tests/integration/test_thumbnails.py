@@ -0,0 +1,134 @@
+"""
+Thumbnail Test
+Tests: thumbnails generated in the background for uploaded images, their size and format,
+reuse by deduplicated uploads, and no thumbnail for other file types
+"""
+
+import io
+import requests
+import time
+from typing import Dict, Any
+
+from PIL import Image
+
+BASE_URL = "http://localhost:8001/api/v1"
+
+timestamp = int(time.time())
+
+user = {
+    "email": f"thumbnailuser{timestamp}@example.com",
+    "password": "TestPassword123!",
+    "password_confirm": "TestPassword123!",
+    "name": "Thumbnail User"
+}
+
+
+def print_step(message: str):
+    """Print a test step header"""
+    print(f"\n{'='*60}")
+    print(f"  {message}")
+    print(f"{'='*60}")
+
+
+def print_result(success: bool, message: str):
+    """Print test result"""
+    status = "[OK]" if success else "[FAIL]"
+    print(f"{status} {message}")
+
+
+def register_and_login(user_data: Dict[str, Any]) -> str:
+    """Register and login a user, return access token"""
+    requests.post(f"{BASE_URL}/auth/register", json=user_data)
+    response = requests.post(
+        f"{BASE_URL}/auth/login",
+        data={"username": user_data["email"], "password": user_data["password"]}
+    )
+    if response.status_code != 200:
+        raise Exception(f"Login failed (status {response.status_code}): {response.text}")
+    return response.json()["access_token"]
+
+
+def upload(headers: Dict[str, str], workspace_id: str, filename: str, content: bytes, mime_type: str) -> Dict[str, Any]:
+    response = requests.post(
+        f"{BASE_URL}/files/upload",
+        files={"file": (filename, io.BytesIO(content), mime_type)},
+        data={"workspace_id": workspace_id},
+        headers=headers
+    )
+    assert response.status_code == 201, f"Upload failed: {response.text}"
+    return response.json()
+
+
+def wait_for_thumbnail(headers: Dict[str, str], file_id: str, timeout: float = 15) -> Dict[str, Any]:
+    """Poll the file until the background task has attached its thumbnail"""
+    deadline = time.time() + timeout
+    while True:
+        response = requests.get(f"{BASE_URL}/files/{file_id}", headers=headers)
+        assert response.status_code == 200, f"Failed to get file: {response.text}"
+        file_data = response.json()
+        if file_data["thumbnail_url"] or time.time() > deadline:
+            return file_data
+        time.sleep(0.5)
+
+
+def test_thumbnails():
+    """Run thumbnail test"""
+
+    print_step("1. Setup: Creating workspace")
+
+    headers = {"Authorization": f"Bearer {register_and_login(user)}"}
+    response = requests.post(f"{BASE_URL}/workspaces/", json={"name": "Thumbnail Test Workspace"}, headers=headers)
+    workspace_id = response.json()["id"]
+    print_result(True, f"Workspace {workspace_id}")
+
+    print_step("2. Upload an image")
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (1200, 900), (timestamp % 256, 120, 200)).save(buffer, format="PNG")
+    image_bytes = buffer.getvalue()
+    image_file = upload(headers, workspace_id, "photo.png", image_bytes, "image/png")
+    print_result(True, f"Uploaded a 1200x900 PNG as {image_file['id']}")
+
+    image_file = wait_for_thumbnail(headers, image_file["id"])
+    assert image_file["thumbnail_url"], "A thumbnail should be attached to the image"
+    print_result(True, f"Thumbnail attached: {image_file['thumbnail_url']}")
+
+    print_step("3. Download the thumbnail")
+
+    thumbnail_url = image_file["thumbnail_download_url"] or image_file["thumbnail_url"]
+    if thumbnail_url.startswith("/"):
+        # Local storage links are paths on the API server
+        thumbnail_url = BASE_URL.removesuffix("/api/v1") + thumbnail_url
+    response = requests.get(thumbnail_url)
+    assert response.status_code == 200, f"Failed to download thumbnail: {response.status_code}"
+    thumbnail = Image.open(io.BytesIO(response.content))
+    width, height = thumbnail.size
+    assert max(width, height) < 1200, f"Thumbnail should be smaller than the original: {thumbnail.size}"
+    assert abs(width / height - 4 / 3) < 0.02, f"Thumbnail should keep the aspect ratio: {thumbnail.size}"
+    assert len(response.content) < len(image_bytes), "Thumbnail should be smaller than the original"
+    print_result(True, f"{thumbnail.format} thumbnail of {width}x{height}, {len(response.content)} bytes")
+
+    print_step("4. Upload the same image again")
+
+    duplicate = upload(headers, workspace_id, "photo-copy.png", image_bytes, "image/png")
+    assert duplicate["storage_id"] == image_file["storage_id"], "Identical upload should reuse the stored object"
+    assert duplicate["thumbnail_url"] == image_file["thumbnail_url"], "Identical upload should reuse the thumbnail"
+    print_result(True, "Deduplicated upload shares the original's thumbnail")
+
+    print_step("5. Upload a file that is not an image")
+
+    text_file = upload(headers, workspace_id, "notes.txt", f"no thumbnail {timestamp}".encode(), "text/plain")
+    text_file = wait_for_thumbnail(headers, text_file["id"], timeout=2)
+    assert text_file["thumbnail_url"] is None, "Text files should get no thumbnail"
+    print_result(True, "Text file has no thumbnail")
+
+    print_step("ALL TESTS COMPLETED SUCCESSFULLY!")
+
+
+if __name__ == "__main__":
+    try:
+        test_thumbnails()
+    except Exception as e:
+        print(f"\n[FAIL] TEST FAILED: {str(e)}")
+        import traceback
+        traceback.print_exc()
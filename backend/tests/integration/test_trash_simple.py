@@ -40,6 +40,14 @@ resp = requests.post(f"{BASE_URL}/pages/", json={
 page_id = resp.json()["id"]
 print(f"   Page ID: {page_id}")
 
+resp = requests.post(f"{BASE_URL}/pages/", json={
+    "title": "Child of page to delete",
+    "workspace_id": workspace_id,
+    "parent_id": page_id
+}, headers=headers)
+child_id = resp.json()["id"]
+print(f"   Child Page ID: {child_id}")
+
 print("5. Archiving page (move to trash)...")
 resp = requests.delete(f"{BASE_URL}/pages/{page_id}", headers=headers)
 print(f"   Status: {resp.status_code}")
@@ -47,7 +55,7 @@ print(f"   Status: {resp.status_code}")
 print("6. Listing trash...")
 resp = requests.get(f"{BASE_URL}/pages/trash?workspace_id={workspace_id}", headers=headers)
 print(f"   Status: {resp.status_code}")
-print(f"   Trash items: {len(resp.json())}")
+print(f"   Trash items: {len(resp.json())} (page and its child)")
 
 print("7. Restoring page...")
 resp = requests.post(f"{BASE_URL}/pages/{page_id}/restore", headers=headers)
@@ -59,15 +67,32 @@ resp = requests.get(f"{BASE_URL}/pages/trash?workspace_id={workspace_id}", heade
 print(f"   Status: {resp.status_code}")
 print(f"   Trash items: {len(resp.json())}")
 
-print("9. Archiving again...")
+print("9. Trashing the child, then the page...")
+resp = requests.delete(f"{BASE_URL}/pages/{child_id}", headers=headers)
+print(f"   Child status: {resp.status_code}")
+time.sleep(1)
+resp = requests.delete(f"{BASE_URL}/pages/{page_id}", headers=headers)
+print(f"   Page status: {resp.status_code}")
+
+print("10. Restoring the page leaves the child in trash...")
+resp = requests.post(f"{BASE_URL}/pages/{page_id}/restore", headers=headers)
+print(f"   Status: {resp.status_code}")
+resp = requests.get(f"{BASE_URL}/pages/trash?workspace_id={workspace_id}", headers=headers)
+trash_ids = [page["id"] for page in resp.json()]
+if trash_ids == [child_id]:
+    print("   ✓ Child trashed on its own stays in trash!")
+else:
+    print(f"   ✗ Expected only the child in trash, got {trash_ids}")
+
+print("11. Archiving again...")
 resp = requests.delete(f"{BASE_URL}/pages/{page_id}", headers=headers)
 print(f"   Status: {resp.status_code}")
 
-print("10. Permanently deleting...")
+print("12. Permanently deleting...")
 resp = requests.delete(f"{BASE_URL}/pages/{page_id}/permanent", headers=headers)
 print(f"   Status: {resp.status_code}")
 
-print("11. Verifying page is gone (should get 404)...")
+print("13. Verifying page is gone (should get 404)...")
 try:
     resp = requests.get(f"{BASE_URL}/pages/{page_id}", headers=headers)
     print(f"   Status: {resp.status_code}")
@@ -75,6 +100,11 @@ try:
         print("   ✓ Page successfully deleted!")
     else:
         print(f"   ✗ Expected 404, got {resp.status_code}")
+    resp = requests.get(f"{BASE_URL}/pages/{child_id}", headers=headers)
+    if resp.status_code == 404:
+        print("   ✓ Child page deleted with it!")
+    else:
+        print(f"   ✗ Expected 404 for child, got {resp.status_code}")
 except Exception as e:
     print(f"   ✗ Request failed: {e}")
 
@@ -260,6 +260,12 @@ try:
 
     print_success("Correct number of blocks restored")
 
+    if sorted(block['id'] for block in restored_blocks) != sorted([block1_id, block2_id]):
+        print_error("Restored blocks should keep their IDs")
+        exit(1)
+
+    print_success("Restored blocks kept their IDs")
+
     # Verify block content
     for block in restored_blocks:
         print(f"  - Block {block['order']}: {block['content'].get('text', 'N/A')}")
@@ -281,6 +287,37 @@ try:
 
     print_success("A new version was created before restoring (preserving current state)")
 
+    # Step 12: Diff version 1 against version 2
+    print_step(12, "Diff version 1 against version 2")
+
+    response = requests.get(f"{API_V1}/pages/{page_id}/versions/1/diff/2", headers=headers)
+    if response.status_code != 200:
+        print_error("Failed to diff versions", response)
+        exit(1)
+
+    diff = response.json()
+    changed_fields = [change['field'] for change in diff['metadata_changes']]
+    print_success(f"Metadata changes: {changed_fields}")
+    print_success(
+        f"Blocks: {len(diff['added'])} added, {len(diff['removed'])} removed, "
+        f"{len(diff['moved'])} moved, {len(diff['changed'])} changed"
+    )
+
+    if 'title' not in changed_fields:
+        print_error("Expected a title change between version 1 and version 2")
+        exit(1)
+
+    etag = response.headers.get("ETag")
+    response = requests.get(
+        f"{API_V1}/pages/{page_id}/versions/1/diff/2",
+        headers={**headers, "If-None-Match": etag}
+    )
+    if response.status_code != 304:
+        print_error("Expected 304 Not Modified for a cached diff", response)
+        exit(1)
+
+    print_success("Conditional diff request returned 304 Not Modified")
+
     # Final summary
     print("\n" + "="*60)
     print("ALL TESTS PASSED! ✓")
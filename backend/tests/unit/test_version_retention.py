@@ -0,0 +1,77 @@
+"""
+Unit tests for the version retention policy (select_versions_to_prune)
+Run: python -m pytest tests/unit/
+"""
+
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from app.services.version_retention import select_versions_to_prune
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+def make_timeline(*ages):
+    """(id, version_number, created_at) newest first, one version per age (timedelta)"""
+    ages = sorted(ages)
+    return [
+        (uuid4(), len(ages) - index, NOW - age)
+        for index, age in enumerate(ages)
+    ]
+
+
+def prune(timeline, keep_all_days=30, daily_days=180):
+    return select_versions_to_prune(timeline, NOW, keep_all_days, daily_days)
+
+
+def test_empty_timeline():
+    assert prune([]) == []
+
+
+def test_recent_versions_are_all_kept():
+    timeline = make_timeline(*(timedelta(hours=hours) for hours in range(0, 48, 2)))
+    assert prune(timeline) == []
+
+
+def test_latest_version_is_kept_even_when_old():
+    timeline = make_timeline(timedelta(days=400))
+    assert prune(timeline) == []
+
+
+def test_daily_thinning_keeps_newest_per_day():
+    day = timedelta(days=40)
+    timeline = make_timeline(
+        timedelta(hours=1),
+        day + timedelta(hours=1),
+        day + timedelta(hours=3),
+        day + timedelta(hours=5),
+    )
+    prunable = prune(timeline)
+    # The newest of the three on that day survives
+    assert prunable == [timeline[2][0], timeline[3][0]]
+
+
+def test_weekly_thinning_beyond_daily_window():
+    # 2026-04-06 (Monday) .. 2026-04-12 (Sunday): one ISO week, past the daily window
+    monday = datetime(2026, 4, 6, 12, 0, tzinfo=timezone.utc)
+    ages = [NOW - (monday + timedelta(days=offset)) for offset in range(7)]
+    timeline = make_timeline(timedelta(hours=1), *ages)
+    prunable = prune(timeline)
+    assert len(prunable) == 6
+    # Sunday, the newest version of the week, is kept
+    assert timeline[1][0] not in prunable
+
+
+def test_boundaries_are_configurable():
+    timeline = make_timeline(timedelta(hours=1), timedelta(days=5, hours=1), timedelta(days=5, hours=2))
+    assert prune(timeline, keep_all_days=30) == []
+    assert prune(timeline, keep_all_days=1) == [timeline[2][0]]
+
+
+def test_naive_datetimes_are_treated_as_utc():
+    timeline = [
+        (uuid4(), 3, (NOW - timedelta(hours=1)).replace(tzinfo=None)),
+        (uuid4(), 2, (NOW - timedelta(days=40)).replace(tzinfo=None)),
+        (uuid4(), 1, (NOW - timedelta(days=40, hours=1)).replace(tzinfo=None)),
+    ]
+    assert prune(timeline) == [timeline[2][0]]